@@ -0,0 +1,119 @@
+import sys
+import time
+from datetime import datetime
+
+from Clinica.Disponibilidade import normalizarData, normalizarHorario
+from Clinica.Metricas import instrumentado
+
+SQL_PASSADAS = """
+    SELECT id_consulta, horario, data, status, crm, id_paciente
+    FROM consulta
+    WHERE data < %s
+    LIMIT %s
+    """
+SQL_ARQUIVAR = (
+    "INSERT INTO consulta_arquivo (id_consulta, horario, data, status, crm, id_paciente, arquivada_em) "
+    "VALUES (%s, %s, %s, %s, %s, %s, %s)"
+)
+
+
+class Arquivamento:
+    """
+    Move as linhas passadas da tabela consulta para consulta_arquivo, em lotes.
+
+    A tabela consulta fica só com os dias a partir da data limite, que é o que a agenda, a marcação e
+    o índice de disponibilidade leem. As linhas passadas vão para o arquivo com o status que tinham:
+    consultas, onde o histórico as encontra, e também bloqueios e horários extras. Só os horários
+    livres sem paciente que a agenda modelo já prevê (liberados depois de um bloqueio) são
+    descartados, porque a agenda modelo continua dizendo o mesmo sobre eles. Nenhum horário muda de
+    status, então o resumo da agenda e o diário não são tocados, e reconstruir o resumo a partir de
+    consulta e consulta_arquivo continua dando os mesmos totais.
+    """
+
+    def __init__(self, db, tamanho_lote=1000):
+        """
+        Args:
+            db (Database): Instância do banco de dados.
+            tamanho_lote (int): Linhas movidas por transação.
+        """
+        self.db = db
+        self.connection = db.connection
+        self.tamanho_lote = tamanho_lote
+
+    @instrumentado
+    def arquivar(self, data_limite=None):
+        """
+        Arquiva as linhas de consulta anteriores à data limite.
+
+        Args:
+            data_limite (str | date, opcional): Primeiro dia que permanece em consulta. Por padrão, hoje.
+
+        Returns:
+            dict: Quantidade de linhas arquivadas e descartadas, e segundos gastos.
+
+        Raises:
+            ValueError: Se a data limite for posterior a hoje.
+        """
+        hoje = datetime.today().date()
+        data_limite = normalizarData(data_limite) if data_limite else hoje
+        if data_limite > hoje:
+            raise ValueError("Só dias passados podem ser arquivados.")
+        relatorio = {"arquivadas": 0, "descartadas": 0}
+        inicio = time.perf_counter()
+        cursor = self.connection.cursor()
+        try:
+            while True:
+                cursor.execute(SQL_PASSADAS, (data_limite, self.tamanho_lote))
+                lote = cursor.fetchall()
+                if not lote:
+                    break
+                arquivadas = self._moverLote(cursor, lote)
+                relatorio["arquivadas"] += arquivadas
+                relatorio["descartadas"] += len(lote) - arquivadas
+                self.connection.commit()
+        except Exception:
+            self.connection.rollback()
+            raise
+        finally:
+            cursor.close()
+        relatorio["segundos"] = time.perf_counter() - inicio
+        print(f"{relatorio['arquivadas']} horários anteriores a {data_limite} arquivados e "
+              f"{relatorio['descartadas']} descartados em {relatorio['segundos']:.2f}s.")
+        return relatorio
+
+    def _moverLote(self, cursor, lote):
+        agora = datetime.now()
+        arquivadas = [linha + (agora,) for linha in lote if not self._previstoNoModelo(linha)]
+        if arquivadas:
+            cursor.executemany(SQL_ARQUIVAR, arquivadas)
+        cursor.execute(
+            f"DELETE FROM consulta WHERE id_consulta IN ({', '.join(['%s'] * len(lote))})",
+            tuple(linha[0] for linha in lote)
+        )
+        return len(arquivadas)
+
+    def _previstoNoModelo(self, linha):
+        _, horario, data, status, crm, id_paciente = linha
+        if status != 'D' or id_paciente is not None:
+            return False
+        return normalizarHorario(horario) in self.db.agendaModelo(crm)[normalizarData(data).weekday()]
+
+
+if __name__ == "__main__":
+    from Clinica.Backend import BackendSQLite
+    from Clinica.Database import Database
+
+    # python -m Clinica.Arquivamento [AAAA-MM-DD] [arquivo.db]: com um arquivo, arquiva um banco SQLite
+    # em vez do MySQL; o argumento que não for uma data é o arquivo
+    if len(sys.argv) > 3:
+        print("Uso: python -m Clinica.Arquivamento [AAAA-MM-DD] [arquivo.db]")
+        sys.exit(1)
+    data_limite, backend = None, None
+    for argumento in sys.argv[1:]:
+        try:
+            normalizarData(argumento)
+            data_limite = argumento
+        except ValueError:
+            backend = BackendSQLite(argumento)
+    with Database(backend=backend) as db:
+        Arquivamento(db).arquivar(data_limite)
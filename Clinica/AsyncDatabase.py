@@ -0,0 +1,326 @@
+from functools import lru_cache
+
+from Clinica.Database import (
+    Database, HORARIO_ERRO, HORARIO_NOVO, RESERVA_INVALIDA, RESERVA_MARCADA, RESERVA_OCUPADA,
+    SQL_AGENDA_MODELO, SQL_CRIAR_HORARIO, SQL_CRM_POR_NOME, SQL_DISPONIBILIZAR,
+    SQL_ESPECIALIDADE_ID, SQL_ESPECIALIDADES, SQL_ID_PACIENTE, SQL_INDISPONIBILIZAR, SQL_MARCAR_CONSULTA,
+    SQL_MARCAR_HORARIO_MODELO, SQL_MEDICOS_POR_ESPECIALIDADE, SQL_MOTIVO_RESERVA, SQL_NOME_POR_CRM, SQL_STATUS_HORARIO,
+    agendaDoPeriodo, formatarHistorico, formatarHorariosMedico, janelaPadrao, montarAgendaModelo, normalizarData,
+    normalizarHorario, primeirosHorariosLivres, sqlAgendaMedicos, sqlAgendaPeriodo, sqlHistorico,
+)
+
+
+@lru_cache(maxsize=None)
+def _aiomysql():
+    """
+    Importa o aiomysql no primeiro uso, como Backend faz com o mysql.connector.
+
+    Returns:
+        module: aiomysql, ou None se o pacote não estiver instalado.
+    """
+    try:
+        import aiomysql
+    except ImportError:  # Instalações que não usam a versão assíncrona
+        return None
+    return aiomysql
+
+
+class AsyncDatabase:
+    """
+    Versão assíncrona (asyncio) das operações de Database, sobre um pool de conexões aiomysql.
+
+    Os métodos têm os mesmos nomes, argumentos e retornos de Database, mas são corrotinas, de modo que
+    muitos clientes (quiosques, front-ends web) podem marcar e consultar ao mesmo tempo em uma única
+    thread. O cache de referência, o índice de disponibilidade e o resumo da agenda são os mesmos de
+    Database. Ao contrário da interface de terminal, apenas erros são impressos.
+
+    As leituras rodam em autocommit; as escritas abrem a própria transação (begin) e sempre a encerram,
+    com commit ou rollback, antes de devolver a conexão ao pool.
+    """
+
+    def __init__(self, host="localhost", user="root", password="", database="sistema_consultorio",
+                 minimo=1, maximo=10, pool=None, erros=None):
+        """
+        Args:
+            host (str): Endereço do servidor MySQL.
+            user (str): Nome de usuário para autenticação no MySQL.
+            password (str): Senha para autenticação no MySQL.
+            database (str): Nome do banco de dados MySQL a ser utilizado.
+            minimo (int): Conexões abertas ao iniciar o pool.
+            maximo (int): Quantidade máxima de conexões do pool.
+            pool (opcional): Pool já aberto, com a parte da interface de aiomysql.Pool usada aqui
+                (acquire, close e wait_closed). Por padrão, conectar() cria um pool aiomysql.
+            erros (tuple, opcional): Exceções de banco de dados que as operações tratam. Por padrão,
+                as do aiomysql.
+        """
+        self.parametros = {"host": host, "user": user, "password": password, "db": database,
+                           "minsize": minimo, "maxsize": maximo, "autocommit": True}
+        self.pool = pool
+        if erros is None:
+            modulo = _aiomysql()
+            erros = (modulo.Error,) if modulo else ()
+        self.erros = erros
+
+    async def conectar(self):
+        """
+        Cria o pool de conexões. Chamado automaticamente por "async with".
+        """
+        if self.pool is None:
+            modulo = _aiomysql()
+            if modulo is None:
+                raise RuntimeError("O pacote aiomysql não está instalado.")
+            self.pool = await modulo.create_pool(**self.parametros)
+
+    async def fechar(self):
+        """
+        Fecha o pool e todas as suas conexões.
+        """
+        if self.pool is not None:
+            self.pool.close()
+            await self.pool.wait_closed()
+            self.pool = None
+
+    async def __aenter__(self):
+        await self.conectar()
+        return self
+
+    async def __aexit__(self, tipo, valor, traceback):
+        await self.fechar()
+
+    async def _buscar(self, sql, valores=(), todos=True):
+        async with self.pool.acquire() as conexao:
+            async with conexao.cursor() as cursor:
+                await cursor.execute(sql, valores)
+                if todos:
+                    return await cursor.fetchall()
+                return await cursor.fetchone()
+
+    async def _emCache(self, chave, sql, valores, todos=False):
+        valor = Database.cache.buscar(chave)
+        if valor is None:
+            linha = await self._buscar(sql, valores, todos)
+            valor = linha if todos else (linha[0] if linha else None)
+            if valor is not None:
+                Database.cache.guardar(chave, valor)
+        return valor
+
+    async def descobrirIdPaciente(self, cpf):
+        """
+        Obtém o ID de um paciente a partir do CPF. Veja Database.descobrirIdPaciente.
+        """
+        return await self._emCache(("id_paciente", cpf), SQL_ID_PACIENTE, (cpf,))
+
+    async def descobrirNome(self, crm):
+        """
+        Obtém o nome de um médico a partir do CRM. Veja Database.descobrirNome.
+        """
+        return await self._emCache(("nome", crm), SQL_NOME_POR_CRM, (crm,))
+
+    async def descobrirCrm(self, nome_dr):
+        """
+        Descobre o CRM de um médico dado seu nome. Veja Database.descobrirCrm.
+        """
+        return await self._emCache(("crm", nome_dr), SQL_CRM_POR_NOME, (nome_dr,))
+
+    async def listarEspecialidades(self):
+        """
+        Lista todas as especialidades cadastradas. Veja Database.listarEspecialidades.
+        """
+        return await self._emCache(("especialidades",), SQL_ESPECIALIDADES, (), todos=True)
+
+    async def mostrarMedicosPorEspecialidade(self, especialidade):
+        """
+        Lista os médicos (CRM, nome) de uma especialidade. Veja Database.mostrarMedicosPorEspecialidade.
+        """
+        chave = ("medicos_especialidade", especialidade)
+        medicos = Database.cache.buscar(chave)
+        if medicos is None:
+            especialidade_id = await self._buscar(SQL_ESPECIALIDADE_ID, (especialidade,), todos=False)
+            if not especialidade_id:
+                return None
+            medicos = await self._buscar(SQL_MEDICOS_POR_ESPECIALIDADE, (especialidade_id[0],))
+            Database.cache.guardar(chave, medicos)
+        return medicos
+
+    async def agendaModelo(self, crm):
+        """
+        Obtém a agenda modelo semanal de um médico. Veja Database.agendaModelo.
+        """
+        chave = ("agenda_modelo", crm)
+        modelo = Database.cache.buscar(chave)
+        if modelo is None:
+            modelo = montarAgendaModelo(await self._buscar(SQL_AGENDA_MODELO, (crm,)))
+            Database.cache.guardar(chave, modelo)
+        return modelo
+
+    async def _noModelo(self, crm, data, horario):
+        modelo = await self.agendaModelo(crm)
+        return normalizarHorario(horario) in modelo[normalizarData(data).weekday()]
+
+    async def mostrarConsultasDisponiveis(self, crm, dia):
+        """
+        Lista as consultas disponíveis de um médico em um dia. Veja Database.mostrarConsultasDisponiveis.
+        """
+        try:
+            modelo = await self.agendaModelo(crm)
+            linhas = await self._buscar(*sqlAgendaPeriodo(crm, dia, dia))
+            nome = await self.descobrirNome(crm)
+            return [
+                (data, horario, status, nome)
+                for _, data, horario, status in agendaDoPeriodo(modelo, linhas, dia, dia)
+                if status == 'D'
+            ]
+        except self.erros as e:
+            print(f"Erro: {e}")
+
+    async def buscarPrimeirosHorarios(self, especialidade, quantidade=5, data_inicio=None, data_fim=None,
+                                      horarios=None):
+        """
+        Busca os primeiros horários livres de uma especialidade. Veja Database.buscarPrimeirosHorarios.
+        """
+        medicos = await self.mostrarMedicosPorEspecialidade(especialidade)
+        if not medicos:
+            return []
+        data_inicio, data_fim = janelaPadrao(data_inicio, data_fim)
+        try:
+            modelos = {crm: await self.agendaModelo(crm) for crm, _ in medicos}
+            linhas = await self._buscar(*sqlAgendaMedicos([crm for crm, _ in medicos], data_inicio, data_fim))
+            return primeirosHorariosLivres(medicos, modelos, linhas, data_inicio, data_fim, quantidade, horarios)
+        except self.erros as e:
+            print(f"Erro ao buscar horários disponíveis: {e}")
+            return []
+
+    async def historicoMedico(self, cpf, data_inicio=None, data_fim=None, status=None):
+        """
+        Retorna o histórico médico de um paciente. Veja Database.historicoMedico.
+        """
+        sql, valores = sqlHistorico(cpf, data_inicio, data_fim, status)
+        if sql is None:
+            return None
+        try:
+            linhas = await self._buscar(sql, valores)
+            return formatarHistorico(linhas) if linhas else None
+        except self.erros as e:
+            print(f"Erro: {e}")
+
+    async def mostrarHorarios(self, nome_dr, data_inicio=None, data_fim=None):
+        """
+        Mostra os horários de um médico em um período. Veja Database.mostrarHorarios.
+        """
+        crm = await self.descobrirCrm(nome_dr)
+        data_inicio, data_fim = janelaPadrao(data_inicio, data_fim, dias=30)
+        try:
+            linhas = await self._buscar(*sqlAgendaPeriodo(crm, data_inicio, data_fim))
+            linhas = list(agendaDoPeriodo(await self.agendaModelo(crm), linhas, data_inicio, data_fim))
+            return formatarHorariosMedico(linhas) if linhas else None
+        except self.erros as e:
+            print(f"Erro: {e}")
+
+    async def marcarConsulta(self, nome_dr, data, hora, cpf):
+        """
+        Marca uma consulta de forma atômica. Veja Database.marcarConsulta.
+
+        Returns:
+            str: RESERVA_MARCADA, RESERVA_OCUPADA ou RESERVA_INVALIDA.
+        """
+        # Resolvido antes de retirar a conexão, pelo mesmo motivo de _alterarStatus
+        crm = await self.descobrirCrm(nome_dr)
+        try:
+            dia = normalizarData(data)
+        except ValueError as e:
+            print(f"Erro: {e}")
+            return RESERVA_INVALIDA
+        async with self.pool.acquire() as conexao:
+            try:
+                await conexao.begin()
+                async with conexao.cursor() as cursor:
+                    await cursor.execute(
+                        SQL_MARCAR_HORARIO_MODELO, (dia, cpf, nome_dr, dia.weekday(), normalizarHorario(hora))
+                    )
+                    if cursor.rowcount != 1:
+                        await cursor.execute(SQL_MARCAR_CONSULTA, (cpf, nome_dr, data, hora, cpf))
+                    if cursor.rowcount == 1:
+                        await self._registrarTransicoes(cursor, [(crm, data, hora, 'D', 'A')])
+                        await conexao.commit()
+                        if Database.disponibilidade.carregado:
+                            Database.disponibilidade.atualizar(crm, data, hora, False)
+                        return RESERVA_MARCADA
+                    # Nada foi gravado: o motivo é lido na mesma transação, que termina sem alterações
+                    await cursor.execute(SQL_MOTIVO_RESERVA, (cpf, nome_dr, data, hora))
+                    linha = await cursor.fetchone()
+                    await conexao.rollback()
+                    if linha and linha[1] and linha[0] != 'D':
+                        return RESERVA_OCUPADA
+                    return RESERVA_INVALIDA
+            except self.erros as e:
+                print(f"Erro: {e}")
+                await conexao.rollback()
+                return RESERVA_INVALIDA
+            except BaseException:
+                # Qualquer outra falha (inclusive o cancelamento da tarefa) também desfaz a transação
+                await conexao.rollback()
+                raise
+
+    async def indisponibilizarHorario(self, nome_dr, data, horario):
+        """
+        Indisponibiliza um horário. Veja Database.indisponibilizarHorario.
+
+        Returns:
+            str: Status anterior do horário, None se ele não existir, ou HORARIO_ERRO em caso de erro.
+        """
+        return await self._alterarStatus(nome_dr, data, horario, SQL_INDISPONIBILIZAR, 'I')
+
+    async def disponibilizarHorario(self, nome_dr, data, horario):
+        """
+        Disponibiliza um horário. Veja Database.disponibilizarHorario.
+
+        Returns:
+            str: Status anterior do horário, HORARIO_NOVO se ele foi criado como horário extra, None se
+                o médico não existir, ou HORARIO_ERRO em caso de erro.
+        """
+        return await self._alterarStatus(nome_dr, data, horario, SQL_DISPONIBILIZAR, 'D')
+
+    async def _alterarStatus(self, nome_dr, data, horario, sql, novo):
+        # Resolvidos antes de retirar a conexão: em falta no cache, eles ocupam uma conexão do pool,
+        # que poderia nunca vir se todas estivessem presas em transações esperando por elas
+        crm = await self.descobrirCrm(nome_dr)
+        no_modelo = await self._noModelo(crm, data, horario)
+        async with self.pool.acquire() as conexao:
+            try:
+                await conexao.begin()
+                async with conexao.cursor() as cursor:
+                    await cursor.execute(SQL_STATUS_HORARIO, (crm, data, horario))
+                    status = await cursor.fetchone()
+                    anterior = status[0] if status else None
+                    if status:
+                        await cursor.execute(sql, (crm, data, horario))
+                    elif no_modelo:
+                        # Horário livre pela agenda modelo: só o bloqueio precisa ser gravado
+                        anterior = 'D'
+                        if novo != 'D':
+                            await cursor.execute(SQL_CRIAR_HORARIO, (horario, data, novo, crm))
+                    elif novo == 'D' and crm is not None:
+                        # Horário extra, fora da agenda modelo
+                        await cursor.execute(SQL_CRIAR_HORARIO, (horario, data, novo, crm))
+                        anterior = HORARIO_NOVO
+                    else:
+                        # Horário inexistente: encerra a transação aberta, sem nada gravado
+                        await conexao.rollback()
+                        return None
+                    transicao = (crm, data, horario, None if anterior == HORARIO_NOVO else anterior, novo)
+                    await self._registrarTransicoes(cursor, [transicao])
+                    await conexao.commit()
+                if Database.disponibilidade.carregado:
+                    Database.disponibilidade.atualizar(crm, data, horario, novo == 'D')
+                return anterior
+            except self.erros as e:
+                print(f"Erro: {e}")
+                await conexao.rollback()
+                return HORARIO_ERRO
+            except BaseException:
+                await conexao.rollback()
+                raise
+
+    async def _registrarTransicoes(self, cursor, transicoes):
+        for sql, linhas in Database.comandosTransicoes(transicoes):
+            await cursor.executemany(sql, linhas)
@@ -0,0 +1,178 @@
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from Clinica.Database import Database
+
+# Custo (log2 das rodadas) dos hashes bcrypt gravados pelo sistema
+CUSTO_BCRYPT = 8
+
+
+def gerarHash(password):
+    """
+    Gera o hash bcrypt de uma senha, no formato gravado na tabela usuario.
+
+    Args:
+        password (str): Senha em texto.
+
+    Returns:
+        str: Hash bcrypt com o salt e o custo CUSTO_BCRYPT.
+    """
+    import bcrypt
+    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(CUSTO_BCRYPT)).decode('utf-8')
+
+
+class Autenticacao:
+    """
+    Autenticação de operadores com verificação de senha fora da thread que atende o login e
+    tokens de sessão de curta duração.
+
+    O bcrypt é lento de propósito e, no login, passa a rodar em um pool limitado de threads (o
+    bcrypt libera o GIL enquanto calcula). A conexão com o banco é usada só para ler o hash e é
+    devolvida ao pool antes da verificação. Depois do login, cada requisição apresenta o token,
+    conferido em memória em tempo constante, sem banco e sem bcrypt.
+    """
+
+    def __init__(self, config=None, trabalhadores=4, fila_max=64, validade=900):
+        """
+        Args:
+            config (dict, opcional): Parâmetros de conexão repassados a Database.
+            trabalhadores (int): Threads que verificam senhas ao mesmo tempo.
+            fila_max (int): Verificações aceitas de uma vez (em andamento ou aguardando uma thread).
+                Acima disso, o login é recusado em vez de formar uma fila sem limite.
+            validade (float): Segundos de validade de um token de sessão.
+        """
+        self.config = config or {}
+        self.validade = validade
+        self._executor = ThreadPoolExecutor(max_workers=trabalhadores, thread_name_prefix="bcrypt")
+        self._vagas = threading.BoundedSemaphore(fila_max)
+        self._sessoes = OrderedDict()  # token -> (username, expira_em), em ordem de expiração
+        self._trava = threading.Lock()
+        self._hash_ficticio = None
+
+    def verificarSenha(self, username, password):
+        """
+        Inicia a verificação da senha em uma thread do pool.
+
+        Args:
+            username (str): Nome de usuário.
+            password (str): Senha informada.
+
+        Returns:
+            concurrent.futures.Future: Resultado True se a senha estiver correta.
+
+        Raises:
+            TimeoutError: Se a fila de verificações estiver cheia.
+        """
+        if not self._vagas.acquire(blocking=False):
+            raise TimeoutError("Muitos logins simultâneos. Tente novamente.")
+        try:
+            with Database(**self.config) as db:
+                hashed_password = db.senhaDoUsuario(username)
+            futuro = self._executor.submit(self._conferir, password, hashed_password)
+        except BaseException:
+            self._vagas.release()
+            raise
+        futuro.add_done_callback(lambda _: self._vagas.release())
+        return futuro
+
+    def _conferir(self, password, hashed_password):
+        import bcrypt
+        if hashed_password is None:
+            # Usuário inexistente leva o mesmo tempo que uma senha errada
+            if self._hash_ficticio is None:
+                self._hash_ficticio = gerarHash("").encode('utf-8')
+            bcrypt.checkpw(password.encode('utf-8'), self._hash_ficticio)
+            return False
+        return bcrypt.checkpw(password.encode('utf-8'), hashed_password.encode('utf-8'))
+
+    def autenticar(self, username, password):
+        """
+        Verifica as credenciais e, se estiverem corretas, abre uma sessão.
+
+        A thread chamadora espera a verificação, mas o número de verificações simultâneas no
+        processo fica limitado ao tamanho do pool.
+
+        Args:
+            username (str): Nome de usuário.
+            password (str): Senha informada.
+
+        Returns:
+            str: Token da sessão, ou None se as credenciais forem inválidas.
+
+        Raises:
+            TimeoutError: Se a fila de verificações estiver cheia.
+        """
+        if self.verificarSenha(username, password).result():
+            return self.abrirSessao(username)
+        return None
+
+    async def autenticarAssincrono(self, username, password):
+        """
+        Versão de autenticar para código asyncio: o laço de eventos não fica parado durante o bcrypt.
+
+        A leitura do hash no banco usa Database e é feita em uma thread separada.
+        """
+        import asyncio
+        laco = asyncio.get_running_loop()
+        futuro = await laco.run_in_executor(None, self.verificarSenha, username, password)
+        if await asyncio.wrap_future(futuro):
+            return self.abrirSessao(username)
+        return None
+
+    def abrirSessao(self, username):
+        """
+        Emite um token de sessão para um usuário já autenticado.
+
+        Returns:
+            str: Token aleatório, válido por self.validade segundos.
+        """
+        token = secrets.token_urlsafe(32)
+        agora = time.monotonic()
+        with self._trava:
+            self._removerExpiradas(agora)
+            self._sessoes[token] = (username, agora + self.validade)
+        return token
+
+    def validarToken(self, token):
+        """
+        Confere um token de sessão.
+
+        Returns:
+            str: Nome do usuário da sessão, ou None se o token não existir ou tiver expirado.
+        """
+        if not token:
+            return None
+        with self._trava:
+            sessao = self._sessoes.get(token)
+            if sessao is None:
+                return None
+            if sessao[1] <= time.monotonic():
+                del self._sessoes[token]
+                return None
+            return sessao[0]
+
+    def encerrarSessao(self, token):
+        """
+        Invalida um token de sessão (logout).
+        """
+        with self._trava:
+            self._sessoes.pop(token, None)
+
+    def fechar(self):
+        """
+        Encerra o pool de verificação e todas as sessões.
+        """
+        self._executor.shutdown(wait=True)
+        with self._trava:
+            self._sessoes.clear()
+
+    def _removerExpiradas(self, agora):
+        # Como a validade é fixa, as sessões mais antigas expiram primeiro
+        while self._sessoes:
+            token, (_, expira_em) = next(iter(self._sessoes.items()))
+            if expira_em > agora:
+                break
+            del self._sessoes[token]
@@ -0,0 +1,258 @@
+import re
+import sqlite3
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+
+from Clinica.Disponibilidade import normalizarData, normalizarHorario
+
+# Datas e horários são gravados no SQLite como texto ISO, que ordena e compara como no MySQL
+sqlite3.register_adapter(date, date.isoformat)
+sqlite3.register_adapter(datetime, lambda valor: valor.isoformat(" "))
+sqlite3.register_adapter(timedelta, normalizarHorario)
+
+# Reescritas do SQL (escrito para o MySQL) aplicadas antes de executar no SQLite
+TRADUCOES_SQLITE = [
+    (re.compile(r"\bINT AUTO_INCREMENT PRIMARY KEY\b"), "INTEGER PRIMARY KEY AUTOINCREMENT"),
+    (re.compile(r"\bINSERT IGNORE\b"), "INSERT OR IGNORE"),
+    (re.compile(r"\bDATE_SUB\(([^,]+), INTERVAL (.+?) DAY\)"), r"date(\1, '-' || (\2) || ' days')"),
+    # O SQLite trava o banco inteiro na escrita; não há travas de linha
+    (re.compile(r"\s+FOR UPDATE( OF \w+)?"), ""),
+    (re.compile(r"%s"), "?"),
+]
+
+
+@lru_cache(maxsize=None)
+def _mysqlConnector():
+    """
+    Importa o mysql.connector no primeiro uso, e não ao importar o pacote: scripts que usam
+    apenas o SQLite (ou que nem chegam a conectar) não pagam pela importação.
+
+    Returns:
+        module: mysql.connector, ou None se o pacote não estiver instalado.
+    """
+    try:
+        import mysql.connector
+    except ImportError:  # Instalações que usam apenas o SQLite
+        return None
+    return mysql.connector
+
+
+@lru_cache(maxsize=512)
+def traduzirSQLite(sql):
+    """
+    Converte um comando escrito para o MySQL no dialeto do SQLite.
+
+    Além das reescritas de TRADUCOES_SQLITE, "ON DUPLICATE KEY UPDATE coluna = ... VALUES(coluna)"
+    vira "ON CONFLICT DO UPDATE SET coluna = ... excluded.coluna".
+    """
+    inicio, separador, atualizacao = sql.partition("ON DUPLICATE KEY UPDATE")
+    if separador:
+        atualizacao = re.sub(r"\bVALUES\((\w+)\)", r"excluded.\1", atualizacao)
+        sql = inicio + "ON CONFLICT DO UPDATE SET" + atualizacao
+    for padrao, substituto in TRADUCOES_SQLITE:
+        sql = padrao.sub(substituto, sql)
+    return sql
+
+
+def _colunasDosIndices(conexao, sql):
+    # sql devolve (tabela, índice, coluna) ordenado pela posição da coluna no índice
+    cursor = conexao.cursor()
+    try:
+        cursor.execute(sql)
+        colunas_por_indice = {}
+        for tabela, nome, coluna in cursor.fetchall():
+            colunas_por_indice.setdefault((tabela, nome), []).append(coluna)
+    finally:
+        cursor.close()
+    existentes = {}
+    for (tabela, _), colunas in colunas_por_indice.items():
+        existentes.setdefault(tabela, set()).add(tuple(colunas))
+    return existentes
+
+
+def _diaDaSemana(data):
+    # Mesmo resultado de WEEKDAY() do MySQL: segunda-feira = 0
+    return None if data is None else normalizarData(data).weekday()
+
+
+class CursorSQLite:
+    """
+    Cursor do SQLite com a interface usada de mysql.connector: placeholders %s e lastrowid.
+    """
+
+    def __init__(self, cursor):
+        self._cursor = cursor
+        self.lastrowid = None
+
+    def execute(self, sql, valores=()):
+        self._cursor.execute(traduzirSQLite(sql), valores)
+        self.lastrowid = self._cursor.lastrowid
+        return self
+
+    def executemany(self, sql, linhas):
+        self._cursor.executemany(traduzirSQLite(sql), linhas)
+        return self
+
+    @property
+    def rowcount(self):
+        return self._cursor.rowcount
+
+    @property
+    def description(self):
+        return self._cursor.description
+
+    def fetchone(self):
+        return self._cursor.fetchone()
+
+    def fetchmany(self, tamanho):
+        return self._cursor.fetchmany(tamanho)
+
+    def fetchall(self):
+        return self._cursor.fetchall()
+
+    def close(self):
+        self._cursor.close()
+
+
+class ConexaoSQLite:
+    """
+    Conexão SQLite com a parte da interface de mysql.connector usada pelo sistema
+    (cursor, commit, rollback, in_transaction, start_transaction e is_connected).
+    """
+
+    def __init__(self, conexao):
+        self._conexao = conexao
+        self._aberta = True
+
+    def cursor(self, buffered=None, prepared=None):
+        # O SQLite lê o resultado sob demanda e já reaproveita comandos compilados (cached_statements);
+        # buffered e prepared são aceitos por compatibilidade
+        return CursorSQLite(self._conexao.cursor())
+
+    @property
+    def in_transaction(self):
+        return self._conexao.in_transaction
+
+    def start_transaction(self):
+        self._conexao.execute("BEGIN")
+
+    def is_connected(self):
+        return self._aberta
+
+    def commit(self):
+        self._conexao.commit()
+
+    def rollback(self):
+        self._conexao.rollback()
+
+    def close(self):
+        self._aberta = False
+        self._conexao.close()
+
+
+class BackendMySQL:
+    """
+    Armazenamento em um servidor MySQL, acessado por mysql.connector.
+    """
+
+    dialeto = "mysql"
+
+    def __init__(self, host="localhost", user="root", password="", database="sistema_consultorio"):
+        """
+        Args:
+            host (str): Endereço do servidor MySQL.
+            user (str): Nome de usuário para autenticação no MySQL.
+            password (str): Senha para autenticação no MySQL.
+            database (str): Nome do banco de dados MySQL a ser utilizado.
+        """
+        self.parametros = {"host": host, "user": user, "password": password, "database": database}
+        self.chave = ("mysql", host, user, password, database)
+        self.opcoes_pool = {}
+
+    def conectar(self):
+        """
+        Abre uma nova conexão. Usado como fábrica do pool de conexões.
+        """
+        conector = _mysqlConnector()
+        if conector is None:
+            raise RuntimeError("O pacote mysql-connector-python não está instalado.")
+        return conector.connect(**self.parametros)
+
+    @property
+    def erros(self):
+        """
+        Exceções de banco de dados que as operações de Database tratam.
+        """
+        conector = _mysqlConnector()
+        return (conector.Error,) if conector else ()
+
+    def indicesExistentes(self, conexao):
+        """
+        Lista as colunas de cada índice do banco.
+
+        Returns:
+            dict: tabela -> conjunto de tuplas de colunas, na ordem do índice.
+        """
+        return _colunasDosIndices(
+            conexao,
+            "SELECT table_name, index_name, column_name FROM information_schema.statistics "
+            "WHERE table_schema = DATABASE() ORDER BY table_name, index_name, seq_in_index"
+        )
+
+
+class BackendSQLite:
+    """
+    Armazenamento embutido em um arquivo SQLite, no mesmo processo e sem servidor.
+
+    Usa o mesmo esquema do MySQL (veja Migracao) e o modo WAL, em que leituras não bloqueiam a
+    escrita em andamento. Indicado para consultórios com uma única máquina, testes e benchmarks.
+    """
+
+    dialeto = "sqlite"
+
+    # Exceções de banco de dados que as operações de Database tratam
+    erros = (sqlite3.Error,)
+
+    def __init__(self, caminho="sistema_consultorio.db", tempo_espera=30):
+        """
+        Args:
+            caminho (str): Arquivo do banco. ":memory:" cria um banco temporário em memória,
+                que fica restrito a uma única conexão.
+            tempo_espera (float): Segundos que uma escrita espera pelo bloqueio de outra conexão.
+        """
+        self.caminho = caminho
+        self.tempo_espera = tempo_espera
+        self.chave = ("sqlite", caminho)
+        if caminho == ":memory:":
+            # Cada conexão em memória seria um banco diferente: o pool mantém uma só, sem expirar
+            self.opcoes_pool = {"tamanho_max": 1, "tempo_ocioso_max": float("inf")}
+        else:
+            self.opcoes_pool = {}
+
+    def conectar(self):
+        """
+        Abre uma nova conexão. Usado como fábrica do pool de conexões.
+        """
+        # check_same_thread=False: o pool entrega a conexão a uma thread de cada vez
+        # O sqlite3 guarda os comandos já compilados por conexão; os cursores preparados de Database
+        # reaproveitam esse cache, que precisa comportar todos os comandos frequentes
+        conexao = sqlite3.connect(self.caminho, timeout=self.tempo_espera, check_same_thread=False,
+                                  cached_statements=256)
+        conexao.execute("PRAGMA journal_mode=WAL")
+        conexao.execute("PRAGMA synchronous=NORMAL")
+        conexao.execute("PRAGMA foreign_keys=ON")
+        conexao.create_function("WEEKDAY", 1, _diaDaSemana, deterministic=True)
+        return ConexaoSQLite(conexao)
+
+    def indicesExistentes(self, conexao):
+        """
+        Lista as colunas de cada índice do banco.
+
+        Returns:
+            dict: tabela -> conjunto de tuplas de colunas, na ordem do índice.
+        """
+        return _colunasDosIndices(
+            conexao,
+            "SELECT m.name, i.name, c.name FROM sqlite_master m, pragma_index_list(m.name) i, "
+            "pragma_index_info(i.name) c WHERE m.type = 'table' ORDER BY m.name, i.name, c.seqno"
+        )
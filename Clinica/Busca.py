@@ -0,0 +1,249 @@
+import bisect
+import heapq
+import math
+import threading
+import unicodedata
+
+PACIENTE = "paciente"
+MEDICO = "medico"
+
+# Maior caractere possível: palavra + _FIM delimita, na lista ordenada, os termos que começam com palavra
+_FIM = chr(0x10FFFF)
+
+
+def normalizarTexto(texto):
+    """
+    Converte um texto para minúsculas, sem acentos e com espaços simples, para comparação.
+    """
+    texto = unicodedata.normalize("NFKD", str(texto or "")).encode("ascii", "ignore").decode("ascii")
+    return " ".join(texto.lower().split())
+
+
+def somenteDigitos(texto):
+    """
+    Retorna apenas os dígitos de um texto (CPF, telefone).
+    """
+    return "".join(caractere for caractere in str(texto or "") if caractere.isdigit())
+
+
+def trigramas(texto):
+    """
+    Conjunto de trigramas de um texto normalizado, com cada palavra delimitada por espaços
+    (como no pg_trgm): "ana" -> {"  a", " an", "ana", "na "}.
+    """
+    resultado = set()
+    for palavra in texto.split():
+        palavra = f"  {palavra} "
+        resultado.update(palavra[i:i + 3] for i in range(len(palavra) - 2))
+    return resultado
+
+
+class IndiceBusca:
+    """
+    Índice em memória para localizar pacientes e médicos por prefixo e por semelhança de nome.
+
+    A busca por prefixo percorre com bisect a lista ordenada dos termos distintos (palavras do nome,
+    dígitos do CPF, do telefone e do CRM); cada palavra da pesquisa precisa ser prefixo de algum
+    termo do cadastro, então "ana sou" encontra "Ana Souza". A busca tolerante a erros de digitação
+    compara trigramas, indexados por nome distinto (nomes repetidos são comparados uma vez só): são
+    candidatos apenas os nomes presentes nas listas dos trigramas mais raros da pesquisa, já que um
+    nome fora de todas elas não alcançaria o limiar. O índice é carregado de uma vez e depois
+    mantido pelos cadastros e atualizações de Database.
+    """
+
+    def __init__(self):
+        self._registros = {}  # (tipo, identificador) -> (nome, nome normalizado, termos, telefone)
+        self._porTermo = {}  # termo -> {(tipo, identificador)}
+        self._termos = []  # termos distintos, em ordem
+        self._porNome = {}  # nome normalizado -> {(tipo, identificador)}
+        self._trigramas = {}  # trigrama -> {nome normalizado}
+        self._trava = threading.Lock()
+        self.carregado = False
+
+    def carregar(self, db, tamanho_lote=5000):
+        """
+        Recarrega o índice com todos os pacientes e médicos.
+
+        Args:
+            db (Database): Instância do banco de dados.
+            tamanho_lote (int): Quantidade de linhas lidas do servidor a cada fetchmany.
+        """
+        novo = IndiceBusca()
+        cursor = db.connection.cursor(buffered=False)
+        try:
+            for tipo, sql in ((PACIENTE, "SELECT cpf, nome, telefone FROM paciente"),
+                              (MEDICO, "SELECT crm, nome, telefone FROM medico")):
+                cursor.execute(sql)
+                while True:
+                    lote = cursor.fetchmany(tamanho_lote)
+                    if not lote:
+                        break
+                    for identificador, nome, telefone in lote:
+                        novo._incluir(tipo, identificador, nome, telefone, ordenar=False)
+        finally:
+            cursor.close()
+        novo._termos = sorted(novo._porTermo)
+        with self._trava:
+            self._registros = novo._registros
+            self._porTermo = novo._porTermo
+            self._termos = novo._termos
+            self._porNome = novo._porNome
+            self._trigramas = novo._trigramas
+            self.carregado = True
+
+    def atualizar(self, tipo, identificador, nome, telefone=None):
+        """
+        Inclui um cadastro ou substitui um já indexado.
+
+        Args:
+            tipo (str): PACIENTE ou MEDICO.
+            identificador (str): CPF do paciente ou CRM do médico.
+            nome (str): Nome completo.
+            telefone (str, opcional): Telefone. Ao substituir, None mantém o telefone já indexado.
+        """
+        with self._trava:
+            anterior = self._remover(tipo, identificador)
+            if telefone is None and anterior:
+                telefone = anterior
+            self._incluir(tipo, identificador, nome, telefone)
+
+    def remover(self, tipo, identificador):
+        """
+        Retira um cadastro do índice.
+        """
+        with self._trava:
+            self._remover(tipo, identificador)
+
+    def _incluir(self, tipo, identificador, nome, telefone, ordenar=True):
+        chave = (tipo, identificador)
+        nome_normalizado = normalizarTexto(nome)
+        termos = set(nome_normalizado.split())
+        telefone_digitos = somenteDigitos(telefone)
+        # Telefones com DDD também são encontrados pelo número sem ele
+        termos.update(termo for termo in (somenteDigitos(identificador), telefone_digitos,
+                                          telefone_digitos[2:] if len(telefone_digitos) >= 10 else "") if termo)
+        if tipo == MEDICO:
+            termos.add(normalizarTexto(identificador))
+        self._registros[chave] = (nome, nome_normalizado, termos, telefone)
+        for termo in termos:
+            chaves = self._porTermo.get(termo)
+            if chaves is None:
+                chaves = self._porTermo[termo] = set()
+                if ordenar:
+                    bisect.insort(self._termos, termo)
+            chaves.add(chave)
+        mesmo_nome = self._porNome.get(nome_normalizado)
+        if mesmo_nome is None:
+            mesmo_nome = self._porNome[nome_normalizado] = set()
+            for trigrama in trigramas(nome_normalizado):
+                self._trigramas.setdefault(trigrama, set()).add(nome_normalizado)
+        mesmo_nome.add(chave)
+
+    def _remover(self, tipo, identificador):
+        chave = (tipo, identificador)
+        registro = self._registros.pop(chave, None)
+        if registro is None:
+            return None
+        _, nome_normalizado, termos, telefone = registro
+        for termo in termos:
+            chaves = self._porTermo[termo]
+            chaves.discard(chave)
+            if not chaves:
+                del self._porTermo[termo]
+                del self._termos[bisect.bisect_left(self._termos, termo)]
+        mesmo_nome = self._porNome[nome_normalizado]
+        mesmo_nome.discard(chave)
+        if not mesmo_nome:
+            del self._porNome[nome_normalizado]
+            for trigrama in trigramas(nome_normalizado):
+                nomes = self._trigramas[trigrama]
+                nomes.discard(nome_normalizado)
+                if not nomes:
+                    del self._trigramas[trigrama]
+        return telefone
+
+    def buscar(self, texto, tipo=None, limite=10, limiar=0.5):
+        """
+        Procura cadastros por prefixo e, para completar o limite, por semelhança de nome.
+
+        Args:
+            texto (str): Pesquisa: partes do nome, início do CPF, do telefone ou do CRM.
+            tipo (str, opcional): PACIENTE ou MEDICO. Por padrão, ambos.
+            limite (int): Quantidade máxima de resultados.
+            limiar (float): Fração mínima (0 a 1) dos trigramas da pesquisa presentes no nome.
+
+        Returns:
+            list: Tuplas (tipo, identificador, nome); primeiro os que casam por prefixo (com uma
+                palavra, na ordem dos termos encontrados; com várias, em ordem de nome), depois os
+                semelhantes, do mais para o menos parecido.
+        """
+        pesquisa = normalizarTexto(texto)
+        palavras = [somenteDigitos(palavra) or palavra for palavra in pesquisa.split()]
+        if not palavras:
+            return []
+        with self._trava:
+            if len(palavras) == 1:
+                resultado = self._primeirosPorPrefixo(palavras[0], tipo, limite)
+            else:
+                encontrados = self._porPrefixo(palavras, tipo)
+                resultado = heapq.nsmallest(limite, encontrados, key=lambda chave: (self._registros[chave][1], chave))
+            if len(resultado) < limite:
+                # Com menos resultados que o limite, resultado já tem todos os que casam por prefixo
+                vistos = set(resultado)
+                for nome in self._porSemelhanca(pesquisa, limiar):
+                    resultado += sorted(chave for chave in self._porNome[nome]
+                                        if chave not in vistos and (tipo is None or chave[0] == tipo))
+                    if len(resultado) >= limite:
+                        break
+            return [(chave[0], chave[1], self._registros[chave][0]) for chave in resultado[:limite]]
+
+    def _faixa(self, palavra):
+        return bisect.bisect_left(self._termos, palavra), bisect.bisect_left(self._termos, palavra + _FIM)
+
+    def _primeirosPorPrefixo(self, palavra, tipo, limite):
+        # Percorre os termos em ordem e para assim que junta o limite, sem montar o conjunto inteiro
+        resultado = []
+        vistos = set()
+        inicio, fim = self._faixa(palavra)
+        for posicao in range(inicio, fim):
+            chaves = self._porTermo[self._termos[posicao]] - vistos
+            if tipo is not None:
+                chaves = {chave for chave in chaves if chave[0] == tipo}
+            novas = heapq.nsmallest(limite - len(resultado), chaves)
+            resultado += novas
+            vistos.update(novas)
+            if len(resultado) >= limite:
+                break
+        return resultado
+
+    def _porPrefixo(self, palavras, tipo):
+        encontrados = None
+        # A palavra mais longa costuma ser a mais seletiva: começa por ela
+        for palavra in sorted(palavras, key=len, reverse=True):
+            inicio, fim = self._faixa(palavra)
+            chaves = set().union(*(self._porTermo[termo] for termo in self._termos[inicio:fim]))
+            encontrados = chaves if encontrados is None else encontrados & chaves
+            if not encontrados:
+                return set()
+        if tipo is not None:
+            encontrados = {chave for chave in encontrados if chave[0] == tipo}
+        return encontrados
+
+    def _porSemelhanca(self, pesquisa, limiar):
+        consulta = trigramas(pesquisa)
+        if not consulta:
+            return []
+        # Um nome precisa ter ao menos minimo dos trigramas da pesquisa; quem não está em nenhuma
+        # das listas dos (len - minimo + 1) trigramas mais raros não chega a esse mínimo
+        minimo = max(1, math.ceil(limiar * len(consulta)))
+        raros = sorted(consulta, key=lambda trigrama: len(self._trigramas.get(trigrama, ())))
+        candidatos = set().union(*(self._trigramas.get(trigrama, ()) for trigrama in raros[:len(consulta) - minimo + 1]))
+        semelhantes = []
+        for nome in candidatos:
+            trigramas_nome = trigramas(nome)
+            comuns = len(consulta & trigramas_nome)
+            if comuns >= minimo:
+                # Desempate pela semelhança do nome inteiro, que favorece nomes sem palavras a mais
+                semelhantes.append((-comuns, len(trigramas_nome) - comuns, nome))
+        semelhantes.sort()
+        return [nome for _, _, nome in semelhantes]
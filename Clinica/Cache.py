@@ -0,0 +1,107 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class CacheLRU:
+    """
+    Cache em memória com tamanho máximo, descarte do item menos usado (LRU) e tempo de validade (TTL).
+
+    As chaves são tuplas cujo primeiro elemento é o nome do grupo (por exemplo, ("crm", nome_dr)),
+    o que permite invalidar todos os itens de um grupo de uma só vez.
+    """
+
+    def __init__(self, tamanho_max=1024, ttl=300):
+        """
+        Args:
+            tamanho_max (int): Quantidade máxima de itens guardados.
+            ttl (float): Segundos que um item permanece válido.
+        """
+        self.tamanho_max = tamanho_max
+        self.ttl = ttl
+        self._itens = OrderedDict()  # chave -> (valor, expira_em)
+        self._trava = threading.Lock()
+        self._contadores = {"hits": 0, "misses": 0, "expirados": 0, "descartados": 0, "invalidados": 0}
+
+    def obter(self, chave, carregar):
+        """
+        Retorna o valor da chave, carregando-o do banco em caso de ausência ou expiração.
+
+        Valores None (registro não encontrado ou erro) não são guardados.
+
+        Args:
+            chave (tuple): Chave do item, com o nome do grupo na primeira posição.
+            carregar (callable): Função sem argumentos que busca o valor no banco.
+
+        Returns:
+            O valor guardado ou carregado.
+        """
+        valor = self.buscar(chave)
+        if valor is not None:
+            return valor
+
+        # A busca no banco acontece fora da trava
+        valor = carregar()
+        if valor is not None:
+            self.guardar(chave, valor)
+        return valor
+
+    def buscar(self, chave):
+        """
+        Retorna o valor guardado para a chave, ou None se ele não existir ou tiver expirado.
+
+        Usado por quem precisa carregar o valor por conta própria (por exemplo, código assíncrono).
+        """
+        agora = time.monotonic()
+        with self._trava:
+            item = self._itens.get(chave)
+            if item is not None:
+                if item[1] > agora:
+                    self._itens.move_to_end(chave)
+                    self._contadores["hits"] += 1
+                    return item[0]
+                del self._itens[chave]
+                self._contadores["expirados"] += 1
+            self._contadores["misses"] += 1
+            return None
+
+    def guardar(self, chave, valor):
+        """
+        Guarda um valor, descartando o item menos usado se o cache estiver cheio.
+        """
+        with self._trava:
+            self._itens[chave] = (valor, time.monotonic() + self.ttl)
+            self._itens.move_to_end(chave)
+            while len(self._itens) > self.tamanho_max:
+                self._itens.popitem(last=False)
+                self._contadores["descartados"] += 1
+
+    def invalidar(self, *grupos):
+        """
+        Remove todos os itens dos grupos informados. Sem argumentos, esvazia o cache.
+
+        Args:
+            *grupos (str): Nomes dos grupos a invalidar (primeiro elemento das chaves).
+        """
+        with self._trava:
+            if grupos:
+                chaves = [chave for chave in self._itens if chave[0] in grupos]
+            else:
+                chaves = list(self._itens)
+            for chave in chaves:
+                del self._itens[chave]
+            self._contadores["invalidados"] += len(chaves)
+
+    def estatisticas(self):
+        """
+        Retorna os contadores do cache.
+
+        Returns:
+            dict: hits, misses, expirados, descartados, invalidados, itens e taxa_acerto.
+        """
+        with self._trava:
+            estatisticas = dict(self._contadores)
+            estatisticas["itens"] = len(self._itens)
+            consultas = estatisticas["hits"] + estatisticas["misses"]
+            estatisticas["taxa_acerto"] = estatisticas["hits"] / consultas if consultas else 0.0
+            return estatisticas
@@ -0,0 +1,170 @@
+import threading
+import time
+
+
+class PoolConexoes:
+    """
+    Pool de conexões compartilhado pelo processo, com tamanho máximo, verificação de saúde
+    na retirada e descarte de conexões ociosas.
+    """
+
+    _pools = {}
+    _trava_pools = threading.Lock()
+
+    def __init__(self, fabrica, tamanho_max=5, tempo_ocioso_max=300, tempo_espera=30):
+        """
+        Inicializa o pool.
+
+        Args:
+            fabrica (callable): Função sem argumentos que abre uma nova conexão.
+            tamanho_max (int): Quantidade máxima de conexões abertas ao mesmo tempo.
+            tempo_ocioso_max (float): Segundos que uma conexão pode ficar parada antes de ser fechada.
+            tempo_espera (float): Segundos que obter() espera por uma conexão livre.
+        """
+        self.fabrica = fabrica
+        self.tamanho_max = tamanho_max
+        self.tempo_ocioso_max = tempo_ocioso_max
+        self.tempo_espera = tempo_espera
+        self._livres = []  # Pilha de (conexao, momento_devolucao)
+        self._abertas = 0
+        self._condicao = threading.Condition()
+        self._contadores = {"hits": 0, "misses": 0, "waits": 0, "descartadas": 0}
+
+    @classmethod
+    def compartilhado(cls, chave, fabrica, **opcoes):
+        """
+        Retorna o pool do processo associado à chave, criando-o na primeira chamada.
+
+        Args:
+            chave (tuple): Identifica o destino da conexão (host, usuário, banco...).
+            fabrica (callable): Função que abre uma nova conexão para esse destino.
+            **opcoes: Parâmetros repassados ao construtor do pool.
+
+        Returns:
+            PoolConexoes: O pool compartilhado.
+        """
+        with cls._trava_pools:
+            pool = cls._pools.get(chave)
+            if pool is None:
+                pool = cls(fabrica, **opcoes)
+                cls._pools[chave] = pool
+            return pool
+
+    def obter(self):
+        """
+        Retira uma conexão do pool, abrindo uma nova se houver espaço ou esperando uma devolução.
+
+        Returns:
+            Conexão pronta para uso.
+
+        Raises:
+            TimeoutError: Se nenhuma conexão ficar livre dentro de tempo_espera.
+        """
+        with self._condicao:
+            limite = time.monotonic() + self.tempo_espera
+            esperou = False
+            while True:
+                self._descartarOciosas()
+                while self._livres:
+                    conexao, _ = self._livres.pop()
+                    if self._saudavel(conexao):
+                        self._contadores["hits"] += 1
+                        return conexao
+                    self._fechar(conexao)
+                if self._abertas < self.tamanho_max:
+                    self._abertas += 1
+                    break
+                if not esperou:
+                    self._contadores["waits"] += 1
+                    esperou = True
+                restante = limite - time.monotonic()
+                if restante <= 0:
+                    raise TimeoutError("Nenhuma conexão livre no pool.")
+                self._condicao.wait(restante)
+
+        # Abre a conexão fora da trava para não bloquear as outras threads
+        try:
+            conexao = self.fabrica()
+        except Exception:
+            with self._condicao:
+                self._abertas -= 1
+                self._condicao.notify()
+            raise
+        with self._condicao:
+            self._contadores["misses"] += 1
+        return conexao
+
+    def devolver(self, conexao):
+        """
+        Devolve uma conexão ao pool. Transações esquecidas abertas são desfeitas.
+
+        Args:
+            conexao: Conexão obtida por obter().
+        """
+        try:
+            if conexao.in_transaction:
+                conexao.rollback()
+        except Exception:
+            with self._condicao:
+                self._fechar(conexao)
+                self._condicao.notify()
+            return
+        with self._condicao:
+            self._livres.append((conexao, time.monotonic()))
+            self._condicao.notify()
+
+    def descartar(self, conexao):
+        """
+        Fecha uma conexão obtida do pool sem devolvê-la (por exemplo, após erro de rede).
+
+        Args:
+            conexao: Conexão obtida por obter().
+        """
+        with self._condicao:
+            self._fechar(conexao)
+            self._condicao.notify()
+
+    def fecharTodas(self):
+        """
+        Fecha todas as conexões livres do pool.
+        """
+        with self._condicao:
+            while self._livres:
+                conexao, _ = self._livres.pop()
+                self._fechar(conexao)
+            self._condicao.notify_all()
+
+    def estatisticas(self):
+        """
+        Retorna os contadores do pool.
+
+        Returns:
+            dict: hits (reutilizações), misses (conexões novas), waits (esperas por conexão livre),
+                  descartadas, abertas e livres.
+        """
+        with self._condicao:
+            estatisticas = dict(self._contadores)
+            estatisticas["abertas"] = self._abertas
+            estatisticas["livres"] = len(self._livres)
+            return estatisticas
+
+    def _descartarOciosas(self):
+        # As conexões mais antigas ficam no início da pilha
+        agora = time.monotonic()
+        while self._livres and agora - self._livres[0][1] > self.tempo_ocioso_max:
+            conexao, _ = self._livres.pop(0)
+            self._fechar(conexao)
+
+    def _saudavel(self, conexao):
+        try:
+            return conexao.is_connected()
+        except Exception:
+            return False
+
+    def _fechar(self, conexao):
+        self._abertas -= 1
+        self._contadores["descartadas"] += 1
+        try:
+            conexao.close()
+        except Exception:
+            pass
@@ -1,35 +1,588 @@
-import bcrypt
-import mysql.connector
+import contextlib
+import functools
+import heapq
+import itertools
+import weakref
+from collections import OrderedDict
 from datetime import datetime, timedelta
-from Clinica.Paciente import Paciente
-from Medico import Medico
+from Clinica.Backend import BackendMySQL
+from Clinica.Busca import MEDICO, PACIENTE, IndiceBusca
+from Clinica.Cache import CacheLRU
+from Clinica.Conexao import PoolConexoes
+from Clinica.Diario import DiarioAgenda
+from Clinica.Disponibilidade import IndiceDisponibilidade, normalizarData, normalizarHorario
+from Clinica.Metricas import instrumentado, metricas
+from Clinica.Replica import ConexaoPrimaria, ReplicaLeitura
+from Clinica.Resumo import ResumoAgenda
+
+# Horários de atendimento da agenda modelo criada por padronizadoConsultas
+HORARIOS_PADRAO = ["07:00:00", "08:00:00", "09:00:00", "10:00:00",
+                   "13:00:00", "14:00:00", "15:00:00", "16:00:00", "17:00:00"]
+
+HORARIOS_MANHA = HORARIOS_PADRAO[:4]
+HORARIOS_TARDE = HORARIOS_PADRAO[4:]
+
+# Dias da semana (datetime.weekday) em que a clínica não atende
+DIAS_FECHADOS = (6, 0)
+
+# Agenda modelo de um médico sem horários: uma tupla vazia para cada dia da semana
+AGENDA_VAZIA = ((),) * 7
+
+# Resultados de marcarConsulta
+RESERVA_MARCADA = "marcada"
+RESERVA_OCUPADA = "ocupada"
+RESERVA_INVALIDA = "invalida"
+
+# Resultados de disponibilizarHorario e indisponibilizarHorario que não são um status anterior
+HORARIO_NOVO = "novo"
+HORARIO_ERRO = "erro"
+
+# Rótulos dos códigos de status da tabela consulta
+STATUS_MAP = {'I': 'Indisponível', 'R': 'Realizada', 'A': 'Agendada', 'D': 'Disponível'}
+
+# Comandos SQL compartilhados por Database e AsyncDatabase
+SQL_ID_PACIENTE = "SELECT id_paciente FROM paciente WHERE cpf = %s"
+SQL_NOME_POR_CRM = "SELECT nome FROM medico WHERE crm = %s"
+SQL_CRM_POR_NOME = "SELECT crm FROM medico WHERE nome = %s"
+SQL_ESPECIALIDADES = "SELECT especialidade FROM especialidade"
+SQL_ESPECIALIDADE_ID = "SELECT especialidade_id FROM especialidade WHERE especialidade = %s"
+SQL_MEDICOS_POR_ESPECIALIDADE = """
+    SELECT medico.crm, medico.nome
+    FROM medico
+    INNER JOIN especialidade_medico ON medico.crm = especialidade_medico.crm
+    WHERE especialidade_medico.especialidade_id = %s
+    """
+SQL_STATUS_HORARIO = "SELECT status FROM consulta WHERE crm = %s AND data = %s AND horario = %s"
+SQL_INDISPONIBILIZAR = "UPDATE consulta SET status = 'I' WHERE crm = %s AND data = %s AND horario = %s"
+SQL_DISPONIBILIZAR = "UPDATE consulta SET status = 'D' WHERE crm = %s AND data = %s AND horario = %s"
+SQL_CRIAR_HORARIO = "INSERT INTO consulta (horario, data, status, crm) VALUES (%s, %s, %s, %s)"
+SQL_AGENDA_MODELO = "SELECT dia_semana, horario FROM agenda_modelo WHERE crm = %s"
+# Linhas de um médico em um período, travadas até o fim da transação de bloqueio ou liberação
+SQL_LINHAS_PERIODO = """
+    SELECT consulta.id_consulta, consulta.data, consulta.horario, consulta.status, paciente.cpf, paciente.nome
+    FROM consulta
+    LEFT JOIN paciente ON paciente.id_paciente = consulta.id_paciente
+    WHERE consulta.crm = %s AND consulta.data BETWEEN %s AND %s
+    FOR UPDATE OF consulta
+    """
+SQL_AGENDA_PERIODO = """
+    SELECT id_consulta, data, horario, status
+    FROM consulta
+    WHERE crm = %s AND data BETWEEN %s AND %s
+    """
+# Mesma consulta incluindo as consultas passadas movidas para consulta_arquivo
+SQL_AGENDA_PERIODO_COM_ARQUIVO = SQL_AGENDA_PERIODO + """
+    UNION ALL
+    SELECT id_consulta, data, horario, status
+    FROM consulta_arquivo
+    WHERE crm = %s AND data BETWEEN %s AND %s
+    """
+# Horários que só existem na agenda modelo ganham uma linha em consulta ao serem marcados; o índice
+# único (crm, data, horario) faz a segunda recepção a tentar o mesmo horário não inserir nada
+SQL_MARCAR_HORARIO_MODELO = """
+    INSERT IGNORE INTO consulta (horario, data, status, crm, id_paciente)
+    SELECT agenda_modelo.horario, %s, 'A', agenda_modelo.crm, paciente.id_paciente
+    FROM medico
+    INNER JOIN agenda_modelo ON agenda_modelo.crm = medico.crm
+    INNER JOIN paciente ON paciente.cpf = %s
+    WHERE medico.nome = %s AND agenda_modelo.dia_semana = %s AND agenda_modelo.horario = %s
+    LIMIT 1
+    """
+# Horários livres marcados explicitamente ('D' em consulta): liberados ou extras fora do modelo
+SQL_MARCAR_CONSULTA = """
+    UPDATE consulta
+    SET id_paciente = (SELECT id_paciente FROM paciente WHERE cpf = %s LIMIT 1), status = 'A'
+    WHERE crm = (SELECT crm FROM medico WHERE nome = %s LIMIT 1)
+      AND data = %s AND horario = %s AND status = 'D'
+      AND EXISTS (SELECT 1 FROM paciente WHERE cpf = %s)
+    """
+SQL_MOTIVO_RESERVA = """
+    SELECT consulta.status, (SELECT COUNT(*) FROM paciente WHERE cpf = %s)
+    FROM consulta
+    WHERE crm = (SELECT crm FROM medico WHERE nome = %s LIMIT 1) AND data = %s AND horario = %s
+    """
+SQL_EXISTE_USUARIO = "SELECT 1 FROM usuario LIMIT 1"
+SQL_SENHA_USUARIO = "SELECT password FROM usuario WHERE username = %s"
+SQL_CRIAR_USUARIO = "INSERT INTO usuario (username, password) VALUES (%s, %s)"
+
+# Agenda modelo padrão (HORARIOS_PADRAO nos dias de atendimento) para os médicos que não têm nenhuma
+SQL_AGENDA_PADRAO = f"""
+    INSERT INTO agenda_modelo (crm, dia_semana, horario)
+    SELECT medico.crm, dias.dia_semana, horarios.horario
+    FROM medico
+    CROSS JOIN ({" UNION ALL ".join(f"SELECT {dia} AS dia_semana" for dia in range(7) if dia not in DIAS_FECHADOS)}) dias
+    CROSS JOIN ({" UNION ALL ".join(f"SELECT '{horario}' AS horario" for horario in HORARIOS_PADRAO)}) horarios
+    WHERE NOT EXISTS (SELECT 1 FROM agenda_modelo existente WHERE existente.crm = medico.crm)
+    """
+
+
+def _diasDoPeriodo(inicio, fim):
+    """
+    Gera as datas entre inicio e fim, inclusive.
+    """
+    dia = inicio
+    while dia <= fim:
+        yield dia
+        dia += timedelta(days=1)
+
+
+def _chaveHorario(crm, data, horario):
+    """
+    Normaliza (crm, data, horario) para comparação, independente de o banco devolver
+    date/timedelta ou texto.
+    """
+    return str(crm), str(data)[:10], normalizarHorario(horario)
+
+
+def precisaArquivo(data_inicio):
+    """
+    Indica se um período que começa em data_inicio pode ter linhas em consulta_arquivo.
+
+    Só dias anteriores a hoje são arquivados, então períodos a partir de hoje leem apenas a
+    tabela consulta. A decisão não depende de estado em memória, que poderia estar desatualizado
+    se o arquivamento rodar em outro processo.
+    """
+    return not data_inicio or normalizarData(data_inicio) < datetime.today().date()
+
+
+def sqlAgendaPeriodo(crm, data_inicio, data_fim):
+    """
+    Monta a consulta das linhas de agenda de um médico em um período.
+
+    Returns:
+        tuple: (sql, valores). Inclui consulta_arquivo só se o período começar antes de hoje.
+    """
+    valores = (crm, data_inicio, data_fim)
+    if precisaArquivo(data_inicio):
+        return SQL_AGENDA_PERIODO_COM_ARQUIVO, valores * 2
+    return SQL_AGENDA_PERIODO, valores
+
+
+def sqlHistorico(cpf, data_inicio=None, data_fim=None, status=None):
+    """
+    Monta a consulta do histórico médico de um paciente.
+
+    Consultas passadas arquivadas entram por um UNION ALL com consulta_arquivo, com os mesmos
+    filtros, apenas quando o período pedido começa antes de hoje.
+
+    Returns:
+        tuple: (sql, valores), ou (None, None) se nenhum status válido foi pedido.
+    """
+    # Sem repetições e sempre na mesma ordem: um mesmo filtro gera sempre o mesmo comando
+    pedidos = set(status or STATUS_MAP)
+    status = [codigo for codigo in STATUS_MAP if codigo in pedidos]
+    if not status:
+        return None, None
+    filtros = f"paciente.cpf = %s AND consulta.status IN ({', '.join(['%s'] * len(status))})"
+    valores = [cpf, *status]
+    if data_inicio:
+        filtros += " AND consulta.data >= %s"
+        valores.append(data_inicio)
+    if data_fim:
+        filtros += " AND consulta.data <= %s"
+        valores.append(data_fim)
+    tabelas = ["consulta", "consulta_arquivo"] if precisaArquivo(data_inicio) else ["consulta"]
+    sql = " UNION ALL ".join(
+        f"""
+        SELECT consulta.data, consulta.horario, consulta.status, medico.nome
+        FROM paciente
+        INNER JOIN {tabela} consulta ON consulta.id_paciente = paciente.id_paciente
+        INNER JOIN medico ON consulta.crm = medico.crm
+        WHERE {filtros}
+        """
+        for tabela in tabelas
+    )
+    sql += " ORDER BY data, horario"
+    return sql, tuple(valores) * len(tabelas)
+
+
+def formatarHistorico(linhas):
+    """
+    Converte as linhas do histórico em tuplas (data, horário, status, nome do médico) em texto.
+    """
+    return [
+        (f"{data}", f"{horario}", STATUS_MAP.get(codigo, "Desconhecido"), f"{nome_medico}")
+        for data, horario, codigo, nome_medico in linhas
+    ]
+
+
+def montarAgendaModelo(linhas):
+    """
+    Organiza as linhas (dia_semana, horario) da agenda modelo de um médico por dia da semana.
+
+    Returns:
+        tuple: Sete tuplas de horários 'HH:MM:SS' em ordem, indexadas por datetime.weekday().
+    """
+    dias = [[] for _ in range(7)]
+    for dia_semana, horario in linhas:
+        dias[int(dia_semana)].append(normalizarHorario(horario))
+    return tuple(tuple(sorted(horarios)) for horarios in dias)
+
+
+def janelaPadrao(data_inicio=None, data_fim=None, dias=90):
+    """
+    Completa um período de busca na agenda: por padrão, de hoje até dias depois do início.
+
+    Returns:
+        tuple: (data_inicio, data_fim) como date.
+    """
+    data_inicio = normalizarData(data_inicio) if data_inicio else datetime.today().date()
+    data_fim = normalizarData(data_fim) if data_fim else data_inicio + timedelta(days=dias)
+    return data_inicio, data_fim
+
+
+def agendaDoPeriodo(modelo, linhas, data_inicio, data_fim):
+    """
+    Calcula a agenda de um médico em um período a partir da agenda modelo e das linhas de consulta.
+
+    A tabela consulta guarda apenas as exceções ao modelo: horários marcados, realizados,
+    bloqueados ou extras. Um horário do modelo sem linha correspondente está disponível.
+
+    Args:
+        modelo (tuple): Agenda modelo do médico (veja montarAgendaModelo).
+        linhas (iterable): Linhas (id_consulta, data, horario, status) do médico no período.
+        data_inicio (str | date): Primeiro dia do período.
+        data_fim (str | date): Último dia do período (inclusive).
+
+    Yields:
+        tuple: (id_consulta, data, horário, status) em ordem de data e horário. Horários que só
+            existem no modelo têm id_consulta None e status 'D'.
+    """
+    excecoes = {}
+    for id_consulta, data, horario, status in linhas:
+        excecoes.setdefault(normalizarData(data), {})[normalizarHorario(horario)] = (id_consulta, status)
+    for dia in _diasDoPeriodo(normalizarData(data_inicio), normalizarData(data_fim)):
+        do_dia = excecoes.get(dia)
+        if not do_dia:
+            for horario in modelo[dia.weekday()]:
+                yield None, dia, horario, 'D'
+            continue
+        for horario in sorted(set(modelo[dia.weekday()]).union(do_dia)):
+            id_consulta, status = do_dia.get(horario, (None, 'D'))
+            yield id_consulta, dia, horario, status
+
+
+def sqlAgendaMedicos(crms, data_inicio, data_fim):
+    """
+    Monta a busca das linhas de consulta de vários médicos em um período.
+
+    Returns:
+        tuple: (sql, valores). As linhas têm as colunas (crm, id_consulta, data, horario, status).
+    """
+    sql = f"""
+        SELECT crm, id_consulta, data, horario, status
+        FROM consulta
+        WHERE crm IN ({', '.join(['%s'] * len(crms))}) AND data BETWEEN %s AND %s
+        """
+    return sql, (*crms, data_inicio, data_fim)
+
+
+def primeirosHorariosLivres(medicos, modelos, linhas, data_inicio, data_fim, quantidade=5, horarios=None):
+    """
+    Combina as agendas de vários médicos e devolve os primeiros horários livres entre todos eles.
+
+    As agendas são calculadas dia a dia e intercaladas em ordem, parando ao atingir a quantidade.
+
+    Args:
+        medicos (list): Tuplas (crm, nome).
+        modelos (dict): crm -> agenda modelo.
+        linhas (iterable): Linhas (crm, id_consulta, data, horario, status) de sqlAgendaMedicos.
+        data_inicio (date): Primeiro dia do período.
+        data_fim (date): Último dia do período (inclusive).
+        quantidade (int): Quantidade máxima de horários.
+        horarios (list, opcional): Horários aceitos no formato 'HH:MM:SS'.
+
+    Returns:
+        list: Tuplas (data, horário, CRM, nome do médico) ordenadas por data e horário.
+    """
+    por_medico = {}
+    for crm, *linha in linhas:
+        por_medico.setdefault(crm, []).append(linha)
+    aceitos = {normalizarHorario(horario) for horario in horarios} if horarios else None
+    agendas = [
+        (
+            (dia, horario, crm, nome)
+            for _, dia, horario, status in agendaDoPeriodo(modelos[crm], por_medico.get(crm, ()), data_inicio, data_fim)
+            if status == 'D' and (aceitos is None or horario in aceitos)
+        )
+        for crm, nome in medicos
+    ]
+    return [
+        (f"{dia}", horario, crm, nome)
+        for dia, horario, crm, nome in itertools.islice(heapq.merge(*agendas), quantidade)
+    ]
+
+
+def formatarHorariosMedico(linhas):
+    """
+    Converte as linhas de agendaDoPeriodo nas tuplas de texto exibidas pela interface.
+    """
+    return [
+        (
+            f"ID_Consulta: {consulta[0] if consulta[0] is not None else '-'}",
+            f"Data: {consulta[1]}",
+            f"Horário: {consulta[2]}",
+            f"Status: {STATUS_MAP.get(consulta[3], 'Desconhecido')}"
+        )
+        for consulta in linhas
+    ]
+
+
+def somenteLeitura(funcao):
+    """
+    Decorador de métodos de Database que apenas leem: com réplica configurada, eles são atendidos
+    por ela quando possível (veja Database.leitura).
+    """
+    @functools.wraps(funcao)
+    def naLeitura(self, *argumentos, **opcoes):
+        with self.leitura():
+            return funcao(self, *argumentos, **opcoes)
+
+    return naLeitura
+
 
 class Database:
     """
     Classe que gerencia a conexão e operações com o banco de dados do sistema de consultório médico.
     """
 
-    def __init__(self, host="localhost", user="root", password="", database="sistema_consultorio"):
+    # Cache de dados de referência (médicos, especialidades e pacientes) compartilhado pelo processo
+    cache = CacheLRU(tamanho_max=2048, ttl=600)
+
+    # Índice em memória dos horários disponíveis, carregado por carregarDisponibilidade
+    disponibilidade = IndiceDisponibilidade(HORARIOS_PADRAO)
+
+    # Índice em memória de pacientes e médicos por nome, CPF, telefone e CRM, carregado por carregarBusca
+    busca = IndiceBusca()
+
+    # Tabela resumo_agenda, atualizada junto com cada alteração de agenda
+    resumo = ResumoAgenda()
+
+    # Diário das mudanças de status (diario_agenda), gravado junto com cada alteração de agenda
+    diario = DiarioAgenda()
+
+    # Latências e contagens de comandos SQL, coletadas quando metricas.ativar() é chamado
+    metricas = metricas
+
+    # Cursores preparados de cada conexão do pool: conexão -> OrderedDict {sql: (cursor, sql)}, do menos
+    # ao mais usado
+    _preparados = weakref.WeakKeyDictionary()
+
+    # Cursores preparados guardados por conexão. Cada um ocupa um comando preparado no servidor
+    # (limitado por max_prepared_stmt_count no MySQL): acima disso, o menos usado é fechado
+    max_preparados = 64
+
+    # Se False, os comandos frequentes voltam a usar um cursor novo por chamada (usado em benchmarks)
+    usar_preparados = True
+
+    # Se False, as mensagens de sucesso e de aviso destinadas à recepção não são impressas (o serviço
+    # HTTP responde com status e corpo); erros continuam sendo impressos
+    avisos = True
+
+    def __init__(self, host="localhost", user="root", password="", database="sistema_consultorio", backend=None,
+                 replica=None, atraso_max=5.0):
         """
-        Inicializa a conexão com o banco de dados MySQL.
+        Prepara o acesso ao banco de dados pelo pool compartilhado do processo.
+
+        Nenhuma conexão é aberta aqui: ela é retirada do pool no primeiro uso de self.connection,
+        e operações atendidas pelos caches em memória não chegam a ocupar uma conexão.
 
         Args:
             host (str): Endereço do servidor MySQL.
             user (str): Nome de usuário para autenticação no MySQL.
             password (str): Senha para autenticação no MySQL.
             database (str): Nome do banco de dados MySQL a ser utilizado.
+            backend (BackendMySQL | BackendSQLite, opcional): Armazenamento a ser usado. Se informado,
+                os demais parâmetros são ignorados. Por padrão, o MySQL descrito pelos parâmetros.
+            replica (BackendMySQL | BackendSQLite, opcional): Réplica de leitura do mesmo banco, que
+                atende as operações somente leitura (relatórios, histórico, agenda do médico).
+            atraso_max (float): Atraso máximo da réplica, em segundos, para que ela seja usada.
+        """
+        self._conexao = None
+        self._conexao_pool = None
+        self._conectar = True
+        self._leitura = None  # (conexão instrumentada, conexão do pool) da réplica
+        self._lendo = 0
+        self._na_replica = False
+        self.backend = backend or BackendMySQL(host, user, password, database)
+        self.pool = PoolConexoes.compartilhado(self.backend.chave, self.backend.conectar, **self.backend.opcoes_pool)
+        self.replica = ReplicaLeitura(replica, atraso_max) if replica else None
+
+    @property
+    def connection(self):
+        """
+        Conexão com o banco, retirada do pool no primeiro acesso.
+
+        Dentro de um trecho somente leitura atendido pela réplica (veja leitura), é a conexão com a réplica.
+
+        Returns:
+            Conexão pronta para uso, ou None se não foi possível conectar ou se a instância já foi fechada.
+        """
+        if self._na_replica:
+            return self._leitura[0]
+        if self._conectar:
+            self._conectar = False
+            try:
+                self._conexao_pool = self.pool.obter()
+                self._conexao = self.metricas.conexao(ConexaoPrimaria(self._conexao_pool))
+            except self.backend.erros + (TimeoutError, RuntimeError) as erro:
+                print(f"Erro enquanto conecta no banco de dados: {erro}")
+        return self._conexao
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, tipo, valor, traceback):
+        self.fechar()
+
+    def fechar(self):
         """
+        Devolve a conexão ao pool para ser reutilizada por outras instâncias.
+        """
+        self._conectar = False
+        if self._conexao_pool is not None:
+            self.pool.devolver(self._conexao_pool)
+            self._conexao_pool = None
+            self._conexao = None
+        if self._leitura is not None:
+            self.replica.pool.devolver(self._leitura[1])
+            self._leitura = None
+
+    @contextlib.contextmanager
+    def leitura(self):
+        """
+        Trecho somente leitura: as leituras feitas nele por self.connection vão para a réplica.
+
+        A réplica só é usada se estiver configurada, se o atraso dela estiver dentro de atraso_max,
+        se ela já tiver o último commit do processo no primário (cada um lê as próprias escritas) e
+        se esta instância não estiver no meio de uma transação. Caso contrário, ou se a réplica não
+        responder, o trecho lê do primário. A decisão vale para o trecho inteiro, inclusive para os
+        trechos aninhados.
+
+        A leitura das próprias escritas vale por processo: o que outro processo (outro worker do
+        serviço, a interface de outra recepção) gravou pode aparecer na réplica só depois de até
+        atraso_max segundos. Os dados de referência do cache do processo (veja _obterCache) são
+        sempre carregados do primário, mesmo dentro do trecho.
+
+        Yields:
+            Database: A própria instância.
+        """
+        externo = self._lendo == 0
+        self._lendo += 1
+        if externo:
+            self._na_replica = self._replicaAtende()
+        try:
+            yield self
+        finally:
+            self._lendo -= 1
+            if externo:
+                self._na_replica = False
+
+    @contextlib.contextmanager
+    def primario(self):
+        """
+        Trecho que lê do primário mesmo dentro de um trecho somente leitura atendido pela réplica.
+        """
+        na_replica, self._na_replica = self._na_replica, False
+        try:
+            yield self
+        finally:
+            self._na_replica = na_replica
+
+    def _obterCache(self, chave, carregar):
+        # O cache de referência é compartilhado pelo processo e usado também pelas escritas: um valor
+        # lido de uma réplica atrasada (um médico recém-cadastrado dado como inexistente, uma agenda
+        # modelo antiga) ficaria guardado para todos. Na falta, o valor é carregado do primário.
+        valor = self.cache.buscar(chave)
+        if valor is not None:
+            return valor
+        with self.primario():
+            return self.cache.obter(chave, carregar)
+
+    def _replicaAtende(self):
+        if self.replica is None or self._conexao_pool is not None and self._conexao_pool.in_transaction:
+            return False
+        try:
+            if self._leitura is None:
+                conexao = self.replica.pool.obter()
+                self._leitura = (self.metricas.conexao(conexao), conexao)
+            return self.replica.atende(self._leitura[1])
+        except self.replica.backend.erros + (TimeoutError, RuntimeError) as erro:
+            print(f"Réplica indisponível, lendo do primário: {erro}")
+            return False
+
+    def _avisar(self, mensagem):
+        """
+        Imprime uma mensagem para a recepção, a menos que os avisos estejam desligados.
+        """
+        if self.avisos:
+            print(mensagem)
+
+    def _executarPreparado(self, sql, valores=()):
+        """
+        Executa um comando frequente com o cursor preparado da conexão para aquele SQL.
+
+        O servidor analisa e planeja o comando uma única vez por conexão; as execuções seguintes
+        enviam apenas os parâmetros. O cursor fica guardado junto com a conexão no pool, entre os
+        max_preparados usados mais recentemente nela.
+
+        Args:
+            sql (str): Comando SQL com placeholders %s.
+            valores (tuple): Parâmetros do comando.
+
+        Returns:
+            list | int: Linhas do resultado, ou a quantidade de linhas afetadas se o comando não
+                devolver resultado.
+        """
+        if not self.usar_preparados:
+            cursor = self.connection.cursor()
+            try:
+                cursor.execute(sql, valores)
+                return cursor.rowcount if cursor.description is None else cursor.fetchall()
+            finally:
+                cursor.close()
+
+        self.connection  # Retira a conexão do pool, se ainda não retirou
+        conexao = self._leitura[1] if self._na_replica else self._conexao_pool
+        cursores = self._preparados.setdefault(conexao, OrderedDict())
+        preparado = cursores.get(sql)
+        if preparado is None:
+            # Guardado sem instrumentação: as métricas envolvem o cursor a cada uso, conforme estejam
+            # ativas naquele momento, mesmo que tenham sido ligadas depois de ele ser preparado
+            preparado = cursores[sql] = (conexao.cursor(prepared=True), sql)
+            while len(cursores) > self.max_preparados:
+                # Fechar o cursor libera o comando preparado no servidor
+                self._fecharPreparado(cursores.popitem(last=False)[1][0])
+        else:
+            cursores.move_to_end(sql)
+        # O mysql.connector só reaproveita a preparação se receber o mesmo objeto str da primeira execução
+        cursor, sql = preparado
+        try:
+            medido = self.metricas.cursor(cursor)
+            medido.execute(sql, valores)
+            # O resultado é sempre lido inteiro, deixando o cursor pronto para a próxima execução
+            return medido.rowcount if medido.description is None else medido.fetchall()
+        except self.backend.erros:
+            cursores.pop(sql, None)
+            self._fecharPreparado(cursor)
+            raise
+
+    def _fecharPreparado(self, cursor):
         try:
-            self.connection = mysql.connector.connect(host=host, user=user, password=password, database=database)
-        except mysql.connector.Error as erro:
-            print(f"Erro enquanto conecta no MySQL: {erro}")
+            cursor.close()
+        except self.backend.erros:
+            pass
 
+    @instrumentado
     def cadastrarPaciente(self, paciente):
         """
         Cadastra um novo paciente no banco de dados.
 
         Args:
             paciente (Paciente): Objeto Paciente contendo as informações do paciente a ser cadastrado.
+
+        Returns:
+            bool: True se o paciente foi cadastrado, False caso contrário.
         """
         cursor = self.connection.cursor()
         try:
@@ -52,17 +605,24 @@ class Database:
                 self.connection.commit()
 
                 if cursor.rowcount == 1:
-                    print("Paciente cadastrado com sucesso.")
+                    self.cache.invalidar("id_paciente")
+                    if self.busca.carregado:
+                        self.busca.atualizar(PACIENTE, paciente.cpf, nome_completo, paciente.telefone)
+                    self._avisar("Paciente cadastrado com sucesso.")
+                    return True
                 else:
                     print("Erro ao cadastrar paciente, tente novamente.")
             else:
                 print("Erro ao cadastrar endereço, tente novamente.")
-        except mysql.connector.Error as e:
+            return False
+        except self.backend.erros as e:
             print(f"Erro: {e}")
             self.connection.rollback()
+            return False
         finally:
             cursor.close()
 
+    @instrumentado
     def descobrirIdPaciente(self, cpf):
         """
         Obtém o ID de um paciente a partir do CPF.
@@ -73,28 +633,30 @@ class Database:
         Returns:
             int: ID do paciente encontrado, ou None se não encontrado.
         """
-        cursor = self.connection.cursor()
+        return self._obterCache(("id_paciente", cpf), lambda: self._descobrirIdPacienteNoBanco(cpf))
+
+    def _descobrirIdPacienteNoBanco(self, cpf):
         try:
-            sql = "SELECT id_paciente FROM paciente WHERE cpf = %s"
-            cursor.execute(sql, (cpf,))
-            resultado = cursor.fetchone()
+            resultado = self._executarPreparado(SQL_ID_PACIENTE, (cpf,))
             if resultado:
-                return resultado[0]  # Retorna o ID do paciente encontrado
+                return resultado[0][0]  # Retorna o ID do paciente encontrado
             else:
-                print("Paciente não encontrado.")
+                self._avisar("Paciente não encontrado.")
                 return None
-        except mysql.connector.Error as e:
+        except self.backend.erros as e:
             print(f"Erro ao buscar ID do paciente: {e}")
             return None
-        finally:
-            cursor.close()
 
+    @instrumentado
     def cadastrarMedico(self, medico):
         """
         Cadastra um novo médico no banco de dados.
 
         Args:
             medico (Medico): Objeto Medico contendo as informações do médico a ser cadastrado.
+
+        Returns:
+            bool: True se o médico foi cadastrado, False caso contrário.
         """
         cursor = self.connection.cursor()
         try:
@@ -137,62 +699,21 @@ class Database:
 
             # Commita a transação
             self.connection.commit()
-            print("Médico adicionado com sucesso.")
+            self.cache.invalidar("crm", "nome", "especialidades", "medicos_especialidade")
+            if self.busca.carregado:
+                self.busca.atualizar(MEDICO, medico.get_crm, nome_completo, medico.get_telefone)
+            self._avisar("Médico adicionado com sucesso.")
+            return True
         except Exception as e:
             # Em caso de erro, faz rollback da transação
             self.connection.rollback()
             print(f"Erro ao cadastrar médico: {e}")
+            return False
         finally:
             # Fecha o cursor
             cursor.close()
 
-    def padronizadoConsultas(self):
-        cursor = self.connection.cursor()
-        dias_ano = []
-        data = datetime.today()
-        ano_atual = data.year
-
-        while data.year == ano_atual:
-            dias_ano.append(data.strftime('%Y-%m-%d'))
-            data += timedelta(days=1)
-
-        try:
-            sql = "SELECT crm FROM medico"
-            cursor.execute(sql)
-            medicos = cursor.fetchall()
-
-            horas = ["07:00:00", "08:00:00", "09:00:00", "10:00:00",
-                     "13:00:00", "14:00:00", "15:00:00", "16:00:00", "17:00:00"]
-
-            for medico in medicos:
-                crm = medico[0]
-                for dia in dias_ano:
-                    if datetime.strptime(dia, '%Y-%m-%d').weekday() not in (6, 0):
-                        for hora in horas:
-                            sql_check = "SELECT COUNT(*) FROM consulta WHERE crm = %s AND data = %s AND horario = %s"
-                            cursor.execute(sql_check, (crm, dia, hora))
-                            result = cursor.fetchone()
-
-                            if result[0] == 0:
-                                sql_insert = "INSERT INTO consulta (horario, data, status, crm) VALUES (%s, %s, 'D', %s)"
-                                cursor.execute(sql_insert, (hora, dia, crm))
-                    else:
-                        for hora in horas:
-                            sql_check = "SELECT COUNT(*) FROM consulta WHERE crm = %s AND data = %s AND horario = %s"
-                            cursor.execute(sql_check, (crm, dia, hora))
-                            result = cursor.fetchone()
-
-                            if result[0] == 0:
-                                sql_insert = "INSERT INTO consulta (horario, data, status, crm) VALUES (%s, %s, 'I', %s)"
-                                cursor.execute(sql_insert, (hora, dia, crm))
-
-            self.connection.commit()
-        except mysql.connector.Error as e:
-            print(f"Erro: {e}")
-            self.connection.rollback()
-        finally:
-            cursor.close()
-
+    @instrumentado
     def descobrirNome(self, crm):
         """
         Obtém o nome de um médico a partir do CRM.
@@ -203,17 +724,16 @@ class Database:
         Returns:
             str: Nome do médico encontrado, ou None se não encontrado.
         """
-        cursor = self.connection.cursor()
+        return self._obterCache(("nome", crm), lambda: self._descobrirNomeNoBanco(crm))
+
+    def _descobrirNomeNoBanco(self, crm):
         try:
-            sql_checknome = "SELECT nome FROM medico WHERE crm = %s"
-            cursor.execute(sql_checknome, (crm,))
-            nome = cursor.fetchone()
-            return nome[0] if nome else None
-        except mysql.connector.Error as e:
+            nome = self._executarPreparado(SQL_NOME_POR_CRM, (crm,))
+            return nome[0][0] if nome else None
+        except self.backend.erros as e:
             print(f"Erro: {e}")
-        finally:
-            cursor.close()
 
+    @instrumentado
     def descobrirCrm(self, nome_dr):
         """
         Descobre o CRM de um médico dado seu nome.
@@ -224,17 +744,16 @@ class Database:
         Returns:
             str: CRM do médico se encontrado, None caso contrário.
         """
-        cursor = self.connection.cursor()
+        return self._obterCache(("crm", nome_dr), lambda: self._descobrirCrmNoBanco(nome_dr))
+
+    def _descobrirCrmNoBanco(self, nome_dr):
         try:
-            sql_checkcrm = "SELECT crm FROM medico WHERE nome = %s"
-            cursor.execute(sql_checkcrm, (nome_dr,))
-            crm = cursor.fetchone()
-            return crm[0] if crm else None
-        except mysql.connector.Error as e:
+            crm = self._executarPreparado(SQL_CRM_POR_NOME, (nome_dr,))
+            return crm[0][0] if crm else None
+        except self.backend.erros as e:
             print(f"Erro: {e}")
-        finally:
-            cursor.close()
 
+    @instrumentado
     def indisponibilizarHorario(self, nome_dr, data, horario):
         """
         Indisponibiliza um horário de consulta para um médico específico em uma data específica.
@@ -243,58 +762,94 @@ class Database:
             nome_dr (str): Nome do médico.
             data (str): Data da consulta no formato 'YYYY-MM-DD'.
             horario (str): Horário da consulta no formato 'HH:MM:SS'.
+
+        Returns:
+            str: Status anterior do horário, None se ele não existir, ou HORARIO_ERRO em caso de erro.
         """
         crm = self.descobrirCrm(nome_dr)
         cursor = self.connection.cursor()
         try:
-            sql_check = "SELECT status FROM consulta WHERE crm = %s AND data = %s AND horario = %s"
-            cursor.execute(sql_check, (crm, data, horario))
-            status = cursor.fetchone()
-
-            sql_indisp = "UPDATE consulta SET status = 'I' WHERE crm = %s AND data = %s AND horario = %s"
-            cursor.execute(sql_indisp, (crm, data, horario))
+            status = self._executarPreparado(SQL_STATUS_HORARIO, (crm, data, horario))
+            status = status[0] if status else None
+
+            if status:
+                self._executarPreparado(SQL_INDISPONIBILIZAR, (crm, data, horario))
+            elif self._noModelo(crm, data, horario):
+                # Horário livre pela agenda modelo: o bloqueio é gravado como exceção
+                self._executarPreparado(SQL_CRIAR_HORARIO, (horario, data, 'I', crm))
+                status = ('D',)
+            if status:
+                self._registrarTransicoes(cursor, [(crm, data, horario, status[0], 'I')])
             self.connection.commit()
+            if status:
+                self._atualizarDisponibilidade(nome_dr, data, horario, False)
 
-            if status and status[0] == 'A':
-                print('Consulta desmarcada.')
+            if not status:
+                self._avisar('Horário não encontrado.')
+            elif status[0] == 'A':
+                self._avisar('Consulta desmarcada.')
             else:
-                print('Horário indisponibilizado.')
-        except mysql.connector.Error as e:
+                self._avisar('Horário indisponibilizado.')
+            return status[0] if status else None
+        except self.backend.erros as e:
             print(f"Erro: {e}")
             self.connection.rollback()
+            return HORARIO_ERRO
         finally:
             cursor.close()
 
+    @instrumentado
     def disponibilizarHorario(self, nome_dr, data, horario):
         """
         Disponibiliza um horário de consulta para um médico específico em uma data específica.
 
+        Um horário que não faz parte da agenda modelo do médico é criado como horário extra.
+
         Args:
             nome_dr (str): Nome do médico.
             data (str): Data da consulta no formato 'YYYY-MM-DD'.
             horario (str): Horário da consulta no formato 'HH:MM:SS'.
+
+        Returns:
+            str: Status anterior do horário, HORARIO_NOVO se ele foi criado como horário extra, None se
+                o médico não existir, ou HORARIO_ERRO em caso de erro.
         """
         crm = self.descobrirCrm(nome_dr)
         cursor = self.connection.cursor()
         try:
-            sql_check = "SELECT status FROM consulta WHERE crm = %s AND data = %s AND horario = %s"
-            cursor.execute(sql_check, (crm, data, horario))
-            status = cursor.fetchone()
-
-            sql_disp = "UPDATE consulta SET status = 'D' WHERE crm = %s AND data = %s AND horario = %s"
-            cursor.execute(sql_disp, (crm, data, horario))
+            status = self._executarPreparado(SQL_STATUS_HORARIO, (crm, data, horario))
+            status = status[0] if status else None
+            novo = False
+
+            if status:
+                self._executarPreparado(SQL_DISPONIBILIZAR, (crm, data, horario))
+            elif self._noModelo(crm, data, horario):
+                status = ('D',)  # Já livre pela agenda modelo: nada a gravar
+            elif crm is not None:
+                self._executarPreparado(SQL_CRIAR_HORARIO, (horario, data, 'D', crm))
+                self._registrarTransicoes(cursor, [(crm, data, horario, None, 'D')])
+                novo = True
+            if status:
+                self._registrarTransicoes(cursor, [(crm, data, horario, status[0], 'D')])
             self.connection.commit()
+            if crm is not None:
+                self._atualizarDisponibilidade(nome_dr, data, horario, True)
 
             if status and status[0] == 'A':
-                print('Consulta desmarcada.')
+                self._avisar('Consulta desmarcada.')
             else:
-                print('Horário disponibilizado.')
-        except mysql.connector.Error as e:
+                self._avisar('Horário disponibilizado.')
+            if novo:
+                return HORARIO_NOVO
+            return status[0] if status else None
+        except self.backend.erros as e:
             print(f"Erro: {e}")
             self.connection.rollback()
+            return HORARIO_ERRO
         finally:
             cursor.close()
 
+    @instrumentado
     def listarEspecialidades(self):
         """
         Lista todas as especialidades cadastradas no sistema.
@@ -303,18 +858,21 @@ class Database:
             list: Lista de tuplas contendo as especialidades cadastradas.
                   Cada tupla contém um único valor de especialidade.
         """
+        return self._obterCache(("especialidades",), self._listarEspecialidadesNoBanco)
+
+    def _listarEspecialidadesNoBanco(self):
         cursor = self.connection.cursor()
         try:
-            sql = "SELECT especialidade FROM especialidade"
-            cursor.execute(sql)
+            cursor.execute(SQL_ESPECIALIDADES)
             especialidades = cursor.fetchall()
             return especialidades
-        except mysql.connector.Error as e:
+        except self.backend.erros as e:
             print(f"Erro ao listar especialidades: {e}")
             return None
         finally:
             cursor.close()
 
+    @instrumentado
     def mostrarMedicosPorEspecialidade(self, especialidade):
         """
         Lista todos os médicos associados a uma especialidade específica.
@@ -325,35 +883,125 @@ class Database:
         Returns:
             list: Lista de tuplas contendo os CRM e nomes dos médicos associados à especialidade.
         """
-        cursor = self.connection.cursor()
+        return self._obterCache(
+            ("medicos_especialidade", especialidade),
+            lambda: self._mostrarMedicosPorEspecialidadeNoBanco(especialidade)
+        )
+
+    def _mostrarMedicosPorEspecialidadeNoBanco(self, especialidade):
         try:
             # Primeiro, obtemos o ID da especialidade
-            sql_especialidade_id = "SELECT especialidade_id FROM especialidade WHERE especialidade = %s"
-            cursor.execute(sql_especialidade_id, (especialidade,))
-            especialidade_id = cursor.fetchone()
+            especialidade_id = self._executarPreparado(SQL_ESPECIALIDADE_ID, (especialidade,))
 
             if especialidade_id:
-                especialidade_id = especialidade_id[0]
+                especialidade_id = especialidade_id[0][0]
 
                 # Agora buscamos os médicos associados a essa especialidade pelo ID na tabela especialidade_medico
-                sql = """
-                    SELECT medico.crm, medico.nome
-                    FROM medico
-                    INNER JOIN especialidade_medico ON medico.crm = especialidade_medico.crm
-                    WHERE especialidade_medico.especialidade_id = %s
-                """
-                cursor.execute(sql, (especialidade_id,))
-                medicos = cursor.fetchall()
+                medicos = self._executarPreparado(SQL_MEDICOS_POR_ESPECIALIDADE, (especialidade_id,))
                 return medicos
             else:
-                print(f"Especialidade '{especialidade}' não encontrada.")
+                self._avisar(f"Especialidade '{especialidade}' não encontrada.")
                 return None
         except Exception as e:
             print(f"Erro ao buscar médicos por especialidade: {e}")
             return None
+
+    @instrumentado
+    def bloquearPeriodo(self, crm, data_inicio, data_fim, dias_semana=None, horarios=None):
+        """
+        Torna indisponíveis, de uma vez, os horários de um médico em um período (férias, congressos).
+
+        Horários livres da agenda modelo ganham uma linha 'I' e linhas existentes livres ou agendadas
+        passam a 'I', tudo em uma transação: uma leitura do período, um UPDATE e um INSERT de várias
+        linhas. Consultas agendadas no período são desmarcadas e devolvidas para remarcação.
+
+        Args:
+            crm (str): CRM do médico.
+            data_inicio (str): Primeiro dia no formato 'YYYY-MM-DD'.
+            data_fim (str): Último dia (inclusive).
+            dias_semana (iterable, opcional): Dias da semana afetados (0 = segunda-feira). Por padrão, todos.
+            horarios (iterable, opcional): Horários 'HH:MM:SS' afetados. Por padrão, todos.
+
+        Returns:
+            list: Tuplas (id_consulta, data, horário, CPF, nome do paciente) das consultas desmarcadas,
+                  ou None em caso de erro.
+        """
+        return self._alterarPeriodo(crm, data_inicio, data_fim, dias_semana, horarios, 'I')
+
+    @instrumentado
+    def liberarPeriodo(self, crm, data_inicio, data_fim, dias_semana=None, horarios=None):
+        """
+        Disponibiliza, de uma vez, os horários indisponíveis de um médico em um período.
+
+        Consultas agendadas não são alteradas. Veja bloquearPeriodo.
+
+        Returns:
+            list: Sempre vazia (nenhuma consulta é desmarcada), ou None em caso de erro.
+        """
+        return self._alterarPeriodo(crm, data_inicio, data_fim, dias_semana, horarios, 'D')
+
+    def _alterarPeriodo(self, crm, data_inicio, data_fim, dias_semana, horarios, novo):
+        data_inicio, data_fim = normalizarData(data_inicio), normalizarData(data_fim)
+        dias_semana = set(range(7) if dias_semana is None else dias_semana)
+        horarios = None if horarios is None else {normalizarHorario(horario) for horario in horarios}
+
+        def afetado(dia, horario):
+            return dia.weekday() in dias_semana and (horarios is None or horario in horarios)
+
+        # Bloquear alcança livres e agendados; liberar, só os indisponíveis
+        alteraveis = ('D', 'A') if novo == 'I' else ('I',)
+        cursor = self.connection.cursor()
+        try:
+            modelo = self.agendaModelo(crm)
+            cursor.execute(SQL_LINHAS_PERIODO, (crm, data_inicio, data_fim))
+            gravados = set()
+            ids = []
+            transicoes = []
+            desmarcadas = []
+            for id_consulta, data, horario, status, cpf, nome in cursor.fetchall():
+                dia, horario = normalizarData(data), normalizarHorario(horario)
+                gravados.add((dia, horario))
+                if status in alteraveis and afetado(dia, horario):
+                    ids.append(id_consulta)
+                    transicoes.append((crm, dia, horario, status, novo))
+                    if status == 'A':
+                        desmarcadas.append((id_consulta, dia, horario, cpf, nome))
+            novos = []
+            if novo == 'I':
+                # Horários livres só pela agenda modelo: INSERT sem IGNORE, para que uma marcação
+                # concorrente no mesmo horário faça o bloqueio inteiro falhar em vez de ser ignorada
+                novos = [
+                    (horario, dia, 'I', crm)
+                    for dia in _diasDoPeriodo(data_inicio, data_fim)
+                    for horario in modelo[dia.weekday()]
+                    if (dia, horario) not in gravados and afetado(dia, horario)
+                ]
+                transicoes += [(crm, dia, horario, 'D', 'I') for horario, dia, _, _ in novos]
+            if ids:
+                # Consultas desmarcadas pelo bloqueio deixam de pertencer ao paciente
+                cursor.execute(
+                    "UPDATE consulta SET status = %s, id_paciente = CASE WHEN status = 'A' THEN NULL ELSE id_paciente END "
+                    f"WHERE id_consulta IN ({', '.join(['%s'] * len(ids))})",
+                    (novo, *ids)
+                )
+            if novos:
+                cursor.executemany(SQL_CRIAR_HORARIO, novos)
+            self._registrarTransicoes(cursor, transicoes)
+            self.connection.commit()
+            if self.disponibilidade.carregado:
+                for _, dia, horario, _, _ in transicoes:
+                    self.disponibilidade.atualizar(crm, dia, horario, novo == 'D')
+            self._avisar(f"{len(transicoes)} horários {'indisponibilizados' if novo == 'I' else 'disponibilizados'}"
+                         + (f", {len(desmarcadas)} consultas desmarcadas." if desmarcadas else "."))
+            return desmarcadas
+        except self.backend.erros as e:
+            print(f"Erro ao alterar horários do período: {e}")
+            self.connection.rollback()
+            return None
         finally:
             cursor.close()
 
+    @instrumentado
     def mostrarConsultasDisponiveis(self, crm, dia):
         """
         Lista todas as consultas disponíveis para um médico em um determinado dia.
@@ -365,392 +1013,447 @@ class Database:
         Returns:
             list: Lista de tuplas contendo data, horário, status e nome do médico das consultas disponíveis.
         """
-        cursor = self.connection.cursor()
         try:
-            sql = """
-                SELECT consulta.data, consulta.horario, consulta.status, medico.nome
-                FROM consulta
-                INNER JOIN medico ON consulta.crm = medico.crm
-                WHERE consulta.crm = %s AND consulta.data = %s AND consulta.status = 'D'
-                """
-            cursor.execute(sql, (crm, dia))
-            consultas = cursor.fetchall()
-            return consultas
+            modelo = self.agendaModelo(crm)
+            linhas = self._executarPreparado(*sqlAgendaPeriodo(crm, dia, dia))
+            nome = self.descobrirNome(crm)
+            return [
+                (data, horario, status, nome)
+                for _, data, horario, status in agendaDoPeriodo(modelo, linhas, dia, dia)
+                if status == 'D'
+            ]
         except Exception as e:
             print(f"Erro: {e}")
-        finally:
-            cursor.close()
 
-    def marcarConsulta(self, nome_dr, data, hora, cpf):
+    @instrumentado
+    def buscarPrimeirosHorarios(self, especialidade, quantidade=5, data_inicio=None, data_fim=None, horarios=None):
         """
-        Marca uma consulta para um paciente com um médico específico.
+        Busca os primeiros horários disponíveis entre todos os médicos de uma especialidade.
 
         Args:
-            nome_dr (str): Nome do médico.
-            data (str): Data da consulta no formato 'YYYY-MM-DD'.
-            hora (str): Horário da consulta no formato 'HH:MM:SS'.
-            cpf (str): CPF do paciente.
+            especialidade (str): Nome da especialidade.
+            quantidade (int): Quantidade máxima de horários retornados.
+            data_inicio (str, opcional): Início da janela no formato 'YYYY-MM-DD'. Por padrão, hoje.
+            data_fim (str, opcional): Fim da janela (inclusive). Por padrão, 90 dias após o início.
+            horarios (list, opcional): Horários aceitos no formato 'HH:MM:SS' (por exemplo HORARIOS_MANHA).
+
+        Returns:
+            list: Tuplas (data, horário, CRM, nome do médico) ordenadas por data e horário.
         """
-        crm = self.descobrirCrm(nome_dr)
-        id_paciente = self.descobrirIdPaciente(cpf)
-        cursor = self.connection.cursor()
+        medicos = self.mostrarMedicosPorEspecialidade(especialidade)
+        if not medicos:
+            return []
+        data_inicio, data_fim = janelaPadrao(data_inicio, data_fim)
         try:
-            sql = "UPDATE consulta SET id_paciente = %s, status = 'A' WHERE crm = %s AND data = %s AND horario = %s"
-            cursor.execute(sql, (id_paciente, crm, data, hora))
-            self.connection.commit()
-            if cursor.rowcount == 1:
-                print("Consulta marcada com sucesso!")
-            else:
-                print("Erro ao marcar consulta.")
-        except mysql.connector.Error as e:
-            print(f"Erro: {e}")
-            self.connection.rollback()
-        finally:
-            cursor.close()
+            modelos = {crm: self.agendaModelo(crm) for crm, _ in medicos}
+            sql, valores = sqlAgendaMedicos([crm for crm, _ in medicos], data_inicio, data_fim)
+            cursor = self.connection.cursor()
+            try:
+                cursor.execute(sql, valores)
+                linhas = cursor.fetchall()
+            finally:
+                cursor.close()
+            return primeirosHorariosLivres(medicos, modelos, linhas, data_inicio, data_fim, quantidade, horarios)
+        except self.backend.erros as e:
+            print(f"Erro ao buscar horários disponíveis: {e}")
+            return []
+
+    @instrumentado
+    def carregarDisponibilidade(self):
+        """
+        Carrega o índice em memória de horários disponíveis a partir de hoje.
+
+        Depois de carregado, o índice é mantido por marcarConsulta, disponibilizarHorario,
+        indisponibilizarHorario e padronizadoConsultas, e alcança as mudanças feitas por outros
+        processos com sincronizarDisponibilidade.
+        """
+        try:
+            # Lida antes da carga: o que for registrado durante a carga é reaplicado depois, sem efeito
+            sequencia = self.diario.ultimaSequencia(self)
+            self.disponibilidade.carregar(self)
+            self.disponibilidade.sequencia = sequencia
+        except self.backend.erros as e:
+            print(f"Erro ao carregar disponibilidade: {e}")
+
+    @instrumentado
+    def sincronizarDisponibilidade(self, tamanho_lote=1000):
+        """
+        Aplica ao índice de disponibilidade as transições registradas no diário desde a última
+        sincronização, inclusive as feitas por outros processos, sem recarregar o índice.
 
-    def historicoMedico(self, cpf):
+        Returns:
+            int: Quantidade de transições aplicadas.
+        """
+        if not self.disponibilidade.carregado:
+            self.carregarDisponibilidade()
+            return 0
+        total = 0
+        try:
+            while True:
+                lote = self.diario.ler(self, self.disponibilidade.sequencia, tamanho_lote)
+                for transicao in lote:
+                    self.disponibilidade.atualizar(transicao.crm, transicao.data, transicao.horario,
+                                                   transicao.status_novo == 'D')
+                if lote:
+                    self.disponibilidade.sequencia = lote[-1].seq
+                total += len(lote)
+                if len(lote) < tamanho_lote:
+                    return total
+        except self.backend.erros as e:
+            print(f"Erro ao sincronizar disponibilidade: {e}")
+            return total
+
+    @instrumentado
+    def carregarBusca(self):
         """
-        Retorna o histórico de consultas de um paciente.
+        Carrega o índice em memória de busca de pacientes e médicos.
+
+        Depois de carregado, o índice é mantido por cadastrarPaciente, cadastrarMedico,
+        atualizarPaciente, atualizarMedico e pela importação de CSV.
+        """
+        try:
+            self.busca.carregar(self)
+        except self.backend.erros as e:
+            print(f"Erro ao carregar índice de busca: {e}")
+
+    @instrumentado
+    def buscarCadastros(self, texto, tipo=None, limite=10):
+        """
+        Procura pacientes e médicos por parte do nome, início do CPF, do telefone ou do CRM, tolerando
+        erros de digitação no nome. Consulta apenas o índice em memória.
 
         Args:
-            cpf (str): CPF do paciente.
+            texto (str): Texto pesquisado, por exemplo "ana sou" ou "123.4".
+            tipo (str, opcional): "paciente" ou "medico". Por padrão, ambos.
+            limite (int): Quantidade máxima de resultados.
 
         Returns:
-            list: Lista de tuplas contendo informações das consultas (data, horário, status e nome do médico).
+            list: Tuplas (tipo, CPF ou CRM, nome), as que casam por prefixo primeiro.
         """
-        cursor = self.connection.cursor()
-        try:
-            sql_paciente = "SELECT id_paciente FROM paciente WHERE cpf = %s"
-            val_paciente = (cpf,)
-            cursor.execute(sql_paciente, val_paciente)
-            resultado_paciente = cursor.fetchone()
-
-            if resultado_paciente:
-                id_paciente = resultado_paciente[0]
-
-                sql_consultas = """
-                          SELECT consulta.data, consulta.horario, consulta.status, medico.crm
-                          FROM consulta 
-                          INNER JOIN medico  ON consulta.crm = medico.crm
-                          WHERE consulta.id_paciente = %s AND consulta.status IN ('I', 'R', 'A','D')
-                          """
-                val_consultas = (id_paciente,)
-                cursor.execute(sql_consultas, val_consultas)
-                resultados_consultas = cursor.fetchall()
-
-                if resultados_consultas:
-                    lista_consultas = []
-                    status_map = {'I': 'Indisponível', 'R': 'Realizada', 'A': 'Agendada', 'D': 'Disponível'}
-
-                    for consulta in resultados_consultas:
-                        status_formatado = status_map.get(consulta[2], "Desconhecido")
-                        nome_medico = self.descobrirNome(consulta[3])
-                        consulta_tupla = (
-                            f"{consulta[0]}",
-                            f"{consulta[1]}",
-                            f"{status_formatado}",
-                            f"{nome_medico}"
-                        )
-                        lista_consultas.append(consulta_tupla)
-
-                    return lista_consultas
-            return None
-        except mysql.connector.Error as e:
-            print(f"Erro: {e}")
-        finally:
-            cursor.close()
+        if not self.busca.carregado:
+            self.carregarBusca()
+        return self.busca.buscar(texto, tipo, limite)
+
+    def diasComHorarioLivre(self, crm, data_inicio, data_fim, horarios=None):
+        """
+        Lista os dias em que um médico tem horário livre, consultando apenas o índice em memória.
+
+        Args:
+            crm (str): CRM do médico.
+            data_inicio (str): Primeiro dia do período no formato 'YYYY-MM-DD'.
+            data_fim (str): Último dia do período no formato 'YYYY-MM-DD'.
+            horarios (list, opcional): Horários de interesse (por exemplo HORARIOS_MANHA).
+
+        Returns:
+            list: Datas com ao menos um dos horários livre.
+        """
+        if not self.disponibilidade.carregado:
+            self.carregarDisponibilidade()
+        mascara = self.disponibilidade.mascara(horarios)
+        return self.disponibilidade.diasLivres(crm, data_inicio, data_fim, mascara)
+
+    def _registrarTransicoes(self, cursor, transicoes):
+        """
+        Registra mudanças de status de horários nas estruturas derivadas da agenda, dentro da
+        transação que fez a mudança.
+
+        Args:
+            cursor: Cursor da transação em andamento.
+            transicoes (list): Tuplas (crm, data, horario, status_anterior, status_novo).
+        """
+        for sql, linhas in self.comandosTransicoes(transicoes):
+            cursor.executemany(sql, linhas)
+
+    @classmethod
+    def comandosTransicoes(cls, transicoes):
+        """
+        Monta os comandos (sql, linhas) que registram as transições, para execução com executemany.
+        """
+        transicoes = list(transicoes)
+        return [comando for comando in (cls.resumo.comando(transicoes), cls.diario.comando(transicoes)) if comando]
+
+    def _atualizarDisponibilidade(self, nome_dr, data, horario, disponivel):
+        if self.disponibilidade.carregado:
+            self.disponibilidade.atualizar(self.descobrirCrm(nome_dr), data, horario, disponivel)
 
-    def mostrarHorarios(self, nome_dr):
+    @instrumentado
+    def marcarConsulta(self, nome_dr, data, hora, cpf):
         """
-        Mostra os horários de consulta disponíveis de um médico.
+        Marca uma consulta para um paciente com um médico específico.
+
+        Um horário livre pela agenda modelo é marcado com um único INSERT que resolve o médico, o
+        paciente e o modelo por junções; o índice único de (crm, data, horario) garante que só uma
+        de duas recepções marcando o mesmo horário ao mesmo tempo consiga inserir. Um horário livre
+        gravado em consulta (liberado ou extra) é marcado por um UPDATE que só o altera se ele ainda
+        estiver disponível ('D'). Assim, as recepções nunca sobrescrevem uma à outra.
 
         Args:
             nome_dr (str): Nome do médico.
+            data (str): Data da consulta no formato 'YYYY-MM-DD'.
+            hora (str): Horário da consulta no formato 'HH:MM:SS'.
+            cpf (str): CPF do paciente.
 
         Returns:
-            list: Lista de tuplas contendo informações dos horários de consulta (ID_Consulta, Data, Horário, Status).
+            str: RESERVA_MARCADA se a consulta foi marcada, RESERVA_OCUPADA se o horário já estava
+                 agendado ou indisponível, ou RESERVA_INVALIDA se médico, paciente ou horário não existem
+                 (ou em caso de erro).
         """
-        crm = self.descobrirCrm(nome_dr)
         cursor = self.connection.cursor()
         try:
-            sql_horarios = """
-                      SELECT c.id_consulta, c.data, c.horario, c.status
-                      FROM consulta c
-                      INNER JOIN medico m ON c.crm = m.crm
-                      WHERE c.crm = %s
-                      """
-            val = (crm,)
-            cursor.execute(sql_horarios, val)
-            resultados = cursor.fetchall()
-
-            if resultados:
-                lista_horarios = []
-                status_map = {'I': 'Indisponível', 'R': 'Realizada', 'A': 'Agendada', 'D': 'Disponível'}
-
-                for consulta in resultados:
-                    status_formatado = status_map.get(consulta[3], "Desconhecido")
-                    horario_tupla = (
-                        f"ID_Consulta: {consulta[0]}",
-                        f"Data: {consulta[1]}",
-                        f"Horário: {consulta[2]}",
-                        f"Status: {status_formatado}"
-                    )
-                    lista_horarios.append(horario_tupla)
-
-                return lista_horarios
+            dia = normalizarData(data)
+            marcadas = self._executarPreparado(
+                SQL_MARCAR_HORARIO_MODELO, (dia, cpf, nome_dr, dia.weekday(), normalizarHorario(hora))
+            )
+            if marcadas != 1:
+                marcadas = self._executarPreparado(SQL_MARCAR_CONSULTA, (cpf, nome_dr, data, hora, cpf))
+            if marcadas == 1:
+                self._registrarTransicoes(cursor, [(self.descobrirCrm(nome_dr), data, hora, 'D', 'A')])
+            self.connection.commit()
+            if marcadas == 1:
+                self._atualizarDisponibilidade(nome_dr, data, hora, False)
+                self._avisar("Consulta marcada com sucesso!")
+                return RESERVA_MARCADA
+
+            # Caminho lento, só quando a marcação falha: descobre o motivo para informar a recepção
+            resultado = self._motivoReservaRecusada(nome_dr, data, hora, cpf)
+            if resultado == RESERVA_OCUPADA:
+                self._avisar("Horário já ocupado ou indisponível. Escolha outro horário.")
             else:
-                print("Nenhuma consulta identificada.")
-                return None
-        except mysql.connector.Error as e:
+                self._avisar("Não foi possível marcar a consulta: médico, paciente ou horário não encontrado.")
+            return resultado
+        except self.backend.erros + (ValueError,) as e:
             print(f"Erro: {e}")
+            self.connection.rollback()
+            return RESERVA_INVALIDA
         finally:
             cursor.close()
 
-    def criar_adm(self, username, password):
+    def _motivoReservaRecusada(self, nome_dr, data, hora, cpf):
+        linhas = self._executarPreparado(SQL_MOTIVO_RESERVA, (cpf, nome_dr, data, hora))
+        linha = linhas[0] if linhas else None
+        if linha and linha[1] and linha[0] != 'D':
+            return RESERVA_OCUPADA
+        return RESERVA_INVALIDA
+
+    @instrumentado
+    def padronizadoConsultas(self):
         """
-        Cria um novo administrador no sistema.
+        Cria a agenda modelo padrão para os médicos que ainda não têm uma.
 
-        Args:
-            username (str): Nome de usuário do administrador.
-            password (str): Senha do administrador.
+        A agenda modelo tem os HORARIOS_PADRAO em todos os dias de atendimento. Nenhuma linha de
+        consulta é criada: os horários livres são calculados a partir do modelo, e uma linha só
+        aparece quando um horário é marcado, bloqueado ou criado como extra.
 
         Returns:
-            bool: True se o administrador foi criado com sucesso, False caso contrário.
+            int: Quantidade de horários semanais criados nas agendas modelo.
         """
         cursor = self.connection.cursor()
         try:
-            cursor.execute("SELECT COUNT(*) FROM usuario")
-            count = cursor.fetchone()[0]
-            if count > 0:
-                print("Administrador já existente.")
-                return True
-            else:
-                hashed_password = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(8))
-                cursor.execute(
-                    "INSERT INTO usuario (username, password) VALUES (%s, %s)",
-                    (username, hashed_password.decode('utf-8'))
-                )
-                self.connection.commit()
-                print("Administrador criado com sucesso.")
-                return True
-        except mysql.connector.Error as e:
-            print(f"Erro ao criar administrador: {e}")
+            cursor.execute(SQL_AGENDA_PADRAO)
+            criados = cursor.rowcount
+            self.connection.commit()
+            self.cache.invalidar("agenda_modelo")
+            if self.disponibilidade.carregado and criados:
+                cursor.execute("SELECT crm, dia_semana, horario FROM agenda_modelo")
+                self.disponibilidade.definirModelos(cursor.fetchall())
+            return criados
+        except self.backend.erros as e:
+            print(f"Erro: {e}")
             self.connection.rollback()
-            return False
+            return 0
         finally:
             cursor.close()
 
-    def autenticar_usuario(self, username, password):
+    @instrumentado
+    def agendaModelo(self, crm):
         """
-        Autentica um usuário no sistema.
+        Obtém a agenda modelo semanal de um médico.
 
         Args:
-            username (str): Nome de usuário.
-            password (str): Senha do usuário.
+            crm (str): CRM do médico.
 
         Returns:
-            bool: True se a autenticação for bem-sucedida, False caso contrário.
+            tuple: Sete tuplas de horários 'HH:MM:SS', indexadas por dia da semana (0 = segunda-feira).
+                AGENDA_VAZIA se o médico não tiver agenda modelo.
         """
-        cursor = self.connection.cursor()
+        return self._obterCache(("agenda_modelo", crm), lambda: self._agendaModeloNoBanco(crm)) or AGENDA_VAZIA
+
+    def _agendaModeloNoBanco(self, crm):
         try:
-            cursor.execute("SELECT password FROM usuario WHERE username = %s", (username,))
-            row = cursor.fetchone()
+            return montarAgendaModelo(self._executarPreparado(SQL_AGENDA_MODELO, (crm,)))
+        except self.backend.erros as e:
+            print(f"Erro ao buscar agenda modelo: {e}")
+            return None
 
-            if row:
-                hashed_password = row[0].encode('utf-8')
-                if bcrypt.checkpw(password.encode('utf-8'), hashed_password):
-                    return True
-                else:
-                    return False
-            else:
-                return False
-        except mysql.connector.Error as e:
-            print(f"Erro ao autenticar usuário: {e}")
-            return False
-        finally:
-            cursor.close()
+    def _noModelo(self, crm, data, horario):
+        return normalizarHorario(horario) in self.agendaModelo(crm)[normalizarData(data).weekday()]
 
-    def padronizadoConsultas(self):
-        """
-        Cria consultas padrão para todos os médicos em dias úteis do ano atual.
+    @instrumentado
+    def definirAgendaModelo(self, crm, horarios_por_dia):
         """
-        cursor = self.connection.cursor()
-        dias_ano = []
-        data = datetime.today()
-        ano_atual = data.year
+        Substitui a agenda modelo semanal de um médico.
 
-        while data.year == ano_atual:
-            dias_ano.append(data.strftime('%Y-%m-%d'))
-            data += timedelta(days=1)
+        Consultas já gravadas não são alteradas: a nova agenda vale para os horários ainda livres.
 
-        try:
-            sql = "SELECT crm FROM medico"
-            cursor.execute(sql)
-            medicos = cursor.fetchall()
-
-            horas = ["07:00:00", "08:00:00", "09:00:00", "10:00:00", "13:00:00", "14:00:00", "15:00:00", "16:00:00",
-                     "17:00:00"]
-
-            for medico in medicos:
-                crm = medico[0]
-
-                # Verifica se o médico já tem consultas
-                sql_check = "SELECT COUNT(*) FROM consulta WHERE crm = %s"
-                cursor.execute(sql_check, (crm,))
-                consulta_count = cursor.fetchone()[0]
-
-                if consulta_count == 0:
-                    for dia in dias_ano:
-                        if datetime.strptime(dia, '%Y-%m-%d').weekday() not in (6, 0):
-                            for hora in horas:
-                                sql_insert = "INSERT INTO consulta (horario, data, status, crm) VALUES (%s, %s, 'D', %s)"
-                                cursor.execute(sql_insert, (hora, dia, crm))
-                        else:
-                            for hora in horas:
-                                sql_insert = "INSERT INTO consulta (horario, data, status, crm) VALUES (%s, %s, 'I', %s)"
-                                cursor.execute(sql_insert, (hora, dia, crm))
+        Args:
+            crm (str): CRM do médico.
+            horarios_por_dia (dict): Dia da semana (0 = segunda-feira) -> lista de horários 'HH:MM:SS'.
 
+        Returns:
+            bool: True se a agenda foi gravada, False caso contrário.
+        """
+        linhas = [
+            (crm, dia_semana, normalizarHorario(horario))
+            for dia_semana, horarios in horarios_por_dia.items()
+            for horario in horarios
+        ]
+        cursor = self.connection.cursor()
+        try:
+            cursor.execute("DELETE FROM agenda_modelo WHERE crm = %s", (crm,))
+            if linhas:
+                cursor.executemany("INSERT INTO agenda_modelo (crm, dia_semana, horario) VALUES (%s, %s, %s)", linhas)
             self.connection.commit()
-        except mysql.connector.Error as e:
-            print(f"Erro: {e}")
+            self.cache.invalidar("agenda_modelo")
+            if self.disponibilidade.carregado:
+                self.disponibilidade.definirModelos(linhas, [crm])
+            return True
+        except self.backend.erros as e:
+            print(f"Erro ao definir agenda modelo: {e}")
             self.connection.rollback()
+            return False
         finally:
             cursor.close()
 
-    def historicoMedico(self, cpf):
+    @instrumentado
+    @somenteLeitura
+    def historicoMedico(self, cpf, data_inicio=None, data_fim=None, status=None):
         """
-        Retorna o histórico médico de um paciente.
+        Retorna o histórico médico de um paciente em uma única consulta ao banco.
 
         Args:
             cpf (str): CPF do paciente.
+            data_inicio (str, opcional): Data inicial (inclusive) no formato 'YYYY-MM-DD'.
+            data_fim (str, opcional): Data final (inclusive) no formato 'YYYY-MM-DD'.
+            status (iterable, opcional): Códigos de status a incluir ('I', 'R', 'A', 'D').
+                Por padrão todos são incluídos.
 
         Returns:
-            list: Lista de tuplas contendo informações das consultas (data, horário, status e nome do médico).
+            list: Lista de tuplas (data, horário, status e nome do médico), ordenada por data e
+                  horário, ou None se não houver consultas.
         """
-        cursor = self.connection.cursor()
+        sql_consultas, val_consultas = sqlHistorico(cpf, data_inicio, data_fim, status)
+        if sql_consultas is None:
+            return None
+
         try:
-            sql_paciente = "SELECT id_paciente FROM paciente WHERE cpf = %s"
-            val_paciente = (cpf,)
-            cursor.execute(sql_paciente, val_paciente)
-            resultado_paciente = cursor.fetchone()
-
-            if resultado_paciente:
-                id_paciente = resultado_paciente[0]
-
-                sql_consultas = """
-                       SELECT consulta.data, consulta.horario, consulta.status, medico.crm
-                       FROM consulta 
-                       INNER JOIN medico  ON consulta.crm = medico.crm
-                       WHERE consulta.id_paciente = %s AND consulta.status IN ('I', 'R', 'A','D')
-                       """
-                val_consultas = (id_paciente,)
-                cursor.execute(sql_consultas, val_consultas)
-                resultados_consultas = cursor.fetchall()
-
-                if resultados_consultas:
-                    lista_consultas = []
-                    status_map = {'I': 'Indisponível', 'R': 'Realizada', 'A': 'Agendada', 'D': 'Disponível'}
-
-                    for consulta in resultados_consultas:
-                        status_formatado = status_map.get(consulta[2], "Desconhecido")
-                        nome_medico = self.descobrirNome(consulta[3])
-                        consulta_tupla = (
-                            f"Data: {consulta[0]}",
-                            f"Horário: {consulta[1]}",
-                            f"Status: {status_formatado}",
-                            f"Doutor(a): {nome_medico}"
-                        )
-                        lista_consultas.append(consulta_tupla)
-
-                    return lista_consultas
+            resultados_consultas = self._executarPreparado(sql_consultas, val_consultas)
+
+            if resultados_consultas:
+                return formatarHistorico(resultados_consultas)
             return None
-        except mysql.connector.Error as e:
+        except self.backend.erros as e:
             print(f"Erro: {e}")
-        finally:
-            cursor.close()
 
-    def mostrarHorarios(self, nome_dr):
+    @instrumentado
+    @somenteLeitura
+    def mostrarHorarios(self, nome_dr, data_inicio=None, data_fim=None):
         """
-        Mostra os horários disponíveis de um médico.
+        Mostra os horários de um médico em um período, calculados da agenda modelo e das consultas gravadas.
 
         Args:
             nome_dr (str): Nome do médico.
+            data_inicio (str, opcional): Primeiro dia no formato 'YYYY-MM-DD'. Por padrão, hoje.
+            data_fim (str, opcional): Último dia (inclusive). Por padrão, 30 dias após o início.
 
         Returns:
             list: Lista de tuplas contendo informações dos horários (ID da consulta, data, horário e status).
+                Horários livres que só existem na agenda modelo não têm ID.
         """
         crm = self.descobrirCrm(nome_dr)
-        cursor = self.connection.cursor()
+        data_inicio, data_fim = janelaPadrao(data_inicio, data_fim, dias=30)
         try:
-            sql_horarios = """
-                   SELECT c.id_consulta, c.data, c.horario, c.status
-                   FROM consulta c
-                   INNER JOIN medico m ON c.crm = m.crm
-                   WHERE c.crm = %s
-                   """
-            val = (crm,)
-            cursor.execute(sql_horarios, val)
-            resultados = cursor.fetchall()
+            linhas = self._executarPreparado(*sqlAgendaPeriodo(crm, data_inicio, data_fim))
+            resultados = list(agendaDoPeriodo(self.agendaModelo(crm), linhas, data_inicio, data_fim))
 
             if resultados:
-                lista_horarios = []
-                status_map = {'I': 'Indisponível', 'R': 'Realizada', 'A': 'Agendada', 'D': 'Disponível'}
-
-                for consulta in resultados:
-                    status_formatado = status_map.get(consulta[3], "Desconhecido")
-                    horario_tupla = (
-                        f"ID_Consulta: {consulta[0]}",
-                        f"Data: {consulta[1]}",
-                        f"Horário: {consulta[2]}",
-                        f"Status: {status_formatado}"
-                    )
-                    lista_horarios.append(horario_tupla)
-
-                return lista_horarios
+                return formatarHorariosMedico(resultados)
             else:
-                print("Nenhuma consulta identificada.")
+                self._avisar("Nenhuma consulta identificada.")
                 return None
-        except mysql.connector.Error as e:
+        except self.backend.erros as e:
             print(f"Erro: {e}")
-        finally:
-            cursor.close()
 
+    @instrumentado
+    def existeUsuario(self):
+        """
+        Verifica se já há algum usuário cadastrado.
+
+        Returns:
+            bool: True se houver ao menos um usuário (ou em caso de erro, para não recriar o administrador).
+        """
+        try:
+            return bool(self._executarPreparado(SQL_EXISTE_USUARIO))
+        except self.backend.erros as e:
+            print(f"Erro ao verificar usuários: {e}")
+            return True
+
+    @instrumentado
     def criar_adm(self, username, password):
         """
-        Cria um novo administrador no sistema.
+        Cria o administrador do sistema, se ainda não houver nenhum usuário.
+
+        Deve ser chamado uma vez na inicialização, não a cada login. O hash da senha é gerado por
+        Autenticacao, o mesmo caminho (e custo) usado para conferir as senhas no login.
 
         Args:
             username (str): Nome de usuário do administrador.
             password (str): Senha do administrador.
 
         Returns:
-            bool: True se o administrador foi criado com sucesso, False caso contrário.
+            bool: True se o administrador foi criado (ou já havia um usuário), False em caso de erro.
         """
         cursor = self.connection.cursor()
         try:
-            cursor.execute("SELECT COUNT(*) FROM usuario")
-            count = cursor.fetchone()[0]
-            if count > 0:
+            cursor.execute(SQL_EXISTE_USUARIO)
+            if cursor.fetchone():
                 return True
-            else:
-                hashed_password = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(8))
-                cursor.execute(
-                    "INSERT INTO usuario (username, password) VALUES (%s, %s)",
-                    (username, hashed_password.decode('utf-8'))
-                )
-                self.connection.commit()
-                print("Administrador criado com sucesso.")
-                return True
-        except mysql.connector.Error as e:
+            from Clinica.Autenticacao import gerarHash  # Importa o bcrypt só quando há o que criar
+            cursor.execute(SQL_CRIAR_USUARIO, (username, gerarHash(password)))
+            self.connection.commit()
+            self._avisar("Administrador criado com sucesso.")
+            return True
+        except self.backend.erros as e:
             print(f"Erro ao criar administrador: {e}")
             self.connection.rollback()
             return False
         finally:
             cursor.close()
 
+    @instrumentado
+    def senhaDoUsuario(self, username):
+        """
+        Obtém o hash bcrypt da senha de um usuário.
+
+        Args:
+            username (str): Nome de usuário.
+
+        Returns:
+            str: Hash da senha, ou None se o usuário não existir (ou em caso de erro).
+        """
+        try:
+            linhas = self._executarPreparado(SQL_SENHA_USUARIO, (username,))
+            return linhas[0][0] if linhas else None
+        except self.backend.erros as e:
+            print(f"Erro ao autenticar usuário: {e}")
+            return None
+
+    @instrumentado
     def autenticar_usuario(self, username, password):
         """
-        Autentica um usuário no sistema.
+        Autentica um usuário no sistema, verificando a senha na thread atual.
+
+        Para vários operadores ou para o serviço HTTP, use Autenticacao, que verifica as senhas
+        em um pool de threads e emite tokens de sessão.
 
         Args:
             username (str): Nome de usuário.
@@ -759,25 +1462,13 @@ class Database:
         Returns:
             bool: True se a autenticação for bem-sucedida, False caso contrário.
         """
-        cursor = self.connection.cursor()
-        try:
-            cursor.execute("SELECT password FROM usuario WHERE username = %s", (username,))
-            row = cursor.fetchone()
-
-            if row:
-                hashed_password = row[0].encode('utf-8')
-                if bcrypt.checkpw(password.encode('utf-8'), hashed_password):
-                    return True
-                else:
-                    return False
-            else:
-                return False
-        except mysql.connector.Error as e:
-            print(f"Erro ao autenticar usuário: {e}")
+        import bcrypt
+        hashed_password = self.senhaDoUsuario(username)
+        if hashed_password is None:
             return False
-        finally:
-            cursor.close()
+        return bcrypt.checkpw(password.encode('utf-8'), hashed_password.encode('utf-8'))
 
+    @instrumentado
     def atualizarPaciente(self, cpf, novo_nome, novo_email):
         """
         Atualiza informações de um paciente no banco de dados.
@@ -786,6 +1477,9 @@ class Database:
             cpf (str): CPF do paciente a ser atualizado.
             novo_nome (str): Novo nome do paciente.
             novo_email (str): Novo email do paciente.
+
+        Returns:
+            bool: True se o cadastro foi atualizado, False caso contrário.
         """
         cursor = self.connection.cursor()
         try:
@@ -793,16 +1487,22 @@ class Database:
             cursor.execute(sql_update, (novo_nome, novo_email, cpf))
             self.connection.commit()
 
+            self.cache.invalidar("id_paciente")
             if cursor.rowcount == 1:
-                print("Paciente atualizado com sucesso.")
-            else:
-                print("Nenhum paciente atualizado.")
-        except mysql.connector.Error as e:
+                if self.busca.carregado:
+                    self.busca.atualizar(PACIENTE, cpf, novo_nome)
+                self._avisar("Paciente atualizado com sucesso.")
+                return True
+            self._avisar("Nenhum paciente atualizado.")
+            return False
+        except self.backend.erros as e:
             print(f"Erro ao atualizar paciente: {e}")
             self.connection.rollback()
+            return False
         finally:
             cursor.close()
 
+    @instrumentado
     def atualizarMedico(self, crm, novo_nome, novo_email):
         """
         Atualiza informações de um médico no banco de dados.
@@ -811,6 +1511,9 @@ class Database:
             crm (str): CRM do médico a ser atualizado.
             novo_nome (str): Novo nome do médico.
             novo_email (str): Novo email do médico.
+
+        Returns:
+            bool: True se o cadastro foi atualizado, False caso contrário.
         """
         cursor = self.connection.cursor()
         try:
@@ -818,12 +1521,17 @@ class Database:
             cursor.execute(sql_update, (novo_nome, novo_email, crm))
             self.connection.commit()
 
+            self.cache.invalidar("crm", "nome", "medicos_especialidade")
             if cursor.rowcount == 1:
-                print("Médico atualizado com sucesso.")
-            else:
-                print("Nenhum médico atualizado.")
-        except mysql.connector.Error as e:
+                if self.busca.carregado:
+                    self.busca.atualizar(MEDICO, crm, novo_nome)
+                self._avisar("Médico atualizado com sucesso.")
+                return True
+            self._avisar("Nenhum médico atualizado.")
+            return False
+        except self.backend.erros as e:
             print(f"Erro ao atualizar médico: {e}")
             self.connection.rollback()
+            return False
         finally:
             cursor.close()
\ No newline at end of file
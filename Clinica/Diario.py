@@ -0,0 +1,178 @@
+from collections import namedtuple
+from datetime import datetime, timedelta
+
+from Clinica.Metricas import instrumentado
+
+# Uma mudança de status de horário, na ordem em que foi registrada
+Transicao = namedtuple("Transicao", "seq crm data horario status_anterior status_novo registrado_em")
+
+SQL_REGISTRAR = (
+    "INSERT INTO diario_agenda (crm, data, horario, status_anterior, status_novo, registrado_em) "
+    "VALUES (%s, %s, %s, %s, %s, %s)"
+)
+SQL_LER = """
+    SELECT seq, crm, data, horario, status_anterior, status_novo, registrado_em
+    FROM diario_agenda
+    WHERE seq > %s
+    ORDER BY seq
+    LIMIT %s
+    """
+SQL_CHECKPOINT = "SELECT seq FROM diario_checkpoint WHERE consumidor = %s"
+SQL_CONFIRMAR = (
+    "INSERT INTO diario_checkpoint (consumidor, seq, atualizado_em) VALUES (%s, %s, %s) "
+    "ON DUPLICATE KEY UPDATE seq = VALUES(seq), atualizado_em = VALUES(atualizado_em)"
+)
+
+
+class DiarioAgenda:
+    """
+    Diário só de inclusão das mudanças de status da agenda (tabela diario_agenda).
+
+    Cada transição feita por Database (marcação, bloqueio, liberação, arquivamento) ganha uma linha
+    com número de sequência crescente, gravada na mesma transação da mudança. Relatórios, caches e
+    resumos acompanham a agenda lendo o diário a partir do último número que já processaram, em vez
+    de consultar a tabela consulta de novo.
+
+    Transações concorrentes podem confirmar fora da ordem das sequências: uma lacuna recente pode
+    ser uma transação ainda em andamento, e a leitura para antes dela. Lacunas mais antigas que
+    espera_lacuna segundos são de transações desfeitas e são ignoradas.
+    """
+
+    def __init__(self, espera_lacuna=5.0):
+        """
+        Args:
+            espera_lacuna (float): Segundos após os quais uma sequência ausente é considerada descartada.
+        """
+        self.espera_lacuna = espera_lacuna
+
+    def comando(self, transicoes):
+        """
+        Monta o comando que registra as transições no diário, sem executá-lo.
+
+        Args:
+            transicoes (iterable): Tuplas (crm, data, horario, status_anterior, status_novo).
+
+        Returns:
+            tuple: (sql, linhas) para executemany, ou None se não houver mudança de status.
+        """
+        agora = datetime.now()
+        linhas = [
+            (crm, data, horario, anterior, novo, agora)
+            for crm, data, horario, anterior, novo in transicoes
+            if anterior != novo
+        ]
+        return (SQL_REGISTRAR, linhas) if linhas else None
+
+    def ler(self, db, desde=0, limite=1000):
+        """
+        Lê as transições registradas depois de uma sequência.
+
+        Args:
+            db (Database): Instância do banco de dados.
+            desde (int): Última sequência já processada; 0 começa pela mais antiga mantida pela poda.
+            limite (int): Quantidade máxima de transições lidas.
+
+        Returns:
+            list: Transicao em ordem de sequência, sem passar de uma lacuna recente.
+        """
+        cursor = db.connection.cursor()
+        try:
+            cursor.execute(SQL_LER, (desde, limite))
+            linhas = cursor.fetchall()
+        finally:
+            cursor.close()
+        transicoes = []
+        anterior = desde
+        limite_lacuna = datetime.now() - timedelta(seconds=self.espera_lacuna)
+        for linha in linhas:
+            transicao = Transicao(*linha)
+            lacuna = transicao.seq != anterior + 1 and (transicoes or desde)
+            if lacuna and _paraData(transicao.registrado_em) > limite_lacuna:
+                break
+            transicoes.append(transicao)
+            anterior = transicao.seq
+        return transicoes
+
+    def ultimaSequencia(self, db):
+        """
+        Retorna a maior sequência registrada, ou 0 se o diário estiver vazio.
+        """
+        cursor = db.connection.cursor()
+        try:
+            cursor.execute("SELECT MAX(seq) FROM diario_agenda")
+            return cursor.fetchone()[0] or 0
+        finally:
+            cursor.close()
+
+    def checkpoint(self, db, consumidor):
+        """
+        Retorna a última sequência confirmada por um consumidor, ou 0 se ele nunca confirmou.
+        """
+        cursor = db.connection.cursor()
+        try:
+            cursor.execute(SQL_CHECKPOINT, (consumidor,))
+            linha = cursor.fetchone()
+            return linha[0] if linha else 0
+        finally:
+            cursor.close()
+
+    def confirmar(self, db, consumidor, seq):
+        """
+        Grava a última sequência processada por um consumidor.
+        """
+        cursor = db.connection.cursor()
+        try:
+            cursor.execute(SQL_CONFIRMAR, (consumidor, seq, datetime.now()))
+            db.connection.commit()
+        finally:
+            cursor.close()
+
+    @instrumentado
+    def consumir(self, db, consumidor, processar, tamanho_lote=1000):
+        """
+        Entrega a um consumidor as transições posteriores ao seu checkpoint, em lotes.
+
+        O checkpoint é gravado depois de cada lote processado: se processar falhar, o lote é
+        entregue de novo na próxima chamada (cada transição é entregue ao menos uma vez).
+
+        Args:
+            db (Database): Instância do banco de dados.
+            consumidor (str): Nome do consumidor, chave do checkpoint.
+            processar (callable): Recebe cada lote (lista de Transicao).
+            tamanho_lote (int): Quantidade máxima de transições por lote.
+
+        Returns:
+            int: Quantidade de transições entregues.
+        """
+        seq = self.checkpoint(db, consumidor)
+        total = 0
+        while True:
+            lote = self.ler(db, seq, tamanho_lote)
+            if not lote:
+                return total
+            processar(lote)
+            seq = lote[-1].seq
+            self.confirmar(db, consumidor, seq)
+            total += len(lote)
+            if len(lote) < tamanho_lote:
+                return total
+
+    def podar(self, db, ate_seq):
+        """
+        Apaga as transições até uma sequência, por exemplo a menor entre os checkpoints dos consumidores.
+
+        Returns:
+            int: Quantidade de transições apagadas.
+        """
+        cursor = db.connection.cursor()
+        try:
+            cursor.execute("DELETE FROM diario_agenda WHERE seq <= %s", (ate_seq,))
+            db.connection.commit()
+            return cursor.rowcount
+        finally:
+            cursor.close()
+
+
+def _paraData(valor):
+    # O SQLite devolve DATETIME como texto ISO
+    return valor if isinstance(valor, datetime) else datetime.fromisoformat(str(valor))
@@ -0,0 +1,191 @@
+import threading
+from datetime import date, datetime, timedelta
+
+
+def normalizarHorario(horario):
+    """
+    Converte um horário devolvido pelo banco (timedelta, time ou texto) para 'HH:MM:SS'.
+    """
+    if isinstance(horario, timedelta):
+        segundos = int(horario.total_seconds())
+        return f"{segundos // 3600:02d}:{segundos % 3600 // 60:02d}:{segundos % 60:02d}"
+    return str(horario).zfill(8)
+
+
+def normalizarData(data):
+    """
+    Converte uma data em texto 'YYYY-MM-DD' ou datetime para date.
+    """
+    if isinstance(data, datetime):
+        return data.date()
+    if isinstance(data, date):
+        return data
+    return datetime.strptime(str(data)[:10], '%Y-%m-%d').date()
+
+
+class IndiceDisponibilidade:
+    """
+    Índice em memória dos horários disponíveis, com máscaras de bits por médico e dia.
+
+    Cada bit corresponde a um dos horários padrão da agenda, na ordem em que foram informados.
+    A disponibilidade de um dia é a máscara da agenda modelo do médico para aquele dia da semana,
+    com as exceções gravadas em consulta aplicadas por cima (bits ligados para horários extras ou
+    liberados, desligados para horários marcados ou bloqueados). O índice é carregado de uma vez e
+    depois mantido pelas operações de agenda de Database, respondendo perguntas como "em que dias
+    do mês o médico tem manhã livre" sem consultar o banco.
+    """
+
+    def __init__(self, horarios):
+        """
+        Args:
+            horarios (list): Horários padrão da agenda no formato 'HH:MM:SS'.
+        """
+        self.horarios = list(horarios)
+        self._bits = {horario: 1 << posicao for posicao, horario in enumerate(self.horarios)}
+        self._modelos = {}  # crm -> [máscara de cada dia da semana]
+        self._excecoes = {}  # (crm, date) -> (bits ligados, bits desligados)
+        self._inicio = date.min
+        self._trava = threading.Lock()
+        self.carregado = False
+        self.sequencia = 0  # Última transição do diário da agenda já refletida no índice
+
+    def mascara(self, horarios=None):
+        """
+        Monta a máscara de bits de um conjunto de horários.
+
+        Args:
+            horarios (iterable, opcional): Horários 'HH:MM:SS'. Por padrão, todos os horários padrão.
+
+        Returns:
+            int: Máscara com um bit ligado para cada horário conhecido.
+        """
+        if horarios is None:
+            return (1 << len(self.horarios)) - 1
+        mascara = 0
+        for horario in horarios:
+            mascara |= self._bits.get(normalizarHorario(horario), 0)
+        return mascara
+
+    def carregar(self, db, data_inicio=None, tamanho_lote=5000):
+        """
+        Recarrega o índice com as agendas modelo e as exceções gravadas a partir de data_inicio.
+
+        Args:
+            db (Database): Instância do banco de dados.
+            data_inicio (date, opcional): Primeiro dia carregado. Por padrão, hoje.
+            tamanho_lote (int): Quantidade de linhas lidas do servidor a cada fetchmany.
+        """
+        data_inicio = data_inicio or date.today()
+        excecoes = {}
+        cursor = db.connection.cursor(buffered=False)
+        try:
+            cursor.execute("SELECT crm, dia_semana, horario FROM agenda_modelo")
+            modelos = self._montarModelos(cursor.fetchall())
+            cursor.execute("SELECT crm, data, horario, status FROM consulta WHERE data >= %s", (data_inicio,))
+            while True:
+                lote = cursor.fetchmany(tamanho_lote)
+                if not lote:
+                    break
+                for crm, data, horario, status in lote:
+                    bit = self._bits.get(normalizarHorario(horario))
+                    if bit:
+                        chave = (str(crm), normalizarData(data))
+                        ligados, desligados = excecoes.get(chave, (0, 0))
+                        if status == 'D':
+                            excecoes[chave] = (ligados | bit, desligados & ~bit)
+                        else:
+                            excecoes[chave] = (ligados & ~bit, desligados | bit)
+        finally:
+            cursor.close()
+        with self._trava:
+            self._modelos = modelos
+            self._excecoes = excecoes
+            self._inicio = data_inicio
+            self.carregado = True
+
+    def definirModelos(self, linhas, crms=None):
+        """
+        Substitui as agendas modelo do índice.
+
+        Args:
+            linhas (iterable): Linhas (crm, dia_semana, horario) de agenda_modelo.
+            crms (iterable, opcional): Médicos cujas agendas são substituídas, mesmo que fiquem vazias.
+                Por padrão, os médicos presentes em linhas.
+        """
+        modelos = self._montarModelos(linhas)
+        with self._trava:
+            for crm in crms if crms is not None else list(modelos):
+                self._modelos[str(crm)] = modelos.get(str(crm), [0] * 7)
+
+    def _montarModelos(self, linhas):
+        modelos = {}
+        for crm, dia_semana, horario in linhas:
+            bit = self._bits.get(normalizarHorario(horario))
+            if bit:
+                modelos.setdefault(str(crm), [0] * 7)[int(dia_semana)] |= bit
+        return modelos
+
+    def atualizar(self, crm, data, horario, disponivel):
+        """
+        Marca um horário como disponível ou não. Horários fora da agenda padrão são ignorados.
+
+        Args:
+            crm (str): CRM do médico.
+            data (str | date): Data do horário.
+            horario (str): Horário no formato 'HH:MM:SS'.
+            disponivel (bool): True se o horário passou a ter status 'D'.
+        """
+        bit = self._bits.get(normalizarHorario(horario))
+        if not bit or crm is None:
+            return
+        chave = (str(crm), normalizarData(data))
+        with self._trava:
+            ligados, desligados = self._excecoes.get(chave, (0, 0))
+            if disponivel:
+                self._excecoes[chave] = (ligados | bit, desligados & ~bit)
+            else:
+                self._excecoes[chave] = (ligados & ~bit, desligados | bit)
+
+    def _mascaraDoDia(self, crm, dia):
+        if dia < self._inicio:
+            return 0
+        modelo = self._modelos.get(crm)
+        mascara = modelo[dia.weekday()] if modelo else 0
+        excecao = self._excecoes.get((crm, dia))
+        if excecao:
+            mascara = (mascara & ~excecao[1]) | excecao[0]
+        return mascara
+
+    def horariosLivres(self, crm, data):
+        """
+        Retorna os horários disponíveis de um médico em um dia.
+
+        Returns:
+            list: Horários 'HH:MM:SS' disponíveis, em ordem.
+        """
+        mascara = self._mascaraDoDia(str(crm), normalizarData(data))
+        return [horario for horario in self.horarios if mascara & self._bits[horario]]
+
+    def diasLivres(self, crm, data_inicio, data_fim, mascara=None):
+        """
+        Lista os dias do período em que o médico tem ao menos um horário livre dentro da máscara.
+
+        Args:
+            crm (str): CRM do médico.
+            data_inicio (str | date): Primeiro dia do período.
+            data_fim (str | date): Último dia do período (inclusive).
+            mascara (int, opcional): Horários de interesse (veja mascara()). Por padrão, todos.
+
+        Returns:
+            list: Datas (date) com horário livre.
+        """
+        mascara = self.mascara() if mascara is None else mascara
+        crm = str(crm)
+        dia = normalizarData(data_inicio)
+        fim = normalizarData(data_fim)
+        dias = []
+        while dia <= fim:
+            if self._mascaraDoDia(crm, dia) & mascara:
+                dias.append(dia)
+            dia += timedelta(days=1)
+        return dias
@@ -1,17 +1,26 @@
-from Database import Database
+from Clinica.Database import Database
 class Historico:
-    def __init__(self):
+    def __init__(self, config=None):
+        """
+        Args:
+            config (dict, opcional): Parâmetros de conexão repassados a Database, por exemplo a
+                réplica de leitura que deve atender o histórico.
+        """
         self.historico = []
+        self.config = config or {"host": "localhost", "user": "root", "password": "", "database": "sistema_consultorio"}
 
-    def imprimirHistorico(self, cpf):
+    def imprimirHistorico(self, cpf, data_inicio=None, data_fim=None, status=None):
         """
         Recupera e imprime o histórico médico de um paciente dado o CPF.
 
         Conecta-se ao banco de dados, recupera o histórico médico do paciente correspondente ao CPF
-        fornecido e imprime as informações formatadas na tela.
+        fornecido (uma única consulta, já com o nome do médico) e imprime as informações formatadas na tela.
 
         Args:
             cpf (str): O CPF do paciente para o qual o histórico médico será recuperado.
+            data_inicio (str, opcional): Data inicial do período no formato 'YYYY-MM-DD'.
+            data_fim (str, opcional): Data final do período no formato 'YYYY-MM-DD'.
+            status (iterable, opcional): Códigos de status a incluir ('I', 'R', 'A', 'D').
 
         Returns:
             None
@@ -20,10 +29,9 @@ class Historico:
             ValueError: Se o CPF não for uma string válida.
         """
         try:
-            # Conecta-se ao banco de dados
-            db = Database(host="localhost", user="root", password="", database="sistema_consultorio")
-
-            historico_medico = db.historicoMedico(cpf)
+            # Obtém uma conexão do pool compartilhado
+            with Database(**self.config) as db:
+                historico_medico = db.historicoMedico(cpf, data_inicio, data_fim, status)
 
             if historico_medico:
                 self.historico = historico_medico
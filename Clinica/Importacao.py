@@ -0,0 +1,262 @@
+import csv
+import sys
+import time
+from collections import defaultdict, deque
+
+from Clinica.Busca import MEDICO, PACIENTE
+from Clinica.Metricas import instrumentado
+from Clinica.Paciente import formatar_cpf
+
+# Colunas esperadas em cada arquivo, na mesma ordem dos construtores de Paciente e Medico
+COLUNAS_PACIENTE = ["nome", "sobrenome", "telefone", "cpf", "cep", "numero", "complemento",
+                    "data_nascimento", "email"]
+COLUNAS_MEDICO = ["crm", "especialidade", "nome", "sobrenome", "data_nascimento", "email", "telefone",
+                  "cep", "numero", "complemento"]
+
+
+class ImportadorCSV:
+    """
+    Importa pacientes e médicos de arquivos CSV em lotes, uma transação por lote.
+
+    O arquivo é lido em fluxo (não é carregado inteiro na memória). Linhas inválidas ou já cadastradas
+    são rejeitadas com o número da linha e o motivo, sem interromper a importação.
+    """
+
+    def __init__(self, db, tamanho_lote=1000):
+        """
+        Args:
+            db (Database): Instância do banco de dados.
+            tamanho_lote (int): Quantidade de linhas gravadas por transação.
+        """
+        self.db = db
+        self.connection = db.connection
+        self.tamanho_lote = tamanho_lote
+
+    @instrumentado
+    def importarPacientes(self, caminho):
+        """
+        Importa um CSV de pacientes (colunas de COLUNAS_PACIENTE, com cabeçalho).
+
+        Args:
+            caminho (str): Caminho do arquivo CSV.
+
+        Returns:
+            dict: importados, rejeitados (lista de (linha, motivo)), segundos e linhas_por_segundo.
+        """
+        relatorio = self._novoRelatorio()
+        vistos = set()
+        with open(caminho, newline='', encoding='utf-8') as arquivo:
+            for lote in self._lotes(arquivo, COLUNAS_PACIENTE, relatorio):
+                validos = []
+                for numero_linha, linha in lote:
+                    try:
+                        linha["cpf"] = formatar_cpf(linha["cpf"])
+                    except ValueError as e:
+                        relatorio["rejeitados"].append((numero_linha, str(e)))
+                        continue
+                    if not linha["nome"] or not linha["cep"]:
+                        relatorio["rejeitados"].append((numero_linha, "Nome e CEP são obrigatórios."))
+                    elif linha["cpf"] in vistos:
+                        relatorio["rejeitados"].append((numero_linha, "CPF repetido no arquivo."))
+                    else:
+                        vistos.add(linha["cpf"])
+                        validos.append((numero_linha, linha))
+                self._gravarPacientes(validos, relatorio)
+        self.db.cache.invalidar("id_paciente")
+        return self._finalizar(relatorio, "pacientes")
+
+    @instrumentado
+    def importarMedicos(self, caminho, gerar_agenda=True):
+        """
+        Importa um CSV de médicos (colunas de COLUNAS_MEDICO, com cabeçalho).
+
+        As especialidades são resolvidas uma vez por arquivo: as existentes são lidas no início e as
+        novas são criadas na primeira vez em que aparecem.
+
+        Args:
+            caminho (str): Caminho do arquivo CSV.
+            gerar_agenda (bool): Se True, cria a agenda padrão dos médicos importados ao final.
+
+        Returns:
+            dict: importados, rejeitados (lista de (linha, motivo)), segundos e linhas_por_segundo.
+        """
+        relatorio = self._novoRelatorio()
+        especialidades = self._especialidades()
+        vistos = set()
+        with open(caminho, newline='', encoding='utf-8') as arquivo:
+            for lote in self._lotes(arquivo, COLUNAS_MEDICO, relatorio):
+                validos = []
+                for numero_linha, linha in lote:
+                    if not linha["crm"] or not linha["nome"] or not linha["especialidade"] or not linha["cep"]:
+                        relatorio["rejeitados"].append((numero_linha, "CRM, nome, especialidade e CEP são obrigatórios."))
+                    elif linha["crm"] in vistos:
+                        relatorio["rejeitados"].append((numero_linha, "CRM repetido no arquivo."))
+                    else:
+                        vistos.add(linha["crm"])
+                        validos.append((numero_linha, linha))
+                self._gravarMedicos(validos, especialidades, relatorio)
+        self.db.cache.invalidar("crm", "nome", "especialidades", "medicos_especialidade")
+        resultado = self._finalizar(relatorio, "médicos")
+        if gerar_agenda and resultado["importados"]:
+            criados = self.db.padronizadoConsultas()
+            print(f"{criados} horários semanais adicionados à agenda modelo.")
+        return resultado
+
+    def _gravarPacientes(self, validos, relatorio):
+        if not validos:
+            return
+        cursor = self.connection.cursor()
+        try:
+            validos = self._semExistentes(cursor, "paciente", "cpf", validos, "CPF já cadastrado.", relatorio)
+            if not validos:
+                return
+            ids_endereco = self._inserirEnderecos(cursor, validos)
+            cursor.executemany(
+                "INSERT INTO paciente (nome, cpf, data_nasc, email, telefone, id_endereco) "
+                "VALUES (%s, %s, %s, %s, %s, %s)",
+                [
+                    (f"{linha['nome']} {linha['sobrenome']}".strip(), linha["cpf"],
+                     linha["data_nascimento"] or None, linha["email"], linha["telefone"], id_endereco)
+                    for id_endereco, (_, linha) in zip(ids_endereco, validos)
+                ]
+            )
+            self.connection.commit()
+            relatorio["importados"] += len(validos)
+            if self.db.busca.carregado:
+                for _, linha in validos:
+                    self.db.busca.atualizar(PACIENTE, linha["cpf"], f"{linha['nome']} {linha['sobrenome']}".strip(),
+                                            linha["telefone"])
+        except Exception as e:
+            self.connection.rollback()
+            relatorio["rejeitados"].extend((numero_linha, f"Erro no lote: {e}") for numero_linha, _ in validos)
+        finally:
+            cursor.close()
+
+    def _gravarMedicos(self, validos, especialidades, relatorio):
+        if not validos:
+            return
+        cursor = self.connection.cursor()
+        try:
+            validos = self._semExistentes(cursor, "medico", "crm", validos, "CRM já cadastrado.", relatorio)
+            if not validos:
+                return
+            for _, linha in validos:
+                if linha["especialidade"] not in especialidades:
+                    cursor.execute("INSERT INTO especialidade (especialidade) VALUES (%s)", (linha["especialidade"],))
+                    especialidades[linha["especialidade"]] = cursor.lastrowid
+            ids_endereco = self._inserirEnderecos(cursor, validos)
+            cursor.executemany(
+                "INSERT INTO medico (crm, nome, data_nasc, email, telefone, id_endereco) "
+                "VALUES (%s, %s, %s, %s, %s, %s)",
+                [
+                    (linha["crm"], f"{linha['nome']} {linha['sobrenome']}".strip(), linha["data_nascimento"] or None,
+                     linha["email"], linha["telefone"], id_endereco)
+                    for id_endereco, (_, linha) in zip(ids_endereco, validos)
+                ]
+            )
+            cursor.executemany(
+                "INSERT INTO especialidade_medico (especialidade_id, crm) VALUES (%s, %s)",
+                [(especialidades[linha["especialidade"]], linha["crm"]) for _, linha in validos]
+            )
+            self.connection.commit()
+            relatorio["importados"] += len(validos)
+            if self.db.busca.carregado:
+                for _, linha in validos:
+                    self.db.busca.atualizar(MEDICO, linha["crm"], f"{linha['nome']} {linha['sobrenome']}".strip(),
+                                            linha["telefone"])
+        except Exception as e:
+            self.connection.rollback()
+            # Especialidades criadas neste lote foram desfeitas; recarrega o mapa
+            especialidades.clear()
+            especialidades.update(self._especialidades())
+            relatorio["rejeitados"].extend((numero_linha, f"Erro no lote: {e}") for numero_linha, _ in validos)
+        finally:
+            cursor.close()
+
+    def _inserirEnderecos(self, cursor, validos):
+        # Os ids automáticos de um INSERT de várias linhas não são necessariamente consecutivos
+        # (auto_increment_increment > 1 em replicação, modos de trava do InnoDB). Depois do lote, os ids
+        # são lidos de volta pela chave natural (cep, numero, complemento), entre os endereços acima do
+        # maior id visível antes do INSERT; endereços iguais são intercambiáveis.
+        if not self.connection.in_transaction:
+            self.connection.start_transaction()
+        cursor.execute("SELECT COALESCE(MAX(id_endereco), 0) FROM endereco")
+        ultimo_id = cursor.fetchone()[0]
+        chaves = [(linha["cep"], linha["numero"], linha["complemento"]) for _, linha in validos]
+        cursor.executemany("INSERT INTO endereco (cep, numero, complemento) VALUES (%s, %s, %s)", chaves)
+        cursor.execute(
+            "SELECT id_endereco, cep, numero, complemento FROM endereco WHERE id_endereco > %s ORDER BY id_endereco",
+            (ultimo_id,)
+        )
+        ids_por_chave = defaultdict(deque)
+        for id_endereco, *chave in cursor.fetchall():
+            ids_por_chave[tuple(chave)].append(id_endereco)
+        return [ids_por_chave[chave].popleft() for chave in chaves]
+
+    def _semExistentes(self, cursor, tabela, coluna, validos, motivo, relatorio):
+        chaves = [linha[coluna] for _, linha in validos]
+        cursor.execute(
+            f"SELECT {coluna} FROM {tabela} WHERE {coluna} IN ({', '.join(['%s'] * len(chaves))})",
+            tuple(chaves)
+        )
+        existentes = {linha[0] for linha in cursor.fetchall()}
+        restantes = []
+        for numero_linha, linha in validos:
+            if linha[coluna] in existentes:
+                relatorio["rejeitados"].append((numero_linha, motivo))
+            else:
+                restantes.append((numero_linha, linha))
+        return restantes
+
+    def _especialidades(self):
+        cursor = self.connection.cursor()
+        try:
+            cursor.execute("SELECT especialidade, especialidade_id FROM especialidade")
+            return dict(cursor.fetchall())
+        finally:
+            cursor.close()
+
+    def _lotes(self, arquivo, colunas, relatorio):
+        leitor = csv.DictReader(arquivo)
+        faltando = [coluna for coluna in colunas if coluna not in (leitor.fieldnames or [])]
+        if faltando:
+            raise ValueError(f"Colunas ausentes no arquivo: {', '.join(faltando)}")
+        lote = []
+        for linha in leitor:
+            relatorio["lidas"] += 1
+            # Linha 1 é o cabeçalho
+            lote.append((leitor.line_num, {coluna: (linha[coluna] or "").strip() for coluna in colunas}))
+            if len(lote) == self.tamanho_lote:
+                yield lote
+                lote = []
+        if lote:
+            yield lote
+
+    def _novoRelatorio(self):
+        return {"lidas": 0, "importados": 0, "rejeitados": [], "inicio": time.perf_counter()}
+
+    def _finalizar(self, relatorio, tipo):
+        segundos = time.perf_counter() - relatorio.pop("inicio")
+        relatorio["segundos"] = segundos
+        relatorio["linhas_por_segundo"] = relatorio["lidas"] / segundos if segundos else 0.0
+        print(f"{relatorio['importados']} {tipo} importados de {relatorio['lidas']} linhas "
+              f"em {segundos:.2f}s ({relatorio['linhas_por_segundo']:.0f} linhas/s).")
+        if relatorio["rejeitados"]:
+            print(f"{len(relatorio['rejeitados'])} linhas rejeitadas:")
+            for numero_linha, motivo in relatorio["rejeitados"][:20]:
+                print(f"- Linha {numero_linha}: {motivo}")
+        return relatorio
+
+
+if __name__ == "__main__":
+    from Clinica.Database import Database
+
+    if len(sys.argv) != 3 or sys.argv[1] not in ("pacientes", "medicos"):
+        print("Uso: python -m Clinica.Importacao pacientes|medicos arquivo.csv")
+        sys.exit(1)
+    with Database() as db:
+        importador = ImportadorCSV(db)
+        if sys.argv[1] == "pacientes":
+            importador.importarPacientes(sys.argv[2])
+        else:
+            importador.importarMedicos(sys.argv[2])
@@ -1,8 +1,9 @@
-import stdiomask
-from Clinica.Consulta import Historico
+from datetime import date, timedelta
+from Clinica.Autenticacao import Autenticacao
+from Clinica.Historico import Historico
 from Clinica.Medico import Medico
-from Clinica.Paciente import Paciente
-from Clinica.Database import Database
+from Clinica.Paciente import Paciente, formatar_cpf
+from Clinica.Database import HORARIOS_MANHA, HORARIOS_TARDE, Database
 from Clinica.Relatorio import Relatorio
 
 def solicitar_credenciais():
@@ -15,7 +16,8 @@ def solicitar_credenciais():
     # Solicita o nome de usuário
     username = input("Digite seu nome de usuário: ")
 
-    # Solicita a senha com asteriscos
+    # Solicita a senha com asteriscos (o stdiomask só é carregado quando alguém faz login)
+    import stdiomask
     password = stdiomask.getpass("Digite sua senha: ")
     return username, password
 
@@ -41,8 +43,8 @@ def mostrar_horarios(nome_medico):
     Args:
         nome_medico (str): Nome do médico.
     """
-    db = Database()
-    horarios = db.mostrarHorarios(nome_medico)
+    with Database() as db:
+        horarios = db.mostrarHorarios(nome_medico)
     if horarios:
         print("Horários do médico:")
         for horario in horarios:
@@ -50,24 +52,6 @@ def mostrar_horarios(nome_medico):
     else:
         print(f"Nenhum horário encontrado para o médico {nome_medico}.")
 
-def formatar_cpf(cpf):
-    """
-    Formata um CPF para o formato XXX.XXX.XXX-XX.
-
-    Args:
-        cpf (str): O CPF a ser formatado.
-
-    Retorna:
-        str: O CPF formatado.
-
-    Raises:
-        ValueError: Se o CPF não contiver 11 dígitos.
-    """
-    cpf = ''.join(filter(str.isdigit, str(cpf)))
-    if len(cpf) != 11:
-        raise ValueError("O CPF deve conter 11 dígitos.")
-    return f"{cpf[:3]}.{cpf[3:6]}.{cpf[6:9]}-{cpf[9:]}"
-
 def statusOff():
     """
     Desativa o status do sistema.
@@ -77,152 +61,201 @@ def statusOff():
     """
     return False
 
-# Inicialização do status do sistema
-status = True
-while status:
-    db = Database()
-    username, password = solicitar_credenciais()
-    credenciais = [username, password]
-    db.criar_adm(username,password)
-    login = db.autenticar_usuario(credenciais[0], credenciais[1])
-    if login:
-        while True:
-            print("=" * 50)
-            print("Gerenciamento banco de dados Clínica")
-            print("=" * 50)
-            print("Menu:\n"
-                  "1. Cadastrar Paciente\n"
-                  "2. Cadastrar Médico\n"
-                  "3. Agendar consulta\n"
-                  "4. Gerenciar horários e consultas\n"
-                  "5. Gerar relatório\n"
-                  "6. Consultar histórico médico\n"
-                  "7. Atualizar cadastro\n"
-                  "8. Sair\n")
-            try:
-                x = input("O que deseja realizar?: ")
-                if x == "1":
-                    # Cadastro de Paciente
-                    p_nome = input("Insira o Primeiro nome do paciente: ")
-                    p_sobrenome = input("Insira Sobrenome do paciente: ")
-                    p_cpf = formatar_cpf(input("Insira CPF do paciente: "))
-                    p_telefone = input("Insira Número de Telefone do paciente: ")
-                    p_cep = input("Insira CEP do paciente: ")
-                    p_numero = input("Insira Número Residencial do paciente: ")
-                    p_complemento = input("Insira Complemento do paciente: ")
-                    p_datanasc = input("Insira Data de nascimento do paciente (AAAA-MM-DD): ")
-                    p_email = input("Insira email do paciente: ")
-                    p = Paciente(p_nome, p_sobrenome, p_telefone, p_cpf, p_cep, p_numero, p_complemento, p_datanasc, p_email)
-                    db.cadastrarPaciente(p)
-                elif x == "2":
-                    # Cadastro de Médico
-                    m_nome = input("Insira nome do médico: ")
-                    m_sobrenome = input("Insira sobrenome do médico: ")
-                    m_crm = input("Insira CRM do médico: ")
-                    m_especialidade = input("Insira especialidade do médico: ")
-                    m_datanasc = input("Insira data de nascimento do médico (AAAA-MM-DD): ")
-                    m_email = input("Insira email do médico: ")
-                    m_telefone = input("Insira telefone do médico: ")
-                    m_cep = input("Insira CEP do médico: ")
-                    m_numero = input("Insira Número Residencial do médico: ")
-                    m_complemento = input("Insira Complemento do médico: ")
-                    # Criar um objeto Medico com os dados fornecidos
-                    medico = Medico(m_crm, m_especialidade, m_nome, m_sobrenome, m_datanasc, m_email, m_telefone, m_cep,
-                                    m_numero, m_complemento)
+def main():
+    """
+    Executa a interface de terminal: cria o administrador, se necessário, e atende o menu após o login.
+    """
+    # Criação do administrador, uma única vez, antes do primeiro login
+    with Database() as db:
+        if not db.existeUsuario():
+            print("Nenhum usuário cadastrado. Defina o administrador do sistema.")
+            username, password = solicitar_credenciais()
+            db.criar_adm(username, password)
 
-                    # Chamar o método cadastrarMedico da classe Database para inserir o médico no banco de dados
-                    db.cadastrarMedico(medico)
-                    db.padronizadoConsultas()
-                elif x == "3":
-                    # Agendar consulta
-                    mostrar_especialidades(db)
-                    especialidade = input("Digite Especialidade Desejada: ")
-                    medicos = db.mostrarMedicosPorEspecialidade(especialidade)
-                    if medicos:
-                        print("Médicos disponíveis para a especialidade de", especialidade)
-                        for medico in medicos:
-                            print(f"CRM: {medico[0]}, Nome: {medico[1]}")
-                    else:
-                        print(f"Nenhum médico encontrado para a especialidade de {especialidade}.")
-                        break
-                    crm = input("Digite o CRM do Médico Desejado:")
-                    dia_consulta = input("Digite o dia da consulta (AAAA-MM-DD): ")
-                    horarios_disponiveis = db.mostrarConsultasDisponiveis(crm, dia_consulta)
-                    if horarios_disponiveis:
-                        print("Consultas disponíveis para o médico selecionado:")
-                        for consulta in horarios_disponiveis:
-                            print(f" {consulta[0]},  {consulta[1]},  {consulta[2]},  {consulta[3]}")
-                    else:
-                        print(f"Nenhuma consulta disponível para o médico com CRM {crm} no dia {dia_consulta}.")
+    autenticacao = Autenticacao()
+
+    # Inicialização do status do sistema
+    status = True
+    while status:
+        db = Database()
+        username, password = solicitar_credenciais()
+        token = autenticacao.autenticar(username, password)
+        if token:
+            if not db.disponibilidade.carregado:
+                db.carregarDisponibilidade()
+            while True:
+                print("=" * 50)
+                print("Gerenciamento banco de dados Clínica")
+                print("=" * 50)
+                print("Menu:\n"
+                      "1. Cadastrar Paciente\n"
+                      "2. Cadastrar Médico\n"
+                      "3. Agendar consulta\n"
+                      "4. Gerenciar horários e consultas\n"
+                      "5. Gerar relatório\n"
+                      "6. Consultar histórico médico\n"
+                      "7. Atualizar cadastro\n"
+                      "8. Sair\n")
+                try:
+                    x = input("O que deseja realizar?: ")
+                    if x == "1":
+                        # Cadastro de Paciente
+                        p_nome = input("Insira o Primeiro nome do paciente: ")
+                        p_sobrenome = input("Insira Sobrenome do paciente: ")
+                        p_cpf = formatar_cpf(input("Insira CPF do paciente: "))
+                        p_telefone = input("Insira Número de Telefone do paciente: ")
+                        p_cep = input("Insira CEP do paciente: ")
+                        p_numero = input("Insira Número Residencial do paciente: ")
+                        p_complemento = input("Insira Complemento do paciente: ")
+                        p_datanasc = input("Insira Data de nascimento do paciente (AAAA-MM-DD): ")
+                        p_email = input("Insira email do paciente: ")
+                        p = Paciente(p_nome, p_sobrenome, p_telefone, p_cpf, p_cep, p_numero, p_complemento, p_datanasc, p_email)
+                        db.cadastrarPaciente(p)
+                    elif x == "2":
+                        # Cadastro de Médico
+                        m_nome = input("Insira nome do médico: ")
+                        m_sobrenome = input("Insira sobrenome do médico: ")
+                        m_crm = input("Insira CRM do médico: ")
+                        m_especialidade = input("Insira especialidade do médico: ")
+                        m_datanasc = input("Insira data de nascimento do médico (AAAA-MM-DD): ")
+                        m_email = input("Insira email do médico: ")
+                        m_telefone = input("Insira telefone do médico: ")
+                        m_cep = input("Insira CEP do médico: ")
+                        m_numero = input("Insira Número Residencial do médico: ")
+                        m_complemento = input("Insira Complemento do médico: ")
+                        # Criar um objeto Medico com os dados fornecidos
+                        medico = Medico(m_crm, m_especialidade, m_nome, m_sobrenome, m_datanasc, m_email, m_telefone, m_cep,
+                                        m_numero, m_complemento)
+
+                        # Chamar o método cadastrarMedico da classe Database para inserir o médico no banco de dados
+                        db.cadastrarMedico(medico)
+                        criados = db.padronizadoConsultas()
+                        print(f"{criados} horários semanais adicionados à agenda modelo.")
+                    elif x == "3":
+                        # Agendar consulta
+                        mostrar_especialidades(db)
+                        especialidade = input("Digite Especialidade Desejada: ")
+                        medicos = db.mostrarMedicosPorEspecialidade(especialidade)
+                        if medicos:
+                            print("Médicos disponíveis para a especialidade de", especialidade)
+                            for medico in medicos:
+                                print(f"CRM: {medico[0]}, Nome: {medico[1]}")
+                        else:
+                            print(f"Nenhum médico encontrado para a especialidade de {especialidade}.")
+                            continue
+                        proximos = db.buscarPrimeirosHorarios(especialidade, quantidade=5)
+                        if proximos:
+                            print("Próximos horários livres da especialidade:")
+                            for numero, (data, hora, crm, nome_medico) in enumerate(proximos, start=1):
+                                print(f" {numero}. {data}  {hora}  {nome_medico} (CRM: {crm})")
+                        escolha = input("Digite o número de um dos horários acima ou Enter para escolher médico e dia: ")
+                        if escolha.isdigit() and 1 <= int(escolha) <= len(proximos or []):
+                            dia_consulta, horario, crm, nome_dr = proximos[int(escolha) - 1]
+                        else:
+                            crm = input("Digite o CRM do Médico Desejado:")
+                            hoje = date.today()
+                            dias_livres = db.diasComHorarioLivre(crm, hoje, hoje + timedelta(days=30))
+                            if dias_livres:
+                                print("Dias com horário livre nos próximos 30 dias:",
+                                      ", ".join(dia.strftime('%Y-%m-%d') for dia in dias_livres[:10]))
+                            dia_consulta = input("Digite o dia da consulta (AAAA-MM-DD): ")
+                            horarios_disponiveis = db.mostrarConsultasDisponiveis(crm, dia_consulta)
+                            if horarios_disponiveis:
+                                print("Consultas disponíveis para o médico selecionado:")
+                                for consulta in horarios_disponiveis:
+                                    print(f" {consulta[0]},  {consulta[1]},  {consulta[2]},  {consulta[3]}")
+                            else:
+                                print(f"Nenhuma consulta disponível para o médico com CRM {crm} no dia {dia_consulta}.")
+                                continue
+                            horario = input("Digite o horário da consulta (HH:MM:SS): ")
+                            nome_dr = db.descobrirNome(crm)
+                        p_cpf = formatar_cpf(input("Digite o CPF do paciente: "))
+                        db.marcarConsulta(nome_dr, dia_consulta, horario, p_cpf)
+                    elif x == "4":
+                        # Gerenciamento de horários
+                        print("=" * 50)
+                        print("Gerenciamento de horários")
+                        print("=" * 50)
+                        print("Menu:\n"
+                              "1. Disponibilizar horário\n"
+                              "2. Indisponibilizar horário\n"
+                              "3. Mostrar horários do médico\n"
+                              "4. Bloquear período (férias, congressos)\n"
+                              "5. Liberar período\n"
+                              "6. Voltar")
+                        n = input("O que deseja fazer: ")
+                        if n == "1":
+                            # Disponibilizar horário
+                            nome_dr = input("Digite o nome do médico: ")
+                            data = input("Digite a data (AAAA-MM-DD): ")
+                            horario = input("Digite o horário (HH:MM:SS): ")
+                            db.disponibilizarHorario(nome_dr, data, horario)
+                        elif n == "2":
+                            # Indisponibilizar horário
+                            nome_dr = input("Digite o nome do médico: ")
+                            data = input("Digite a data (AAAA-MM-DD): ")
+                            horario = input("Digite o horário (HH:MM:SS): ")
+                            db.indisponibilizarHorario(nome_dr, data, horario)
+                        elif n == "3":
+                            # Mostrar horários do médico
+                            nome_dr = input("Digite o nome do médico: ")
+                            mostrar_horarios(nome_dr)
+                        elif n in ("4", "5"):
+                            # Bloqueio ou liberação de vários dias de uma vez
+                            crm = input("Digite o CRM do médico: ")
+                            data_inicio = input("Data inicial (AAAA-MM-DD): ")
+                            data_fim = input("Data final (AAAA-MM-DD): ")
+                            periodo = input("Período (M = manhã, T = tarde, Enter para o dia todo): ").strip().upper()
+                            horarios = {"M": HORARIOS_MANHA, "T": HORARIOS_TARDE}.get(periodo)
+                            if n == "4":
+                                desmarcadas = db.bloquearPeriodo(crm, data_inicio, data_fim, horarios=horarios)
+                                for _, dia, hora, cpf, nome_paciente in desmarcadas or []:
+                                    print(f"Remarcar: {dia} {hora} - {nome_paciente} (CPF: {cpf})")
+                            else:
+                                db.liberarPeriodo(crm, data_inicio, data_fim, horarios=horarios)
+                        elif n == "6":
+                            continue
+                        else:
+                            print("Opção inválida. Tente novamente.")
+                    elif x == "5":
+                        # Gerar relatório
+                        relatorio = Relatorio()
+                        relatorio.imprimirRelatorio()
+                    elif x == "6":
+                        # Consultar histórico médico
+                        cpf = formatar_cpf(input("Insira o CPF: "))
+                        data_inicio = input("Data inicial (AAAA-MM-DD, Enter para todas): ") or None
+                        data_fim = input("Data final (AAAA-MM-DD, Enter para todas): ") or None
+                        print("Seu Histórico Médico:")
+                        Historico().imprimirHistorico(cpf, data_inicio, data_fim)
+                    elif x == "7":
+                        # Atualizar cadastro
+                        tipo_cadastro = input("Você é paciente ou médico? (P/M): ").upper()
+                        if tipo_cadastro == "P":
+                            cpf = formatar_cpf(input("Insira o CPF do paciente: "))
+                            novo_nome = input("Novo nome: ")
+                            novo_email = input("Novo email: ")
+                            db.atualizarPaciente(cpf, novo_nome, novo_email)
+                        elif tipo_cadastro == "M":
+                            crm = input("Insira o CRM do médico: ")
+                            novo_nome = input("Novo nome: ")
+                            novo_email = input("Novo email: ")
+                            db.atualizarMedico(crm, novo_nome, novo_email)
+                        else:
+                            print("Opção inválida.")
+                    elif x == "8":
+                        # Sair
+                        status = statusOff()
                         break
-                    horario = input("Digite o horário da consulta (HH:MM:SS): ")
-                    p_cpf = formatar_cpf(input("Digite o CPF do paciente: "))
-                    nome_dr = db.descobrirNome(crm)
-                    db.marcarConsulta(nome_dr, dia_consulta, horario, p_cpf)
-                elif x == "4":
-                    # Gerenciamento de horários
-                    print("=" * 50)
-                    print("Gerenciamento de horários")
-                    print("=" * 50)
-                    print("Menu:\n"
-                          "1. Disponibilizar horário\n"
-                          "2. Indisponibilizar horário\n"
-                          "3. Mostrar horários do médico\n"
-                          "4. Voltar")
-                    n = input("O que deseja fazer: ")
-                    if n == "1":
-                        # Disponibilizar horário
-                        nome_dr = input("Digite o nome do médico: ")
-                        data = input("Digite a data (AAAA-MM-DD): ")
-                        horario = input("Digite o horário (HH:MM:SS): ")
-                        db.disponibilizarHorario(nome_dr, data, horario)
-                    elif n == "2":
-                        # Indisponibilizar horário
-                        nome_dr = input("Digite o nome do médico: ")
-                        data = input("Digite a data (AAAA-MM-DD): ")
-                        horario = input("Digite o horário (HH:MM:SS): ")
-                        db.indisponibilizarHorario(nome_dr, data, horario)
-                    elif n == "3":
-                        # Mostrar horários do médico
-                        nome_dr = input("Digite o nome do médico: ")
-                        mostrar_horarios(nome_dr)
-                    elif n == "4":
-                        continue
                     else:
                         print("Opção inválida. Tente novamente.")
-                elif x == "5":
-                    # Gerar relatório
-                    relatorio = Relatorio()
-                    relatorio.imprimirRelatorio()
-                elif x == "6":
-                    # Consultar histórico médico
-                    cpf = formatar_cpf(input("Insira o CPF: "))
-                    historico = db.historicoMedico(cpf)
-                    if historico is None:
-                        print("Seu Histórico Médico está vazio.")
-                    else:
-                        print("Seu Histórico Médico:")
-                        print(historico)
-                elif x == "7":
-                    # Atualizar cadastro
-                    tipo_cadastro = input("Você é paciente ou médico? (P/M): ").upper()
-                    if tipo_cadastro == "P":
-                        cpf = formatar_cpf(input("Insira o CPF do paciente: "))
-                        novo_nome = input("Novo nome: ")
-                        novo_email = input("Novo email: ")
-                        db.atualizarPaciente(cpf, novo_nome, novo_email)
-                    elif tipo_cadastro == "M":
-                        crm = input("Insira o CRM do médico: ")
-                        novo_nome = input("Novo nome: ")
-                        novo_email = input("Novo email: ")
-                        db.atualizarMedico(crm, novo_nome, novo_email)
-                    else:
-                        print("Opção inválida.")
-                elif x == "8":
-                    # Sair
-                    status = statusOff()
-                    break
-                else:
-                    print("Opção inválida. Tente novamente.")
-            except Exception as e:
-                print(f"Erro: {e}")
\ No newline at end of file
+                except Exception as e:
+                    print(f"Erro: {e}")
+        db.fechar()
+        if token:
+            autenticacao.encerrarSessao(token)
+    autenticacao.fechar()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,389 @@
+import contextvars
+import functools
+import os
+import re
+import threading
+import time
+from datetime import datetime
+
+# Limites (em segundos) dos buckets dos histogramas de latência
+LIMITES_HISTOGRAMA = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+# Método instrumentado em execução, usado para atribuir cada comando SQL ao método que o enviou
+_metodo_atual = contextvars.ContextVar("metodo_atual", default="-")
+
+_ESPACOS = re.compile(r"\s+")
+_LISTA_PARAMETROS = re.compile(r"%s(?:, %s)+")
+
+
+def normalizarComando(sql):
+    """
+    Reduz um comando SQL a uma forma estável para uso como rótulo: espaços colapsados e listas
+    de parâmetros de tamanho variável (IN (%s, %s, ...)) trocadas por "%s...".
+    """
+    return _LISTA_PARAMETROS.sub("%s...", _ESPACOS.sub(" ", sql).strip())
+
+
+class Histograma:
+    """
+    Histograma de latências com buckets fixos (LIMITES_HISTOGRAMA), no formato do Prometheus.
+    """
+
+    __slots__ = ("contagens", "soma", "total")
+
+    def __init__(self):
+        self.contagens = [0] * len(LIMITES_HISTOGRAMA)
+        self.soma = 0.0
+        self.total = 0
+
+    def observar(self, segundos):
+        self.soma += segundos
+        self.total += 1
+        for posicao, limite in enumerate(LIMITES_HISTOGRAMA):
+            if segundos <= limite:
+                self.contagens[posicao] += 1
+                return
+
+    def acumulado(self):
+        """
+        Retorna (limite, quantidade de observações <= limite) de cada bucket, como o Prometheus espera.
+        """
+        acumulado = 0
+        buckets = []
+        for limite, contagem in zip(LIMITES_HISTOGRAMA, self.contagens):
+            acumulado += contagem
+            buckets.append((limite, acumulado))
+        return buckets
+
+
+class Metricas:
+    """
+    Registro de métricas de acesso ao banco: latência por método e por comando SQL, idas ao
+    servidor, linhas retornadas e log de consultas lentas.
+
+    Desativado por padrão. Quando ativo, custa duas leituras de relógio e uma trava curta por
+    comando, o que permite mantê-lo ligado em produção.
+    """
+
+    def __init__(self):
+        self.ativo = False
+        self.limite_lento = 0.5
+        self.log_lento = None
+        self._trava = threading.Lock()
+        self._trava_log = threading.Lock()
+        self._metodos = {}  # metodo -> Histograma
+        self._comandos = {}  # (metodo, comando) -> [Histograma, idas, linhas]
+        self._lentas = 0
+
+    def ativar(self, limite_lento_ms=500, log_lento=None):
+        """
+        Liga a coleta de métricas.
+
+        Args:
+            limite_lento_ms (float): Comandos que levarem mais que isso vão para o log de lentas.
+            log_lento (str, opcional): Arquivo onde as consultas lentas são acrescentadas.
+                Sem arquivo, as consultas lentas são apenas contadas.
+        """
+        self.limite_lento = limite_lento_ms / 1000
+        self.log_lento = log_lento
+        self.ativo = True
+
+    def desativar(self):
+        """
+        Desliga a coleta. As métricas já coletadas são mantidas.
+        """
+        self.ativo = False
+
+    def zerar(self):
+        """
+        Descarta todas as métricas coletadas.
+        """
+        with self._trava:
+            self._metodos.clear()
+            self._comandos.clear()
+            self._lentas = 0
+
+    def registrarMetodo(self, metodo, segundos):
+        with self._trava:
+            histograma = self._metodos.get(metodo)
+            if histograma is None:
+                histograma = self._metodos[metodo] = Histograma()
+            histograma.observar(segundos)
+
+    def registrarComando(self, sql, segundos, idas, linhas):
+        """
+        Registra a execução de um comando SQL no método instrumentado em andamento.
+
+        Args:
+            sql (str): Comando executado.
+            segundos (float): Tempo de execução somado ao de leitura do resultado.
+            idas (int): Idas ao servidor (uma por execute ou executemany).
+            linhas (int): Linhas lidas do resultado.
+        """
+        metodo = _metodo_atual.get()
+        comando = normalizarComando(sql)
+        with self._trava:
+            registro = self._comandos.get((metodo, comando))
+            if registro is None:
+                registro = self._comandos[(metodo, comando)] = [Histograma(), 0, 0]
+            registro[0].observar(segundos)
+            registro[1] += idas
+            registro[2] += linhas
+            lenta = segundos >= self.limite_lento
+            if lenta:
+                self._lentas += 1
+        if lenta and self.log_lento:
+            linha = (f"{datetime.now().isoformat(timespec='milliseconds')} {segundos * 1000:.1f}ms "
+                     f"metodo={metodo} linhas={linhas} {comando}\n")
+            with self._trava_log:
+                with open(self.log_lento, "a", encoding="utf-8") as arquivo:
+                    arquivo.write(linha)
+
+    def estatisticas(self):
+        """
+        Retorna um resumo das métricas coletadas.
+
+        Returns:
+            dict: metodos (metodo -> chamadas e segundos), comandos ((metodo, comando) -> execuções,
+                  segundos, idas e linhas) e lentas.
+        """
+        with self._trava:
+            return {
+                "metodos": {metodo: {"chamadas": h.total, "segundos": h.soma} for metodo, h in self._metodos.items()},
+                "comandos": {
+                    chave: {"execucoes": h.total, "segundos": h.soma, "idas": idas, "linhas": linhas}
+                    for chave, (h, idas, linhas) in self._comandos.items()
+                },
+                "lentas": self._lentas,
+            }
+
+    def textoPrometheus(self):
+        """
+        Formata as métricas no formato de texto do Prometheus.
+
+        Returns:
+            str: Conteúdo pronto para o coletor de arquivos de texto (textfile collector).
+        """
+        with self._trava:
+            metodos = [(metodo, _copiar(h)) for metodo, h in sorted(self._metodos.items())]
+            comandos = [(chave, _copiar(h), idas, linhas) for chave, (h, idas, linhas) in sorted(self._comandos.items())]
+            lentas = self._lentas
+
+        linhas = [
+            "# HELP clinica_metodo_segundos Latência dos métodos instrumentados.",
+            "# TYPE clinica_metodo_segundos histogram",
+        ]
+        for metodo, histograma in metodos:
+            linhas.extend(_linhasHistograma("clinica_metodo_segundos", f'metodo="{_rotulo(metodo)}"', histograma))
+        linhas += [
+            "# HELP clinica_comando_segundos Latência de cada comando SQL, por método.",
+            "# TYPE clinica_comando_segundos histogram",
+        ]
+        for (metodo, comando), histograma, _, _ in comandos:
+            rotulos = f'metodo="{_rotulo(metodo)}",comando="{_rotulo(comando)}"'
+            linhas.extend(_linhasHistograma("clinica_comando_segundos", rotulos, histograma))
+        linhas += [
+            "# HELP clinica_comando_idas_total Idas ao servidor de cada comando SQL, por método.",
+            "# TYPE clinica_comando_idas_total counter",
+        ]
+        for (metodo, comando), _, idas, _ in comandos:
+            linhas.append(f'clinica_comando_idas_total{{metodo="{_rotulo(metodo)}",comando="{_rotulo(comando)}"}} {idas}')
+        linhas += [
+            "# HELP clinica_comando_linhas_total Linhas retornadas por cada comando SQL, por método.",
+            "# TYPE clinica_comando_linhas_total counter",
+        ]
+        for (metodo, comando), _, _, quantidade in comandos:
+            linhas.append(
+                f'clinica_comando_linhas_total{{metodo="{_rotulo(metodo)}",comando="{_rotulo(comando)}"}} {quantidade}'
+            )
+        linhas += [
+            "# HELP clinica_consultas_lentas_total Comandos acima do limite de consulta lenta.",
+            "# TYPE clinica_consultas_lentas_total counter",
+            f"clinica_consultas_lentas_total {lentas}",
+        ]
+        return "\n".join(linhas) + "\n"
+
+    def exportar(self, caminho):
+        """
+        Grava o texto do Prometheus no arquivo, de forma atômica (o coletor nunca lê um arquivo pela metade).
+
+        Args:
+            caminho (str): Arquivo de destino, normalmente com extensão .prom.
+        """
+        temporario = f"{caminho}.{os.getpid()}.tmp"
+        with open(temporario, "w", encoding="utf-8") as arquivo:
+            arquivo.write(self.textoPrometheus())
+        os.replace(temporario, caminho)
+
+    def iniciarExportacao(self, caminho, intervalo=15):
+        """
+        Exporta as métricas periodicamente em uma thread de fundo.
+
+        Args:
+            caminho (str): Arquivo de destino.
+            intervalo (float): Segundos entre exportações.
+
+        Returns:
+            threading.Event: Evento que, quando ligado, encerra a exportação.
+        """
+        parar = threading.Event()
+
+        def exportarPeriodicamente():
+            while not parar.wait(intervalo):
+                try:
+                    self.exportar(caminho)
+                except OSError as e:
+                    print(f"Erro ao exportar métricas: {e}")
+
+        threading.Thread(target=exportarPeriodicamente, name="exportar-metricas", daemon=True).start()
+        return parar
+
+    def conexao(self, conexao):
+        """
+        Envolve uma conexão para que os cursores criados nela sejam medidos, se a coleta estiver ativa.
+        """
+        return ConexaoInstrumentada(conexao, self) if self.ativo else conexao
+
+    def cursor(self, cursor):
+        """
+        Envolve um cursor já criado para que o próximo comando seja medido, se a coleta estiver ativa.
+
+        Usado com cursores que vivem mais que uma chamada (os preparados de Database), para que a
+        decisão de medir acompanhe ativar() e desativar().
+        """
+        return CursorInstrumentado(cursor, self) if self.ativo else cursor
+
+
+def _copiar(histograma):
+    copia = Histograma()
+    copia.contagens = list(histograma.contagens)
+    copia.soma = histograma.soma
+    copia.total = histograma.total
+    return copia
+
+
+def _rotulo(valor):
+    return valor.replace("\\", "\\\\").replace('"', '\\"').replace("\n", " ")
+
+
+def _linhasHistograma(nome, rotulos, histograma):
+    linhas = [f'{nome}_bucket{{{rotulos},le="{limite}"}} {quantidade}' for limite, quantidade in histograma.acumulado()]
+    linhas.append(f'{nome}_bucket{{{rotulos},le="+Inf"}} {histograma.total}')
+    linhas.append(f"{nome}_sum{{{rotulos}}} {histograma.soma:.6f}")
+    linhas.append(f"{nome}_count{{{rotulos}}} {histograma.total}")
+    return linhas
+
+
+class CursorInstrumentado:
+    """
+    Cursor que mede cada comando, do execute até o fetchall, o próximo comando ou o close.
+    """
+
+    def __init__(self, cursor, metricas):
+        self._cursor = cursor
+        self._metricas = metricas
+        self._sql = None
+
+    def _iniciar(self, sql):
+        self._finalizar()
+        self._sql = sql
+        self._segundos = 0.0
+        self._idas = 0
+        self._linhas = 0
+
+    def _finalizar(self):
+        if self._sql is not None:
+            self._metricas.registrarComando(self._sql, self._segundos, self._idas, self._linhas)
+            self._sql = None
+
+    def _medir(self, funcao, *argumentos):
+        inicio = time.perf_counter()
+        try:
+            return funcao(*argumentos)
+        finally:
+            if self._sql is not None:
+                self._segundos += time.perf_counter() - inicio
+
+    def execute(self, sql, valores=()):
+        self._iniciar(sql)
+        self._idas = 1
+        resultado = self._medir(self._cursor.execute, sql, valores)
+        if self._cursor.description is None:
+            # Sem resultado para ler: o comando já terminou
+            self._finalizar()
+        return resultado
+
+    def executemany(self, sql, linhas):
+        self._iniciar(sql)
+        self._idas = 1
+        resultado = self._medir(self._cursor.executemany, sql, linhas)
+        self._finalizar()
+        return resultado
+
+    def fetchone(self):
+        linha = self._medir(self._cursor.fetchone)
+        if linha is not None and self._sql is not None:
+            self._linhas += 1
+        return linha
+
+    def fetchmany(self, tamanho):
+        linhas = self._medir(self._cursor.fetchmany, tamanho)
+        if self._sql is not None:
+            self._linhas += len(linhas)
+        return linhas
+
+    def fetchall(self):
+        linhas = self._medir(self._cursor.fetchall)
+        if self._sql is not None:
+            self._linhas += len(linhas)
+            self._finalizar()
+        return linhas
+
+    def close(self):
+        self._finalizar()
+        return self._cursor.close()
+
+    def __getattr__(self, nome):
+        # rowcount, lastrowid, description...
+        return getattr(self._cursor, nome)
+
+
+class ConexaoInstrumentada:
+    """
+    Conexão cujos cursores são instrumentados. Os demais atributos são os da conexão original.
+    """
+
+    def __init__(self, conexao, metricas):
+        self._conexao = conexao
+        self._metricas = metricas
+
+    def cursor(self, *argumentos, **opcoes):
+        return CursorInstrumentado(self._conexao.cursor(*argumentos, **opcoes), self._metricas)
+
+    def __getattr__(self, nome):
+        return getattr(self._conexao, nome)
+
+
+# Registro de métricas do processo, compartilhado por Database e pelos módulos auxiliares
+metricas = Metricas()
+
+
+def instrumentado(funcao):
+    """
+    Decorador que mede a latência do método e atribui a ele os comandos SQL que enviar.
+    """
+    nome = funcao.__qualname__
+
+    @functools.wraps(funcao)
+    def medido(*argumentos, **opcoes):
+        if not metricas.ativo:
+            return funcao(*argumentos, **opcoes)
+        token = _metodo_atual.set(nome)
+        inicio = time.perf_counter()
+        try:
+            return funcao(*argumentos, **opcoes)
+        finally:
+            metricas.registrarMetodo(nome, time.perf_counter() - inicio)
+            _metodo_atual.reset(token)
+
+    return medido
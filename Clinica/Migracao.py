@@ -0,0 +1,313 @@
+from datetime import datetime
+
+from Clinica.Database import SQL_AGENDA_PADRAO
+from Clinica.Resumo import SQL_RECONSTRUIR
+
+# Tabelas do sistema. Todas usam IF NOT EXISTS para que a migração possa ser reaplicada.
+TABELAS = [
+    """
+    CREATE TABLE IF NOT EXISTS endereco (
+        id_endereco INT AUTO_INCREMENT PRIMARY KEY,
+        cep VARCHAR(9) NOT NULL,
+        numero VARCHAR(10),
+        complemento VARCHAR(100)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS paciente (
+        id_paciente INT AUTO_INCREMENT PRIMARY KEY,
+        nome VARCHAR(100) NOT NULL,
+        cpf VARCHAR(14) NOT NULL,
+        data_nasc DATE,
+        email VARCHAR(100),
+        telefone VARCHAR(20),
+        id_endereco INT,
+        FOREIGN KEY (id_endereco) REFERENCES endereco (id_endereco)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS medico (
+        crm VARCHAR(20) PRIMARY KEY,
+        nome VARCHAR(100) NOT NULL,
+        data_nasc DATE,
+        email VARCHAR(100),
+        telefone VARCHAR(20),
+        id_endereco INT,
+        FOREIGN KEY (id_endereco) REFERENCES endereco (id_endereco)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS especialidade (
+        especialidade_id INT AUTO_INCREMENT PRIMARY KEY,
+        especialidade VARCHAR(100) NOT NULL
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS especialidade_medico (
+        especialidade_id INT NOT NULL,
+        crm VARCHAR(20) NOT NULL,
+        PRIMARY KEY (especialidade_id, crm),
+        FOREIGN KEY (especialidade_id) REFERENCES especialidade (especialidade_id),
+        FOREIGN KEY (crm) REFERENCES medico (crm)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS consulta (
+        id_consulta INT AUTO_INCREMENT PRIMARY KEY,
+        horario TIME NOT NULL,
+        data DATE NOT NULL,
+        status CHAR(1) NOT NULL DEFAULT 'D',
+        crm VARCHAR(20) NOT NULL,
+        id_paciente INT,
+        FOREIGN KEY (crm) REFERENCES medico (crm),
+        FOREIGN KEY (id_paciente) REFERENCES paciente (id_paciente)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS usuario (
+        id_usuario INT AUTO_INCREMENT PRIMARY KEY,
+        username VARCHAR(50) NOT NULL,
+        password VARCHAR(100) NOT NULL
+    )
+    """,
+]
+
+# Índices usados pelas consultas frequentes de Database: (tabela, nome, colunas, único)
+INDICES = [
+    # marcarConsulta (impede duas linhas para o mesmo horário), disponibilizarHorario e indisponibilizarHorario
+    ("consulta", "uq_consulta_horario", ("crm", "data", "horario"), True),
+    # historicoMedico
+    ("consulta", "idx_consulta_paciente", ("id_paciente", "data"), False),
+    # Relatorio (o InnoDB acrescenta id_consulta ao índice, o que atende à paginação)
+    ("consulta", "idx_consulta_status", ("status",), False),
+    # descobrirIdPaciente
+    ("paciente", "uq_paciente_cpf", ("cpf",), True),
+    # descobrirCrm
+    ("medico", "idx_medico_nome", ("nome",), False),
+    # cadastrarMedico e mostrarMedicosPorEspecialidade
+    ("especialidade", "uq_especialidade_nome", ("especialidade",), True),
+    ("especialidade_medico", "idx_especialidade_medico_crm", ("crm",), False),
+    # autenticar_usuario
+    ("usuario", "uq_usuario_username", ("username",), True),
+]
+
+# buscarPrimeirosHorarios: para cada médico da especialidade, lê só os horários livres da janela
+INDICES_HORARIOS_LIVRES = [
+    ("consulta", "idx_consulta_livres", ("crm", "status", "data", "horario"), False),
+]
+
+# Quantidade de horários por médico, semana, horário e status, mantida por Database
+TABELA_RESUMO = """
+    CREATE TABLE IF NOT EXISTS resumo_agenda (
+        crm VARCHAR(20) NOT NULL,
+        semana DATE NOT NULL,
+        horario TIME NOT NULL,
+        status CHAR(1) NOT NULL,
+        total INT NOT NULL DEFAULT 0,
+        PRIMARY KEY (crm, semana, horario, status)
+    )
+    """
+
+# Resumo inicial da migração 4, quando todos os horários eram linhas de consulta
+SQL_RESUMO_INICIAL = """
+    INSERT INTO resumo_agenda (crm, semana, horario, status, total)
+    SELECT crm, DATE_SUB(data, INTERVAL WEEKDAY(data) DAY), horario, status, COUNT(*)
+    FROM consulta
+    GROUP BY crm, DATE_SUB(data, INTERVAL WEEKDAY(data) DAY), horario, status
+    """
+
+# Horários semanais de atendimento de cada médico; consulta passa a guardar só as exceções
+TABELA_AGENDA_MODELO = """
+    CREATE TABLE IF NOT EXISTS agenda_modelo (
+        crm VARCHAR(20) NOT NULL,
+        dia_semana TINYINT NOT NULL,
+        horario TIME NOT NULL,
+        PRIMARY KEY (crm, dia_semana, horario),
+        FOREIGN KEY (crm) REFERENCES medico (crm)
+    )
+    """
+
+# Condição "a linha de consulta ocupa um horário da agenda modelo"
+_NO_MODELO = """
+    EXISTS (SELECT 1 FROM agenda_modelo
+            WHERE agenda_modelo.crm = consulta.crm AND agenda_modelo.dia_semana = WEEKDAY(consulta.data)
+              AND agenda_modelo.horario = consulta.horario)
+    """
+
+# Remove os horários criados pelo antigo padronizadoConsultas que o modelo já representa:
+# livres dentro do modelo e bloqueados fora dele (dias fechados)
+SQL_REMOVER_LIVRES_MATERIALIZADOS = f"DELETE FROM consulta WHERE status = 'D' AND id_paciente IS NULL AND {_NO_MODELO}"
+SQL_REMOVER_BLOQUEIOS_FORA_DO_MODELO = f"DELETE FROM consulta WHERE status = 'I' AND id_paciente IS NULL AND NOT {_NO_MODELO}"
+
+# Consultas passadas (agendadas e realizadas) movidas da tabela consulta por Arquivamento
+TABELA_CONSULTA_ARQUIVO = """
+    CREATE TABLE IF NOT EXISTS consulta_arquivo (
+        id_consulta INT PRIMARY KEY,
+        horario TIME NOT NULL,
+        data DATE NOT NULL,
+        status CHAR(1) NOT NULL,
+        crm VARCHAR(20) NOT NULL,
+        id_paciente INT,
+        arquivada_em DATETIME NOT NULL
+    )
+    """
+
+INDICES_ARQUIVO = [
+    # Arquivamento: seleção das linhas anteriores à data limite
+    ("consulta", "idx_consulta_data", ("data",), False),
+    # historicoMedico e mostrarHorarios em períodos passados
+    ("consulta_arquivo", "idx_arquivo_paciente", ("id_paciente", "data"), False),
+    ("consulta_arquivo", "idx_arquivo_medico", ("crm", "data"), False),
+]
+
+# Diário só de inclusão das mudanças de status da agenda e posição de leitura de cada consumidor
+TABELAS_DIARIO = [
+    """
+    CREATE TABLE IF NOT EXISTS diario_agenda (
+        seq INT AUTO_INCREMENT PRIMARY KEY,
+        crm VARCHAR(20) NOT NULL,
+        data DATE NOT NULL,
+        horario TIME NOT NULL,
+        status_anterior CHAR(1),
+        status_novo CHAR(1),
+        registrado_em DATETIME NOT NULL
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS diario_checkpoint (
+        consumidor VARCHAR(50) PRIMARY KEY,
+        seq INT NOT NULL,
+        atualizado_em DATETIME NOT NULL
+    )
+    """,
+]
+
+# Pulso gravado no primário a cada segundo; o último que chegou a uma réplica mede o atraso dela
+TABELA_REPLICA_PULSO = """
+    CREATE TABLE IF NOT EXISTS replica_pulso (
+        origem VARCHAR(50) PRIMARY KEY,
+        registrado_em DATETIME NOT NULL
+    )
+    """
+
+# Migrações versionadas: (versão, descrição, comandos SQL, índices)
+MIGRACOES = [
+    (1, "Cria as tabelas do sistema", TABELAS, []),
+    (2, "Cria os índices das consultas frequentes", [], INDICES),
+    (3, "Cria o índice de busca de horários livres", [], INDICES_HORARIOS_LIVRES),
+    (4, "Cria e preenche o resumo da agenda", [TABELA_RESUMO, SQL_RESUMO_INICIAL], []),
+    (5, "Substitui os horários livres materializados pela agenda modelo", [
+        TABELA_AGENDA_MODELO, SQL_AGENDA_PADRAO, SQL_REMOVER_LIVRES_MATERIALIZADOS,
+        SQL_REMOVER_BLOQUEIOS_FORA_DO_MODELO, "DELETE FROM resumo_agenda", SQL_RECONSTRUIR,
+    ], []),
+    (6, "Cria o arquivo de consultas passadas", [TABELA_CONSULTA_ARQUIVO], INDICES_ARQUIVO),
+    (7, "Cria o diário de transições da agenda", TABELAS_DIARIO, []),
+    (8, "Cria o pulso de replicação", [TABELA_REPLICA_PULSO], []),
+]
+
+
+class Migracao:
+    """
+    Aplica as migrações de esquema do sistema e verifica os índices de um banco existente.
+    """
+
+    def __init__(self, db):
+        """
+        Args:
+            db (Database): Instância do banco de dados onde as migrações serão aplicadas.
+        """
+        self.connection = db.connection
+        self.backend = db.backend
+
+    def versaoAtual(self):
+        """
+        Retorna a última versão de migração aplicada.
+
+        Returns:
+            int: Versão atual do esquema, ou 0 se nenhuma migração foi aplicada.
+        """
+        cursor = self.connection.cursor()
+        try:
+            cursor.execute(
+                "CREATE TABLE IF NOT EXISTS schema_versao ("
+                "versao INT PRIMARY KEY, descricao VARCHAR(200) NOT NULL, aplicada_em DATETIME NOT NULL)"
+            )
+            cursor.execute("SELECT MAX(versao) FROM schema_versao")
+            versao = cursor.fetchone()[0]
+            return versao or 0
+        finally:
+            cursor.close()
+
+    def aplicar(self):
+        """
+        Aplica, em ordem, as migrações ainda não registradas em schema_versao.
+
+        Tabelas e índices que já existem são mantidos, então a operação pode ser repetida.
+
+        Returns:
+            list: Versões aplicadas nesta execução.
+        """
+        versao_atual = self.versaoAtual()
+        aplicadas = []
+        cursor = self.connection.cursor()
+        try:
+            for versao, descricao, comandos, indices in MIGRACOES:
+                if versao <= versao_atual:
+                    continue
+                for comando in comandos:
+                    cursor.execute(comando)
+                for tabela, nome, colunas, unico in self._faltantes(indices):
+                    tipo = "UNIQUE INDEX" if unico else "INDEX"
+                    cursor.execute(f"CREATE {tipo} {nome} ON {tabela} ({', '.join(colunas)})")
+                cursor.execute(
+                    "INSERT INTO schema_versao (versao, descricao, aplicada_em) VALUES (%s, %s, %s)",
+                    (versao, descricao, datetime.now())
+                )
+                self.connection.commit()
+                aplicadas.append(versao)
+                print(f"Migração {versao} aplicada: {descricao}")
+            return aplicadas
+        except Exception as e:
+            print(f"Erro ao aplicar migração: {e}")
+            self.connection.rollback()
+            return aplicadas
+        finally:
+            cursor.close()
+
+    def indicesAusentes(self):
+        """
+        Lista os índices esperados que não existem no banco.
+
+        Um índice é considerado existente se houver, na mesma tabela, qualquer índice com
+        exatamente as mesmas colunas na mesma ordem, independente do nome.
+
+        Returns:
+            list: Tuplas (tabela, nome, colunas, único) dos índices ausentes.
+        """
+        return self._faltantes([indice for _, _, _, indices in MIGRACOES for indice in indices])
+
+    def _faltantes(self, indices):
+        existentes = self._indicesExistentes()
+        return [indice for indice in indices if indice[2] not in existentes.get(indice[0], set())]
+
+    def _indicesExistentes(self):
+        return self.backend.indicesExistentes(self.connection)
+
+if __name__ == "__main__":
+    import sys
+
+    from Clinica.Backend import BackendSQLite
+    from Clinica.Database import Database
+
+    # python -m Clinica.Migracao [arquivo.db]: com um arquivo, migra um banco SQLite em vez do MySQL
+    backend = BackendSQLite(sys.argv[1]) if len(sys.argv) > 1 else None
+    with Database(backend=backend) as db:
+        migracao = Migracao(db)
+        migracao.aplicar()
+        ausentes = migracao.indicesAusentes()
+        if ausentes:
+            print("Índices ausentes:")
+            for tabela, nome, colunas, _ in ausentes:
+                print(f"- {tabela}.{nome} ({', '.join(colunas)})")
+        else:
+            print("Todos os índices esperados estão presentes.")
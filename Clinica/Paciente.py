@@ -44,4 +44,23 @@ class Paciente: #Usar classe super() para atributos repetidos
 
     @property
     def telefone(self):
-        return self.__telefone
\ No newline at end of file
+        return self.__telefone
+
+
+def formatar_cpf(cpf):
+    """
+    Formata um CPF para o formato XXX.XXX.XXX-XX.
+
+    Args:
+        cpf (str): O CPF a ser formatado.
+
+    Retorna:
+        str: O CPF formatado.
+
+    Raises:
+        ValueError: Se o CPF não contiver 11 dígitos.
+    """
+    cpf = ''.join(filter(str.isdigit, str(cpf)))
+    if len(cpf) != 11:
+        raise ValueError("O CPF deve conter 11 dígitos.")
+    return f"{cpf[:3]}.{cpf[3:6]}.{cpf[6:9]}-{cpf[9:]}"
@@ -1,83 +1,179 @@
-from Database import Database
+from Clinica.Database import Database
+from Clinica.Resumo import DIMENSOES
+
+
 class Relatorio:
+    # Títulos e rótulos de cada relatório, indexados pelo status da consulta
+    RELATORIOS = {
+        'I': ("Consultas Indisponíveis", "Indisponível"),
+        'A': ("Consultas Agendadas", "Agendada"),
+    }
+
+    def __init__(self, tamanho_pagina=50, tamanho_lote=10, config=None):
+        """
+        Args:
+            tamanho_pagina (int): Quantidade de consultas exibidas antes de pedir para continuar.
+            tamanho_lote (int): Quantidade de linhas lidas do servidor a cada fetchmany.
+            config (dict, opcional): Parâmetros de conexão repassados a Database, por exemplo a
+                réplica de leitura que deve atender os relatórios.
+        """
+        self.tamanho_pagina = tamanho_pagina
+        self.tamanho_lote = tamanho_lote
+        self.config = config or {"host": "localhost", "user": "root", "password": "", "database": "sistema_consultorio"}
+
+    def paginasPorStatus(self, db, status, ultimo_id=0):
+        """
+        Percorre as consultas de um status em páginas, sem carregar o resultado inteiro na memória.
+
+        Cada página é uma consulta paginada por chave (id_consulta > último id visto), lida de um
+        cursor não bufferizado em lotes de fetchmany. O custo de cada página não depende da
+        posição dela no relatório, ao contrário de LIMIT/OFFSET. As páginas são lidas da réplica,
+        se houver uma em condições de atender (veja Database.leitura).
+
+        Args:
+            db (Database): Instância do banco de dados.
+            status (str): Status das consultas ('I', 'A', ...).
+            ultimo_id (int): Continua a partir deste id_consulta (exclusive).
+
+        Yields:
+            list: Tuplas (id_consulta, horario, data, status, crm, id_paciente) de uma página.
+        """
+        sql = """
+            SELECT id_consulta, horario, data, status, crm, id_paciente
+            FROM consulta
+            WHERE status = %s AND id_consulta > %s
+            ORDER BY id_consulta
+            LIMIT %s
+            """
+        while True:
+            with db.leitura():
+                cursor = db.connection.cursor(buffered=False)
+                try:
+                    cursor.execute(sql, (status, ultimo_id, self.tamanho_pagina))
+                    pagina = []
+                    while True:
+                        lote = cursor.fetchmany(self.tamanho_lote)
+                        if not lote:
+                            break
+                        pagina.extend(lote)
+                finally:
+                    cursor.close()
+
+            if not pagina:
+                return
+            yield pagina
+            if len(pagina) < self.tamanho_pagina:
+                return
+            ultimo_id = pagina[-1][0]
+
+    def imprimirConsultas(self, db, status):
+        """
+        Imprime as consultas de um status página a página, perguntando se deve continuar.
+
+        Args:
+            db (Database): Instância do banco de dados.
+            status (str): Status das consultas ('I' ou 'A').
+        """
+        titulo, rotulo = self.RELATORIOS[status]
+        encontrou = False
+        for pagina in self.paginasPorStatus(db, status):
+            if not encontrou:
+                print("=" * 50)
+                print(f"{titulo}:")
+                encontrou = True
+            for consulta in pagina:
+                print("=" * 50)
+                print(f"ID: {consulta[0]}")
+                print(f"Horário: {consulta[1]}")
+                print(f"Data: {consulta[2]}")
+                print(f"Status: {rotulo}")
+                print(f"Crm: {consulta[4]}")
+                print(f"ID_Paciente: {consulta[5]}")
+            print("=" * 50)
+            if len(pagina) == self.tamanho_pagina:
+                if input("Enter para a próxima página ou 'S' para sair: ").strip().upper() == "S":
+                    break
+        if not encontrou:
+            print(f"{titulo} não encontradas.")
+
+    def imprimirResumo(self, db, dimensoes, data_inicio=None, data_fim=None):
+        """
+        Imprime a quantidade de horários agendados, indisponíveis e disponíveis agrupada por dimensões.
+
+        Os totais vêm da tabela resumo_agenda, sem percorrer a tabela consulta, lida da réplica se possível.
+
+        Args:
+            db (Database): Instância do banco de dados.
+            dimensoes (list): Dimensões de agrupamento (medico, especialidade, semana, horario).
+            data_inicio (str, opcional): Data inicial no formato 'YYYY-MM-DD'.
+            data_fim (str, opcional): Data final no formato 'YYYY-MM-DD'.
+        """
+        with db.leitura():
+            linhas = db.resumo.agregar(db, dimensoes, data_inicio, data_fim)
+        if not linhas:
+            print("Nenhum horário encontrado para o resumo.")
+            return
+        cabecalho = [coluna.strip().split(".")[-1] for dimensao in dimensoes
+                     for coluna in DIMENSOES[dimensao][0].split(",")]
+        print("=" * 50)
+        print(" | ".join(cabecalho + ["Agendadas", "Indisponíveis", "Disponíveis"]))
+        print("=" * 50)
+        for linha in linhas:
+            print(" | ".join(str(valor) for valor in linha))
+        print("=" * 50)
+
     def imprimirRelatorio(self):
         """
-        Método para imprimir relatórios de consultas realizadas, agendadas ou canceladas.
+        Método para imprimir relatórios de consultas indisponíveis ou agendadas.
 
         O método apresenta um menu para escolha do tipo de relatório:
-        1 - Consultas Realizadas
+        1 - Consultas Indisponíveis
         2 - Consultas Agendadas
-        3 - Consultas Canceladas
+        3 - Resumo agregado por médico, especialidade, semana e/ou horário
         4 - Voltar ao menu principal
 
-        Ao selecionar uma opção válida, o método executa consultas SQL no banco de dados para
-        recuperar os dados correspondentes e os exibe formatados no console.
+        Ao selecionar uma opção válida, as consultas correspondentes são lidas do banco em páginas
+        e exibidas no console à medida que chegam.
 
         """
         while True:
-            db = Database(host="localhost", user="root", password="", database="sistema_consultorio")
             print("=" * 50)
             print("Selecione Relatório Desejado")
             print("=" * 50)
-            print("1 - Consultas Indisponíveis\n2 - Consultas Agendadas\n3 - Voltar\n")
+            print("1 - Consultas Indisponíveis\n2 - Consultas Agendadas\n3 - Resumo Agregado\n4 - Voltar\n")
             opcao = input("Opção Desejada: ")
 
             try:
-                cursor = db.connection.cursor()
                 opcaoNum = int(opcao)
-                if opcaoNum in (1, 2, 3, 4):
-                    if opcaoNum == 1:
-                        try:
-                            sql = """select * from consulta where consulta.status = 'I'"""
-                            cursor.execute(sql)
-                            resultadoConsultasIndisponiveis = cursor.fetchall()
-                            if resultadoConsultasIndisponiveis:
-                                print("=" * 50)
-                                print("Consultas Indisponíveis:")
-                                for consulta in resultadoConsultasIndisponiveis:
-                                    print("=" * 50)
-                                    print(f"ID: {consulta[0]}")
-                                    print(f"Horário: {consulta[1]}")
-                                    print(f"Data: {consulta[2]}")
-                                    print(f"Status: Indisponível")
-                                    print(f"Crm: {consulta[4]}")
-                                    print(f"ID_Paciente: {consulta[5]}")
-                                    print("=" * 50)
-                            else:
-                                print("Consultas Indisponíveis não encontradas.")
-                        except Exception as e:
-                            print(f"Erro ao consultar consultas realizadas: {e}")
-
-                    elif opcaoNum == 2:
-                        try:
-                            sql = """select * from consulta where consulta.status = 'A'"""
-                            cursor.execute(sql)
-                            resultadoConsultasAgendadas = cursor.fetchall()
-                            if resultadoConsultasAgendadas:
-                                print("=" * 50)
-                                print("Consultas Agendadas:")
-                                for consulta in resultadoConsultasAgendadas:
-                                    print("=" * 50)
-                                    print(f"ID: {consulta[0]}")
-                                    print(f"Horário: {consulta[1]}")
-                                    print(f"Data: {consulta[2]}")
-                                    print(f"Status: Agendada")
-                                    print(f"Crm: {consulta[4]}")
-                                    print(f"ID_Paciente: {consulta[5]}")
-                                print("=" * 50)
-                            else:
-                                print("Consultas Agendadas não encontradas.")
-                        except Exception as e:
-                            print(f"Erro ao consultar consultas agendadas: {e}")
-                    elif opcaoNum == 3:
-                        print("Voltando ao Menu")
-                        break
-                else:
-                    print("Opção não existente no Menu. Tente novamente.")
             except ValueError:
                 print("Opção Inválida. Tente Novamente.")
-            finally:
-                cursor = db.connection.cursor()
-                if db.connection.is_connected():
-                    cursor.close()
-                    db.connection.close()
\ No newline at end of file
+                continue
+
+            if opcaoNum == 4:
+                print("Voltando ao Menu")
+                break
+            if opcaoNum not in (1, 2, 3):
+                print("Opção não existente no Menu. Tente novamente.")
+                continue
+
+            if opcaoNum == 3:
+                print(f"Dimensões disponíveis: {', '.join(DIMENSOES)}")
+                dimensoes = [dimensao.strip().lower() for dimensao in
+                             input("Agrupar por (separadas por vírgula): ").split(",") if dimensao.strip()]
+                data_inicio = input("Data inicial (AAAA-MM-DD, Enter para todas): ") or None
+                data_fim = input("Data final (AAAA-MM-DD, Enter para todas): ") or None
+                with Database(**self.config) as db:
+                    try:
+                        self.imprimirResumo(db, dimensoes, data_inicio, data_fim)
+                    except ValueError as e:
+                        print(f"Opção Inválida. {e}")
+                    except Exception as e:
+                        print(f"Erro ao gerar resumo: {e}")
+                continue
+
+            status = 'I' if opcaoNum == 1 else 'A'
+            with Database(**self.config) as db:
+                try:
+                    self.imprimirConsultas(db, status)
+                except Exception as e:
+                    print(f"Erro ao consultar {self.RELATORIOS[status][0].lower()}: {e}")
@@ -0,0 +1,144 @@
+import sys
+import threading
+import time
+from datetime import datetime
+
+from Clinica.Conexao import PoolConexoes
+
+SQL_PULSO = "SELECT MAX(registrado_em) FROM replica_pulso"
+SQL_REGISTRAR_PULSO = (
+    "INSERT INTO replica_pulso (origem, registrado_em) VALUES (%s, %s) "
+    "ON DUPLICATE KEY UPDATE registrado_em = VALUES(registrado_em)"
+)
+
+
+class ConexaoPrimaria:
+    """
+    Conexão com o primário que anota o momento do último commit do processo.
+    """
+
+    # Fim do último commit feito no primário por qualquer instância de Database deste processo
+    escrita_em = None
+
+    def __init__(self, conexao):
+        self._conexao = conexao
+
+    def commit(self, anotar=True):
+        self._conexao.commit()
+        if anotar:
+            ConexaoPrimaria.escrita_em = datetime.now()
+
+    def __getattr__(self, nome):
+        return getattr(self._conexao, nome)
+
+
+class ReplicaLeitura:
+    """
+    Réplica de leitura do banco, usada pelas operações de Database declaradas somente leitura.
+
+    O atraso da réplica é medido pelo pulso: uma linha de replica_pulso que o primário regrava a cada
+    segundo (veja registrarPulso) e que chega à réplica pela replicação. A réplica está atrasada o
+    tempo entre agora e o último pulso que ela tem. O mesmo pulso garante a leitura das próprias
+    escritas: depois de um commit no primário feito pelo processo, a réplica só volta a atender
+    quando receber um pulso gravado depois desse commit (e, portanto, o próprio commit). Essa garantia
+    vale por processo: commits de outros processos não são conhecidos aqui, e podem demorar até
+    atraso_max segundos para aparecer na réplica.
+
+    O pulso lido é guardado por intervalo_verificacao segundos e compartilhado pelo processo, para
+    que cada leitura não custe uma consulta a mais.
+    """
+
+    # Último pulso lido de cada réplica do processo: chave do backend -> (momento da leitura, pulso)
+    _pulsos = {}
+    _trava_pulsos = threading.Lock()
+
+    def __init__(self, backend, atraso_max=5.0, intervalo_verificacao=1.0):
+        """
+        Args:
+            backend (BackendMySQL | BackendSQLite): Armazenamento da réplica.
+            atraso_max (float): Atraso máximo tolerado, em segundos. Com mais atraso, ou sem pulso,
+                as leituras voltam para o primário.
+            intervalo_verificacao (float): Segundos entre duas leituras do pulso da réplica.
+        """
+        self.backend = backend
+        self.atraso_max = atraso_max
+        self.intervalo_verificacao = intervalo_verificacao
+        self.pool = PoolConexoes.compartilhado(backend.chave, backend.conectar, **backend.opcoes_pool)
+
+    def pulso(self, conexao):
+        """
+        Retorna o último pulso recebido pela réplica, lendo de novo só depois de intervalo_verificacao.
+
+        Args:
+            conexao: Conexão com a réplica.
+
+        Returns:
+            datetime: Momento do pulso, ou None se a réplica não tiver nenhum.
+        """
+        agora = time.monotonic()
+        with self._trava_pulsos:
+            lido = self._pulsos.get(self.backend.chave)
+        if lido and agora - lido[0] < self.intervalo_verificacao:
+            return lido[1]
+        cursor = conexao.cursor()
+        try:
+            cursor.execute(SQL_PULSO)
+            valor = cursor.fetchone()[0]
+        finally:
+            cursor.close()
+        # O SQLite devolve DATETIME como texto ISO
+        pulso = valor if valor is None or isinstance(valor, datetime) else datetime.fromisoformat(str(valor))
+        with self._trava_pulsos:
+            self._pulsos[self.backend.chave] = (agora, pulso)
+        return pulso
+
+    def atende(self, conexao):
+        """
+        Indica se a réplica pode atender uma leitura agora.
+
+        Args:
+            conexao: Conexão com a réplica.
+
+        Returns:
+            bool: True se o atraso estiver dentro do tolerado e a réplica já tiver o último commit
+                do processo no primário.
+        """
+        pulso = self.pulso(conexao)
+        if pulso is None:
+            return False
+        escrita_em = ConexaoPrimaria.escrita_em
+        if escrita_em is not None and pulso < escrita_em:
+            return False
+        return (datetime.now() - pulso).total_seconds() <= self.atraso_max
+
+
+def registrarPulso(db, origem="primario"):
+    """
+    Grava o pulso de replicação no primário. Deve rodar a cada segundo enquanto houver réplicas.
+
+    Args:
+        db (Database): Instância do banco de dados primário.
+        origem (str): Nome de quem grava o pulso.
+    """
+    cursor = db.connection.cursor()
+    try:
+        cursor.execute(SQL_REGISTRAR_PULSO, (origem, datetime.now()))
+        # O pulso não é um dado que alguém precise ler de volta: não afasta as leituras da réplica
+        db.connection.commit(anotar=False)
+    finally:
+        cursor.close()
+
+
+if __name__ == "__main__":
+    from Clinica.Backend import BackendSQLite
+    from Clinica.Database import Database
+
+    # python -m Clinica.Replica [arquivo.db]: grava o pulso a cada segundo até ser interrompido
+    backend = BackendSQLite(sys.argv[1]) if len(sys.argv) > 1 else None
+    with Database(backend=backend) as db:
+        try:
+            while True:
+                registrarPulso(db)
+                time.sleep(1)
+        except KeyboardInterrupt:
+            pass
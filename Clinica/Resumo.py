@@ -0,0 +1,219 @@
+from datetime import date, timedelta
+
+from Clinica.Disponibilidade import normalizarData, normalizarHorario
+from Clinica.Metricas import instrumentado
+
+# Dimensões aceitas pelo relatório agregado: nome -> (colunas do SELECT, colunas do GROUP BY)
+DIMENSOES = {
+    "medico": ("resumo_agenda.crm, medico.nome", "resumo_agenda.crm, medico.nome"),
+    "especialidade": ("especialidade.especialidade", "especialidade.especialidade"),
+    "semana": ("resumo_agenda.semana", "resumo_agenda.semana"),
+    "horario": ("resumo_agenda.horario", "resumo_agenda.horario"),
+}
+
+
+def inicioSemana(data):
+    """
+    Retorna a segunda-feira da semana da data.
+    """
+    data = normalizarData(data)
+    return data - timedelta(days=data.weekday())
+
+
+class ResumoAgenda:
+    """
+    Mantém a tabela resumo_agenda, com a quantidade de horários por médico, semana, horário e status.
+
+    A tabela é atualizada de forma incremental, na mesma transação das alterações de agenda, e permite
+    montar relatórios agregados lendo algumas centenas de linhas em vez de percorrer a tabela consulta.
+
+    Horários livres da agenda modelo não têm linha em consulta; no resumo, o total 'D' de cada
+    semana é a variação em relação ao modelo (negativa quando horários do modelo foram marcados ou
+    bloqueados), e agregar soma a capacidade do modelo a essa variação.
+    """
+
+    def registrar(self, cursor, transicoes):
+        """
+        Aplica no resumo um conjunto de mudanças de status de horários.
+
+        Deve ser chamado com o cursor da transação que alterou a agenda, antes do commit.
+
+        Args:
+            cursor: Cursor da transação em andamento.
+            transicoes (iterable): Tuplas (crm, data, horario, status_anterior, status_novo).
+                status_anterior é 'D' para horários livres da agenda modelo e None para horários extras.
+        """
+        comando = self.comando(transicoes)
+        if comando:
+            cursor.executemany(*comando)
+
+    def comando(self, transicoes):
+        """
+        Monta o comando que aplica as transições no resumo, sem executá-lo.
+
+        Args:
+            transicoes (iterable): Tuplas (crm, data, horario, status_anterior, status_novo).
+
+        Returns:
+            tuple: (sql, linhas) para executemany, ou None se não houver variação.
+        """
+        variacoes = {}
+        for crm, data, horario, anterior, novo in transicoes:
+            if anterior == novo:
+                continue
+            chave = (str(crm), inicioSemana(data), normalizarHorario(horario))
+            if anterior is not None:
+                variacoes[chave + (anterior,)] = variacoes.get(chave + (anterior,), 0) - 1
+            if novo is not None:
+                variacoes[chave + (novo,)] = variacoes.get(chave + (novo,), 0) + 1
+        linhas = [chave + (total,) for chave, total in variacoes.items() if total]
+        if not linhas:
+            return None
+        return SQL_REGISTRAR, linhas
+
+    @instrumentado
+    def reconstruir(self, db):
+        """
+        Recalcula todo o resumo a partir das tabelas consulta e consulta_arquivo.
+
+        Args:
+            db (Database): Instância do banco de dados.
+        """
+        cursor = db.connection.cursor()
+        try:
+            cursor.execute("DELETE FROM resumo_agenda")
+            cursor.execute(SQL_RECONSTRUIR_COM_ARQUIVO)
+            db.connection.commit()
+        except Exception:
+            db.connection.rollback()
+            raise
+        finally:
+            cursor.close()
+
+    @instrumentado
+    def agregar(self, db, dimensoes, data_inicio=None, data_fim=None):
+        """
+        Conta os horários agendados, indisponíveis e disponíveis agrupados pelas dimensões pedidas.
+
+        Os disponíveis incluem a capacidade da agenda modelo atual em cada semana do período. Sem
+        período, são consideradas as semanas do resumo e as que faltam até o fim do ano.
+
+        Args:
+            db (Database): Instância do banco de dados.
+            dimensoes (list): Nomes de DIMENSOES, por exemplo ["especialidade", "semana"].
+            data_inicio (str, opcional): Primeira semana considerada ('YYYY-MM-DD').
+            data_fim (str, opcional): Última data considerada ('YYYY-MM-DD').
+
+        Returns:
+            list: Tuplas com os valores das dimensões seguidos de agendadas, indisponíveis e disponíveis.
+
+        Raises:
+            ValueError: Se alguma dimensão não existir.
+        """
+        invalidas = [dimensao for dimensao in dimensoes if dimensao not in DIMENSOES]
+        if invalidas or not dimensoes:
+            raise ValueError(f"Dimensões válidas: {', '.join(DIMENSOES)}")
+        colunas = ", ".join(DIMENSOES[dimensao][0] for dimensao in dimensoes)
+        agrupamento = ", ".join(DIMENSOES[dimensao][1] for dimensao in dimensoes)
+        semanas = self._semanas(db, data_inicio, data_fim)
+        sql = f"""
+            SELECT {colunas},
+                   SUM(CASE WHEN resumo_agenda.status = 'A' THEN resumo_agenda.total ELSE 0 END),
+                   SUM(CASE WHEN resumo_agenda.status = 'I' THEN resumo_agenda.total ELSE 0 END),
+                   SUM(CASE WHEN resumo_agenda.status = 'D' THEN resumo_agenda.total ELSE 0 END)
+            FROM (
+                SELECT crm, semana, horario, status, total FROM resumo_agenda
+                UNION ALL
+                SELECT modelo.crm, semanas.semana, modelo.horario, 'D', modelo.total
+                FROM (SELECT crm, horario, COUNT(*) AS total FROM agenda_modelo GROUP BY crm, horario) modelo
+                CROSS JOIN ({" UNION ALL ".join(["SELECT %s AS semana"] * len(semanas))}) semanas
+            ) resumo_agenda
+            INNER JOIN medico ON medico.crm = resumo_agenda.crm
+            """
+        if "especialidade" in dimensoes:
+            sql += """
+            INNER JOIN especialidade_medico ON especialidade_medico.crm = resumo_agenda.crm
+            INNER JOIN especialidade ON especialidade.especialidade_id = especialidade_medico.especialidade_id
+            """
+        valores = [semana.isoformat() for semana in semanas]
+        filtros = []
+        if data_inicio:
+            filtros.append("resumo_agenda.semana >= %s")
+            valores.append(inicioSemana(data_inicio).isoformat())
+        if data_fim:
+            filtros.append("resumo_agenda.semana <= %s")
+            valores.append(normalizarData(data_fim).isoformat())
+        if filtros:
+            sql += " WHERE " + " AND ".join(filtros)
+        sql += f" GROUP BY {agrupamento} ORDER BY {agrupamento}"
+
+        cursor = db.connection.cursor()
+        try:
+            cursor.execute(sql, tuple(valores))
+            return cursor.fetchall()
+        finally:
+            cursor.close()
+
+    def _semanas(self, db, data_inicio, data_fim):
+        # Semanas que recebem a capacidade da agenda modelo
+        if not data_inicio or not data_fim:
+            cursor = db.connection.cursor()
+            try:
+                cursor.execute("SELECT MIN(semana), MAX(semana) FROM resumo_agenda")
+                primeira, ultima = cursor.fetchone()
+            finally:
+                cursor.close()
+            esta_semana = inicioSemana(date.today())
+            if not data_inicio:
+                data_inicio = min(normalizarData(primeira), esta_semana) if primeira else esta_semana
+            if not data_fim:
+                fim_ano = date.today().replace(month=12, day=31)
+                data_fim = max(normalizarData(ultima), fim_ano) if ultima else fim_ano
+        semana = inicioSemana(data_inicio)
+        semanas = []
+        while semana <= normalizarData(data_fim):
+            semanas.append(semana)
+            semana += timedelta(days=7)
+        return semanas or [inicioSemana(data_inicio)]
+
+
+SQL_REGISTRAR = (
+    "INSERT INTO resumo_agenda (crm, semana, horario, status, total) VALUES (%s, %s, %s, %s, %s) "
+    "ON DUPLICATE KEY UPDATE total = total + VALUES(total)"
+)
+
+
+def sqlReconstruir(origem="consulta"):
+    """
+    Monta o comando que preenche o resumo a partir das linhas de agenda gravadas: cada linha conta
+    no próprio status e, se ocupa um horário da agenda modelo, desconta um horário livre ('D') da semana.
+
+    Args:
+        origem (str): Tabela, ou subconsulta entre parênteses, com as colunas crm, data, horario e status.
+    """
+    return f"""
+    INSERT INTO resumo_agenda (crm, semana, horario, status, total)
+    SELECT crm, semana, horario, status, SUM(total)
+    FROM (
+        SELECT crm, DATE_SUB(data, INTERVAL WEEKDAY(data) DAY) AS semana, horario, status, COUNT(*) AS total
+        FROM {origem} consulta
+        GROUP BY crm, DATE_SUB(data, INTERVAL WEEKDAY(data) DAY), horario, status
+        UNION ALL
+        SELECT consulta.crm, DATE_SUB(consulta.data, INTERVAL WEEKDAY(consulta.data) DAY), consulta.horario,
+               'D', -COUNT(*)
+        FROM {origem} consulta
+        INNER JOIN agenda_modelo ON agenda_modelo.crm = consulta.crm
+            AND agenda_modelo.dia_semana = WEEKDAY(consulta.data) AND agenda_modelo.horario = consulta.horario
+        GROUP BY consulta.crm, DATE_SUB(consulta.data, INTERVAL WEEKDAY(consulta.data) DAY), consulta.horario
+    ) variacoes
+    GROUP BY crm, semana, horario, status
+    HAVING SUM(total) <> 0
+    """
+
+
+# Só a tabela consulta (usado pela migração 5, anterior a consulta_arquivo)
+SQL_RECONSTRUIR = sqlReconstruir()
+SQL_RECONSTRUIR_COM_ARQUIVO = sqlReconstruir(
+    "(SELECT crm, data, horario, status FROM consulta"
+    " UNION ALL SELECT crm, data, horario, status FROM consulta_arquivo)"
+)
@@ -0,0 +1,370 @@
+import json
+import sys
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from Clinica.Autenticacao import Autenticacao
+from Clinica.Backend import BackendSQLite
+from Clinica.Database import Database, HORARIO_ERRO, HORARIO_NOVO, RESERVA_MARCADA, RESERVA_OCUPADA
+from Clinica.Disponibilidade import normalizarHorario
+from Clinica.Medico import Medico
+from Clinica.Paciente import Paciente, formatar_cpf
+from Clinica.Relatorio import Relatorio
+
+
+class ErroRequisicao(Exception):
+    """
+    Erro causado pelos dados enviados pelo cliente, respondido com o status HTTP informado.
+    """
+
+    def __init__(self, mensagem, status=400):
+        super().__init__(mensagem)
+        self.status = status
+
+
+def _paraJson(valor):
+    if isinstance(valor, timedelta):
+        return normalizarHorario(valor)
+    if isinstance(valor, (date, datetime, Decimal)):
+        return str(valor)
+    raise TypeError(f"Tipo não serializável: {type(valor).__name__}")
+
+
+def _obrigatorio(parametros, *nomes):
+    faltando = [nome for nome in nomes if not parametros.get(nome)]
+    if faltando:
+        raise ErroRequisicao(f"Campos obrigatórios: {', '.join(faltando)}")
+    return [parametros[nome] for nome in nomes]
+
+
+def _dataHorario(data, horario):
+    # Formatos gravados na agenda: 'AAAA-MM-DD' e 'HH:MM:SS'
+    try:
+        datetime.strptime(data, "%Y-%m-%d")
+        datetime.strptime(horario, "%H:%M:%S")
+    except (TypeError, ValueError):
+        raise ErroRequisicao("data deve estar no formato AAAA-MM-DD e horario no formato HH:MM:SS.")
+    return data, horario
+
+
+def _lista(valor):
+    # Listas chegam como JSON (lista) ou na query string (valores separados por vírgula)
+    if isinstance(valor, str):
+        return [item.strip() for item in valor.split(",") if item.strip()]
+    return valor
+
+
+class Servico:
+    """
+    Operações do sistema expostas como rotas HTTP/JSON.
+
+    Cada método recebe uma instância de Database (retirada do pool para a requisição) e os
+    parâmetros da requisição (query string e corpo JSON juntos), e retorna (status HTTP, corpo).
+
+    Exceto /login, todas as rotas exigem o token de sessão devolvido pelo login.
+    """
+
+    def __init__(self, config=None, autenticacao=None):
+        """
+        Args:
+            config (dict, opcional): Parâmetros de conexão repassados a Database.
+            autenticacao (Autenticacao, opcional): Sessões do serviço. Por padrão, uma nova
+                instância com a mesma configuração de banco.
+        """
+        self.config = config or {}
+        self.autenticacao = autenticacao or Autenticacao(self.config)
+        self.rotas = {
+            ("GET", "/especialidades"): self.especialidades,
+            ("GET", "/medicos"): self.medicos,
+            ("POST", "/medicos"): self.cadastrarMedico,
+            ("POST", "/medicos/atualizar"): self.atualizarMedico,
+            ("POST", "/pacientes"): self.cadastrarPaciente,
+            ("POST", "/pacientes/atualizar"): self.atualizarPaciente,
+            ("GET", "/horarios"): self.horariosMedico,
+            ("GET", "/horarios/livres"): self.horariosLivres,
+            ("GET", "/horarios/proximos"): self.proximosHorarios,
+            ("POST", "/horarios/disponibilizar"): self.disponibilizar,
+            ("POST", "/horarios/indisponibilizar"): self.indisponibilizar,
+            ("POST", "/horarios/bloquear-periodo"): self.bloquearPeriodo,
+            ("POST", "/horarios/liberar-periodo"): self.liberarPeriodo,
+            ("POST", "/consultas"): self.marcarConsulta,
+            ("GET", "/historico"): self.historico,
+            ("GET", "/busca"): self.buscar,
+            ("GET", "/diario"): self.diario,
+            ("GET", "/relatorio"): self.relatorio,
+            ("GET", "/relatorio/resumo"): self.resumo,
+        }
+
+    def atender(self, metodo, caminho, parametros, token=None):
+        """
+        Executa a rota correspondente com uma conexão do pool.
+
+        Args:
+            token (str, opcional): Token de sessão enviado no cabeçalho Authorization.
+
+        Returns:
+            tuple: (status HTTP, corpo serializável em JSON).
+        """
+        caminho = caminho.rstrip("/") or "/"
+        if (metodo, caminho) == ("POST", "/login"):
+            return self.login(parametros)
+        if (metodo, caminho) == ("POST", "/logout"):
+            self.autenticacao.encerrarSessao(token)
+            return 200, {}
+        rota = self.rotas.get((metodo, caminho))
+        if rota is None:
+            return 404, {"erro": "Rota não encontrada."}
+        # Conferido em memória: a conexão só é retirada do pool para requisições autenticadas
+        if self.autenticacao.validarToken(token) is None:
+            return 401, {"erro": "Sessão inválida ou expirada. Faça login."}
+        try:
+            with Database(**self.config) as db:
+                db.avisos = False
+                if db.connection is None:
+                    return 503, {"erro": "Banco de dados indisponível."}
+                return rota(db, parametros)
+        except ErroRequisicao as e:
+            return e.status, {"erro": str(e)}
+        except ValueError as e:
+            return 400, {"erro": str(e)}
+
+    def login(self, parametros):
+        try:
+            username, password = _obrigatorio(parametros, "username", "password")
+        except ErroRequisicao as e:
+            return e.status, {"erro": str(e)}
+        try:
+            token = self.autenticacao.autenticar(username, password)
+        except TimeoutError as e:
+            return 503, {"erro": str(e)}
+        if token is None:
+            return 401, {"erro": "Usuário ou senha incorretos."}
+        return 200, {"token": token, "expira_em_segundos": self.autenticacao.validade}
+
+    def especialidades(self, db, parametros):
+        return 200, [especialidade[0] for especialidade in db.listarEspecialidades() or []]
+
+    def medicos(self, db, parametros):
+        especialidade, = _obrigatorio(parametros, "especialidade")
+        medicos = db.mostrarMedicosPorEspecialidade(especialidade) or []
+        return 200, [{"crm": crm, "nome": nome} for crm, nome in medicos]
+
+    def cadastrarMedico(self, db, parametros):
+        campos = _obrigatorio(parametros, "crm", "especialidade", "nome", "sobrenome", "data_nascimento",
+                              "email", "telefone", "cep", "numero")
+        medico = Medico(*campos, parametros.get("complemento", ""))
+        if not db.cadastrarMedico(medico):
+            return 409, {"erro": "Não foi possível cadastrar o médico."}
+        return 201, {"crm": medico.crm, "horarios_criados": db.padronizadoConsultas()}
+
+    def atualizarMedico(self, db, parametros):
+        crm, nome, email = _obrigatorio(parametros, "crm", "nome", "email")
+        if not db.atualizarMedico(crm, nome, email):
+            return 404, {"erro": "Médico não encontrado."}
+        return 200, {"crm": crm}
+
+    def cadastrarPaciente(self, db, parametros):
+        nome, sobrenome, telefone, cpf, cep, numero = _obrigatorio(
+            parametros, "nome", "sobrenome", "telefone", "cpf", "cep", "numero")
+        paciente = Paciente(nome, sobrenome, telefone, formatar_cpf(cpf), cep, numero,
+                            parametros.get("complemento", ""), parametros.get("data_nascimento"),
+                            parametros.get("email"))
+        if not db.cadastrarPaciente(paciente):
+            return 409, {"erro": "Não foi possível cadastrar o paciente."}
+        return 201, {"cpf": paciente.cpf}
+
+    def atualizarPaciente(self, db, parametros):
+        cpf, nome, email = _obrigatorio(parametros, "cpf", "nome", "email")
+        if not db.atualizarPaciente(formatar_cpf(cpf), nome, email):
+            return 404, {"erro": "Paciente não encontrado."}
+        return 200, {"cpf": formatar_cpf(cpf)}
+
+    def buscar(self, db, parametros):
+        texto, = _obrigatorio(parametros, "texto")
+        tipo = parametros.get("tipo")
+        if tipo not in (None, "paciente", "medico"):
+            raise ErroRequisicao("tipo deve ser paciente ou medico.")
+        encontrados = db.buscarCadastros(texto, tipo, int(parametros.get("limite", 10)))
+        return 200, [{"tipo": tipo, "identificador": identificador, "nome": nome}
+                     for tipo, identificador, nome in encontrados]
+
+    def diario(self, db, parametros):
+        transicoes = db.diario.ler(db, int(parametros.get("desde", 0)), int(parametros.get("limite", 1000)))
+        return 200, [transicao._asdict() for transicao in transicoes]
+
+    def horariosMedico(self, db, parametros):
+        medico, = _obrigatorio(parametros, "medico")
+        return 200, db.mostrarHorarios(medico) or []
+
+    def horariosLivres(self, db, parametros):
+        crm, dia = _obrigatorio(parametros, "crm", "dia")
+        consultas = db.mostrarConsultasDisponiveis(crm, dia) or []
+        return 200, [{"data": data, "horario": horario, "medico": nome} for data, horario, _, nome in consultas]
+
+    def proximosHorarios(self, db, parametros):
+        especialidade, = _obrigatorio(parametros, "especialidade")
+        livres = db.buscarPrimeirosHorarios(
+            especialidade, int(parametros.get("quantidade", 5)),
+            parametros.get("inicio"), parametros.get("fim"), _lista(parametros.get("horarios"))
+        )
+        return 200, [{"data": data, "horario": horario, "crm": crm, "medico": nome}
+                     for data, horario, crm, nome in livres]
+
+    def disponibilizar(self, db, parametros):
+        medico, data, horario = _obrigatorio(parametros, "medico", "data", "horario")
+        data, horario = _dataHorario(data, horario)
+        if db.descobrirCrm(medico) is None:
+            return 404, {"erro": "Médico não encontrado."}
+        anterior = db.disponibilizarHorario(medico, data, horario)
+        if anterior == HORARIO_ERRO:
+            return 500, {"erro": "Não foi possível disponibilizar o horário."}
+        if anterior == HORARIO_NOVO:
+            # O horário não estava na agenda modelo e foi criado como extra
+            return 201, {"status_anterior": None, "status": "D"}
+        return 200, {"status_anterior": anterior, "status": "D"}
+
+    def indisponibilizar(self, db, parametros):
+        medico, data, horario = _obrigatorio(parametros, "medico", "data", "horario")
+        data, horario = _dataHorario(data, horario)
+        if db.descobrirCrm(medico) is None:
+            return 404, {"erro": "Médico não encontrado."}
+        anterior = db.indisponibilizarHorario(medico, data, horario)
+        if anterior == HORARIO_ERRO:
+            return 500, {"erro": "Não foi possível indisponibilizar o horário."}
+        if anterior is None:
+            return 404, {"erro": "Horário não encontrado."}
+        return 200, {"status_anterior": anterior, "status": "I"}
+
+    def bloquearPeriodo(self, db, parametros):
+        return self._alterarPeriodo(db.bloquearPeriodo, parametros)
+
+    def liberarPeriodo(self, db, parametros):
+        return self._alterarPeriodo(db.liberarPeriodo, parametros)
+
+    def _alterarPeriodo(self, operacao, parametros):
+        crm, inicio, fim = _obrigatorio(parametros, "crm", "inicio", "fim")
+        dias_semana, horarios = _lista(parametros.get("dias_semana")), _lista(parametros.get("horarios"))
+        desmarcadas = operacao(crm, inicio, fim, dias_semana and [int(dia) for dia in dias_semana], horarios)
+        if desmarcadas is None:
+            return 409, {"erro": "Não foi possível alterar os horários do período."}
+        return 200, {"desmarcadas": [
+            {"id_consulta": id_consulta, "data": data, "horario": horario, "cpf": cpf, "paciente": nome}
+            for id_consulta, data, horario, cpf, nome in desmarcadas
+        ]}
+
+    def marcarConsulta(self, db, parametros):
+        medico, data, horario, cpf = _obrigatorio(parametros, "medico", "data", "horario", "cpf")
+        data, horario = _dataHorario(data, horario)
+        resultado = db.marcarConsulta(medico, data, horario, formatar_cpf(cpf))
+        status = {RESERVA_MARCADA: 201, RESERVA_OCUPADA: 409}.get(resultado, 404)
+        return status, {"resultado": resultado}
+
+    def historico(self, db, parametros):
+        cpf, = _obrigatorio(parametros, "cpf")
+        status = _lista(parametros.get("status"))
+        consultas = db.historicoMedico(formatar_cpf(cpf), parametros.get("inicio"), parametros.get("fim"), status)
+        return 200, [{"data": data, "horario": horario, "status": rotulo, "medico": nome}
+                     for data, horario, rotulo, nome in consultas or []]
+
+    def relatorio(self, db, parametros):
+        status, = _obrigatorio(parametros, "status")
+        relatorio = Relatorio(tamanho_pagina=min(int(parametros.get("limite", 100)), 1000))
+        pagina = next(relatorio.paginasPorStatus(db, status, int(parametros.get("apos", 0))), [])
+        colunas = ("id_consulta", "horario", "data", "status", "crm", "id_paciente")
+        proximo = pagina[-1][0] if len(pagina) == relatorio.tamanho_pagina else None
+        return 200, {"consultas": [dict(zip(colunas, linha)) for linha in pagina], "proximo": proximo}
+
+    def resumo(self, db, parametros):
+        dimensoes, = _obrigatorio(parametros, "dimensoes")
+        if isinstance(dimensoes, str):
+            dimensoes = [dimensao.strip() for dimensao in dimensoes.split(",") if dimensao.strip()]
+        with db.leitura():
+            linhas = db.resumo.agregar(db, dimensoes, parametros.get("inicio"), parametros.get("fim"))
+        return 200, [list(linha) for linha in linhas]
+
+
+class ManipuladorHTTP(BaseHTTPRequestHandler):
+    """
+    Traduz requisições HTTP/1.1 (com keep-alive) para chamadas de Servico.
+    """
+
+    protocol_version = "HTTP/1.1"
+    servico = None
+
+    def do_GET(self):
+        self._atender("GET")
+
+    def do_POST(self):
+        self._atender("POST")
+
+    def _atender(self, metodo):
+        url = urlparse(self.path)
+        parametros = {nome: valores[-1] for nome, valores in parse_qs(url.query).items()}
+        tamanho = int(self.headers.get("Content-Length") or 0)
+        if tamanho:
+            try:
+                corpo = json.loads(self.rfile.read(tamanho))
+            except ValueError:
+                self._responder(400, {"erro": "Corpo JSON inválido."})
+                return
+            if not isinstance(corpo, dict):
+                self._responder(400, {"erro": "O corpo deve ser um objeto JSON."})
+                return
+            parametros.update(corpo)
+        autorizacao = self.headers.get("Authorization") or ""
+        token = autorizacao[7:].strip() if autorizacao[:7].lower() == "bearer " else None
+        try:
+            status, resposta = self.servico.atender(metodo, url.path, parametros, token)
+        except Exception as e:
+            status, resposta = 500, {"erro": f"Erro interno: {e}"}
+        self._responder(status, resposta)
+
+    def _responder(self, status, resposta):
+        corpo = json.dumps(resposta, default=_paraJson, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(corpo)))
+        self.end_headers()
+        self.wfile.write(corpo)
+
+    def log_message(self, formato, *args):
+        sys.stderr.write(f"{self.address_string()} - {formato % args}\n")
+
+
+def criarServidor(endereco="127.0.0.1", porta=8080, config=None):
+    """
+    Cria o servidor HTTP, que atende cada requisição em uma thread própria.
+
+    Args:
+        endereco (str): Endereço de escuta. Por padrão, apenas a máquina local.
+        porta (int): Porta TCP (0 escolhe uma porta livre).
+        config (dict, opcional): Parâmetros de conexão repassados a Database.
+
+    Returns:
+        ThreadingHTTPServer: Servidor pronto para serve_forever().
+    """
+    manipulador = type("Manipulador", (ManipuladorHTTP,), {"servico": Servico(config)})
+    servidor = ThreadingHTTPServer((endereco, porta), manipulador)
+    servidor.daemon_threads = True
+    return servidor
+
+
+if __name__ == "__main__":
+    # python -m Clinica.Servico [porta] [arquivo.db] [replica.db]: com um arquivo, usa o SQLite em vez
+    # do MySQL; com dois, o segundo é a réplica que atende relatórios, histórico e agenda dos médicos
+    porta = int(sys.argv[1]) if len(sys.argv) > 1 else 8080
+    config = {"backend": BackendSQLite(sys.argv[2])} if len(sys.argv) > 2 else None
+    if len(sys.argv) > 3:
+        config["replica"] = BackendSQLite(sys.argv[3])
+    servidor = criarServidor(porta=porta, config=config)
+    Database.metricas.ativar(limite_lento_ms=200, log_lento="consultas_lentas.log")
+    Database.metricas.iniciarExportacao("metricas.prom")
+    print(f"Serviço da clínica em http://127.0.0.1:{porta}")
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        print("Encerrando serviço.")
+    finally:
+        servidor.server_close()
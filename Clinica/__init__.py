@@ -0,0 +1,6 @@
+"""
+Sistema de gerenciamento de consultório médico.
+
+Ponto de entrada: python -m Clinica (veja Clinica/__main__.py). Os submódulos não são importados
+aqui, para que cada comando carregue apenas o que usa.
+"""
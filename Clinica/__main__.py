@@ -0,0 +1,55 @@
+"""
+Ponto de entrada do sistema: python -m Clinica [comando] [argumentos]
+
+Comandos:
+    interface                                   Interface de terminal da recepção (padrão).
+    servico [porta] [arquivo.db] [replica.db]   Serviço HTTP/JSON, com réplica de leitura opcional.
+    migrar [arquivo.db]                         Aplica as migrações do esquema.
+    importar pacientes|medicos arquivo.csv      Importa cadastros de um arquivo CSV.
+    arquivar [AAAA-MM-DD] [arquivo.db]          Move as consultas anteriores à data (padrão: hoje) para o arquivo.
+    pulso [arquivo.db]                          Grava a cada segundo o pulso que mede o atraso das réplicas.
+
+Só o módulo do comando escolhido é importado, e as conexões com o banco são abertas no primeiro
+uso: um comando curto não paga por drivers, bcrypt ou conexões que não usa.
+"""
+import runpy
+import sys
+
+COMANDOS = {
+    "interface": "Clinica.Interface",
+    "servico": "Clinica.Servico",
+    "migrar": "Clinica.Migracao",
+    "importar": "Clinica.Importacao",
+    "arquivar": "Clinica.Arquivamento",
+    "pulso": "Clinica.Replica",
+}
+
+
+def main(argumentos=None):
+    """
+    Executa um comando.
+
+    Args:
+        argumentos (list, opcional): Comando e seus argumentos. Por padrão, os da linha de comando.
+
+    Returns:
+        int: Código de saída do processo.
+    """
+    argumentos = sys.argv[1:] if argumentos is None else list(argumentos)
+    comando = argumentos[0] if argumentos else "interface"
+    if comando in ("-h", "--help", "ajuda"):
+        print(__doc__.strip())
+        return 0
+    modulo = COMANDOS.get(comando)
+    if modulo is None:
+        print(f"Comando desconhecido: {comando}\n")
+        print(__doc__.strip())
+        return 1
+    # O módulo é executado como se fosse chamado com python -m, recebendo só os próprios argumentos
+    sys.argv = [f"{sys.argv[0]} {comando}"] + argumentos[1:]
+    runpy.run_module(modulo, run_name="__main__")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,80 @@
+"""
+Compara requisições por segundo da API bloqueante (Database) e da assíncrona (AsyncDatabase).
+
+Cada requisição é uma consulta de horários livres de um dia seguida de uma marcação. A API
+bloqueante é medida em sequência e com uma thread por cliente; a assíncrona, com todos os clientes
+em uma única thread.
+
+Uso: python -m benchmarks.async_vs_bloqueante [clientes] [requisicoes]
+"""
+import asyncio
+import contextlib
+import io
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from Clinica.AsyncDatabase import AsyncDatabase
+from Clinica.Database import Database
+from benchmarks.comum import CONFIG
+from benchmarks.estresse_agendamento import CRM, NOME_MEDICO, _cpf, preparar
+
+
+def requisicaoBloqueante(db, indice, horarios):
+    dia, hora = horarios[indice % len(horarios)]
+    db.mostrarConsultasDisponiveis(CRM, dia)
+    db.marcarConsulta(NOME_MEDICO, dia, hora, _cpf(indice % 8))
+
+
+async def requisicaoAssincrona(db, indice, horarios):
+    dia, hora = horarios[indice % len(horarios)]
+    await db.mostrarConsultasDisponiveis(CRM, dia)
+    await db.marcarConsulta(NOME_MEDICO, dia, hora, _cpf(indice % 8))
+
+
+def sequencial(requisicoes, horarios):
+    with Database(**CONFIG) as db:
+        for indice in range(requisicoes):
+            requisicaoBloqueante(db, indice, horarios)
+
+
+def comThreads(clientes, requisicoes, horarios):
+    def cliente(inicio):
+        with Database(**CONFIG) as db:
+            for indice in range(inicio, requisicoes, clientes):
+                requisicaoBloqueante(db, indice, horarios)
+
+    with ThreadPoolExecutor(max_workers=clientes) as executor:
+        list(executor.map(cliente, range(clientes)))
+
+
+async def assincrono(clientes, requisicoes, horarios):
+    async with AsyncDatabase(**CONFIG, maximo=clientes) as db:
+        async def cliente(inicio):
+            for indice in range(inicio, requisicoes, clientes):
+                await requisicaoAssincrona(db, indice, horarios)
+
+        await asyncio.gather(*(cliente(inicio) for inicio in range(clientes)))
+
+
+def medir(nome, funcao, requisicoes):
+    inicio = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        funcao()
+    duracao = time.perf_counter() - inicio
+    print(f"{nome:<25} {duracao:8.2f}s {requisicoes / duracao:10.0f} req/s")
+
+
+def executar(clientes=16, requisicoes=2000):
+    print(f"Clientes: {clientes}, requisições: {requisicoes}")
+    # Cada variante recebe horários livres novos, para que todas façam o mesmo trabalho
+    horarios = preparar(requisicoes, 8)
+    medir("Bloqueante sequencial", lambda: sequencial(requisicoes, horarios), requisicoes)
+    horarios = preparar(requisicoes, 8)
+    medir("Bloqueante com threads", lambda: comThreads(clientes, requisicoes, horarios), requisicoes)
+    horarios = preparar(requisicoes, 8)
+    medir("Assíncrono", lambda: asyncio.run(assincrono(clientes, requisicoes, horarios)), requisicoes)
+
+
+if __name__ == "__main__":
+    executar(*[int(valor) for valor in sys.argv[1:3]])
@@ -0,0 +1,11 @@
+"""
+Configuração comum dos benchmarks: banco de testes separado, definido por variáveis de ambiente.
+"""
+import os
+
+CONFIG = {
+    "host": os.environ.get("CLINICA_HOST", "localhost"),
+    "user": os.environ.get("CLINICA_USER", "root"),
+    "password": os.environ.get("CLINICA_PASSWORD", ""),
+    "database": os.environ.get("CLINICA_BENCH_DB", "sistema_consultorio_bench"),
+}
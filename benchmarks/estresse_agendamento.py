@@ -0,0 +1,112 @@
+"""
+Teste de estresse do agendamento: várias threads tentam marcar os mesmos horários ao mesmo tempo.
+
+Mede marcações por segundo e confere que nenhum horário foi marcado duas vezes.
+Usa um banco de testes separado (CLINICA_BENCH_DB, padrão "sistema_consultorio_bench").
+
+Uso: python -m benchmarks.estresse_agendamento [threads] [horarios]
+"""
+import contextlib
+import io
+import random
+import sys
+import threading
+import time
+from datetime import date, timedelta
+
+from Clinica.Database import Database, HORARIOS_PADRAO, RESERVA_MARCADA
+from Clinica.Migracao import Migracao
+from benchmarks.comum import CONFIG
+
+CRM = "BENCH-1"
+NOME_MEDICO = "Dr Estresse"
+
+
+def preparar(quantidade_horarios, quantidade_pacientes):
+    """
+    Cria um médico com agenda modelo em todos os dias da semana e pacientes exclusivos para o teste.
+
+    Os horários disputados são os do modelo: nenhum deles tem linha em consulta antes do teste.
+
+    Returns:
+        list: Tuplas (data, horario) dos horários criados.
+    """
+    with Database(**CONFIG) as db:
+        Migracao(db).aplicar()
+        cursor = db.connection.cursor()
+        cursor.execute("DELETE FROM consulta WHERE crm = %s", (CRM,))
+        cursor.execute("DELETE FROM paciente WHERE cpf LIKE %s", ("999.%",))
+        cursor.execute("DELETE FROM agenda_modelo WHERE crm = %s", (CRM,))
+        cursor.execute("DELETE FROM medico WHERE crm = %s", (CRM,))
+        cursor.execute("INSERT INTO medico (crm, nome) VALUES (%s, %s)", (CRM, NOME_MEDICO))
+        cursor.executemany(
+            "INSERT INTO paciente (nome, cpf) VALUES (%s, %s)",
+            [(f"Paciente {i}", _cpf(i)) for i in range(quantidade_pacientes)]
+        )
+        horarios = []
+        dia = date.today() + timedelta(days=1)
+        while len(horarios) < quantidade_horarios:
+            horarios.extend((dia, hora) for hora in HORARIOS_PADRAO)
+            dia += timedelta(days=1)
+        horarios = horarios[:quantidade_horarios]
+        db.connection.commit()
+        cursor.close()
+        db.definirAgendaModelo(CRM, {dia_semana: HORARIOS_PADRAO for dia_semana in range(7)})
+    return horarios
+
+
+def _cpf(numero):
+    digitos = f"999{numero:08d}"
+    return f"{digitos[:3]}.{digitos[3:6]}.{digitos[6:9]}-{digitos[9:]}"
+
+
+def executar(quantidade_threads=8, quantidade_horarios=500):
+    horarios = preparar(quantidade_horarios, quantidade_threads)
+    sucessos = {}
+    tentativas = [0]
+    trava = threading.Lock()
+    largada = threading.Barrier(quantidade_threads)
+
+    def recepcao(indice):
+        cpf = _cpf(indice)
+        ordem = list(horarios)
+        random.Random(indice).shuffle(ordem)
+        with Database(**CONFIG) as db:
+            largada.wait()
+            for dia, hora in ordem:
+                resultado = db.marcarConsulta(NOME_MEDICO, dia, hora, cpf)
+                with trava:
+                    tentativas[0] += 1
+                    if resultado == RESERVA_MARCADA:
+                        sucessos.setdefault((dia, hora), []).append(cpf)
+
+    threads = [threading.Thread(target=recepcao, args=(i,)) for i in range(quantidade_threads)]
+    inicio = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    duracao = time.perf_counter() - inicio
+
+    duplicados = [horario for horario, cpfs in sucessos.items() if len(cpfs) > 1]
+    with Database(**CONFIG) as db:
+        cursor = db.connection.cursor()
+        cursor.execute("SELECT COUNT(*) FROM consulta WHERE crm = %s AND status = 'A'", (CRM,))
+        agendadas = cursor.fetchone()[0]
+        cursor.close()
+
+    print(f"Threads: {quantidade_threads}, horários: {quantidade_horarios}, tentativas: {tentativas[0]}")
+    print(f"Tempo: {duracao:.2f}s, tentativas/s: {tentativas[0] / duracao:.0f}, "
+          f"marcações/s: {len(sucessos) / duracao:.0f}")
+    print(f"Marcações com sucesso: {len(sucessos)}, agendadas no banco: {agendadas}, duplicadas: {len(duplicados)}")
+    if duplicados or agendadas != len(sucessos) or len(sucessos) != quantidade_horarios:
+        print("FALHA: houve marcação duplicada ou perdida.")
+        return False
+    print("OK: cada horário foi marcado exatamente uma vez.")
+    return True
+
+
+if __name__ == "__main__":
+    argumentos = [int(valor) for valor in sys.argv[1:3]]
+    sys.exit(0 if executar(*argumentos) else 1)
@@ -0,0 +1,188 @@
+"""
+Gerador determinístico de dados sintéticos: médicos, pacientes e um ano de agenda.
+
+A mesma semente sempre produz os mesmos dados, para que resultados de benchmarks de execuções
+diferentes sejam comparáveis. Cada médico recebe a agenda modelo padrão, e a tabela consulta fica
+só com as exceções dos últimos seis meses (consultas realizadas) e dos próximos seis (agendadas),
+com ocupação alta nas próximas semanas e decrescente depois.
+
+Uso: python -m benchmarks.gerador arquivo.db [medicos] [pacientes]
+"""
+import random
+import sys
+from datetime import date, timedelta
+
+from Clinica.Database import DIAS_FECHADOS, HORARIOS_PADRAO, SQL_AGENDA_PADRAO
+
+ESPECIALIDADES = ["Cardiologia", "Clínica Geral", "Dermatologia", "Endocrinologia", "Ginecologia",
+                  "Neurologia", "Ortopedia", "Pediatria", "Psiquiatria", "Urologia"]
+NOMES = ["Ana", "Bruno", "Carla", "Daniel", "Eduarda", "Felipe", "Gabriela", "Henrique", "Isabela",
+         "João", "Larissa", "Marcos", "Natália", "Otávio", "Paula", "Rafael", "Sofia", "Tiago"]
+SOBRENOMES = ["Almeida", "Barbosa", "Costa", "Dias", "Ferreira", "Gomes", "Lima", "Martins",
+              "Oliveira", "Pereira", "Ribeiro", "Santos", "Silva", "Souza"]
+
+# Tabelas apagadas por limpar(), na ordem que respeita as chaves estrangeiras
+TABELAS = ["diario_agenda", "diario_checkpoint", "resumo_agenda", "consulta", "consulta_arquivo", "agenda_modelo", "especialidade_medico", "especialidade", "medico", "paciente", "endereco"]
+
+
+def cpfSintetico(numero):
+    """
+    CPF formatado e único para o número do paciente.
+    """
+    digitos = f"{numero:011d}"
+    return f"{digitos[:3]}.{digitos[3:6]}.{digitos[6:9]}-{digitos[9:]}"
+
+
+def crmSintetico(numero):
+    """
+    CRM único para o número do médico.
+    """
+    return f"CRM-{numero:05d}"
+
+
+class GeradorDados:
+    """
+    Popula um banco (já migrado) com dados sintéticos reprodutíveis.
+    """
+
+    def __init__(self, semente=2024, tamanho_lote=5000):
+        """
+        Args:
+            semente (int): Semente do gerador de números aleatórios.
+            tamanho_lote (int): Linhas gravadas por executemany.
+        """
+        self.semente = semente
+        self.tamanho_lote = tamanho_lote
+
+    def limpar(self, db):
+        """
+        Apaga os dados das tabelas preenchidas pelo gerador.
+        """
+        cursor = db.connection.cursor()
+        try:
+            for tabela in TABELAS:
+                cursor.execute(f"DELETE FROM {tabela}")
+            db.connection.commit()
+        finally:
+            cursor.close()
+        db.cache.invalidar("id_paciente", "crm", "nome", "especialidades", "medicos_especialidade", "agenda_modelo")
+
+    def popular(self, db, medicos, pacientes, dias=365, ocupacao=0.7, hoje=None):
+        """
+        Cria médicos, pacientes, a agenda modelo padrão e as exceções da agenda no período.
+
+        Nos dias de atendimento, cada horário passado é realizado ('R') com probabilidade ocupacao,
+        e cada horário futuro é agendado ('A') com probabilidade que cai de ocupacao (amanhã) até
+        um décimo dela (fim do período). Cerca de 3% dos horários são bloqueados ('I') e o restante
+        fica disponível pela agenda modelo, sem linha em consulta.
+
+        Args:
+            db (Database): Instância do banco de dados.
+            medicos (int): Quantidade de médicos.
+            pacientes (int): Quantidade de pacientes.
+            dias (int): Tamanho do período da agenda, centrado em hoje.
+            ocupacao (float): Fração de horários ocupados nos dias mais próximos.
+            hoje (date, opcional): Data de referência. Por padrão, a data atual.
+
+        Returns:
+            dict: Quantidade de médicos, pacientes e horários gravados em consulta.
+        """
+        aleatorio = random.Random(self.semente)
+        hoje = hoje or date.today()
+        inicio = hoje - timedelta(days=dias // 2)
+        cursor = db.connection.cursor()
+        try:
+            cursor.executemany(
+                "INSERT INTO especialidade (especialidade) VALUES (%s)",
+                [(especialidade,) for especialidade in ESPECIALIDADES]
+            )
+            cursor.execute("SELECT especialidade, especialidade_id FROM especialidade")
+            id_especialidade = dict(cursor.fetchall())
+
+            lista_medicos = [
+                (crmSintetico(i), f"{aleatorio.choice(NOMES)} {aleatorio.choice(SOBRENOMES)} {i}")
+                for i in range(medicos)
+            ]
+            cursor.executemany(
+                "INSERT INTO medico (crm, nome, email, telefone) VALUES (%s, %s, %s, %s)",
+                [(crm, nome, f"{crm.lower()}@clinica.test", "0000-0000") for crm, nome in lista_medicos]
+            )
+            cursor.executemany(
+                "INSERT INTO especialidade_medico (especialidade_id, crm) VALUES (%s, %s)",
+                [(id_especialidade[ESPECIALIDADES[i % len(ESPECIALIDADES)]], crm)
+                 for i, (crm, _) in enumerate(lista_medicos)]
+            )
+            cursor.execute(SQL_AGENDA_PADRAO)
+            self._emLotes(
+                cursor,
+                "INSERT INTO paciente (nome, cpf, data_nasc, email, telefone) VALUES (%s, %s, %s, %s, %s)",
+                (
+                    (f"{aleatorio.choice(NOMES)} {aleatorio.choice(SOBRENOMES)}", cpfSintetico(i),
+                     date(1940, 1, 1) + timedelta(days=aleatorio.randrange(365 * 80)),
+                     f"paciente{i}@clinica.test", "0000-0000")
+                    for i in range(pacientes)
+                )
+            )
+            cursor.execute("SELECT id_paciente FROM paciente")
+            ids_pacientes = sorted(linha[0] for linha in cursor.fetchall())
+
+            horarios = self._emLotes(
+                cursor,
+                "INSERT INTO consulta (horario, data, status, crm, id_paciente) VALUES (%s, %s, %s, %s, %s)",
+                self._agenda(aleatorio, lista_medicos, ids_pacientes, inicio, dias, hoje, ocupacao)
+            )
+            db.connection.commit()
+        finally:
+            cursor.close()
+        db.resumo.reconstruir(db)
+        db.cache.invalidar("id_paciente", "crm", "nome", "especialidades", "medicos_especialidade", "agenda_modelo")
+        return {"medicos": medicos, "pacientes": pacientes, "horarios": horarios}
+
+    def _agenda(self, aleatorio, lista_medicos, ids_pacientes, inicio, dias, hoje, ocupacao):
+        for crm, _ in lista_medicos:
+            for deslocamento in range(dias):
+                dia = inicio + timedelta(days=deslocamento)
+                if dia.weekday() in DIAS_FECHADOS:
+                    continue
+                distancia = (dia - hoje).days
+                if distancia < 0:
+                    chance, ocupado = ocupacao, 'R'
+                else:
+                    chance = ocupacao * max(0.1, 1 - distancia / max(dias - dias // 2, 1))
+                    ocupado = 'A'
+                for hora in HORARIOS_PADRAO:
+                    sorteio = aleatorio.random()
+                    if sorteio > 0.97:
+                        yield hora, dia, 'I', crm, None
+                    elif sorteio < chance:
+                        yield hora, dia, ocupado, crm, aleatorio.choice(ids_pacientes)
+
+    def _emLotes(self, cursor, sql, linhas):
+        total = 0
+        lote = []
+        for linha in linhas:
+            lote.append(linha)
+            if len(lote) == self.tamanho_lote:
+                cursor.executemany(sql, lote)
+                total += len(lote)
+                lote = []
+        if lote:
+            cursor.executemany(sql, lote)
+            total += len(lote)
+        return total
+
+
+if __name__ == "__main__":
+    from Clinica.Backend import BackendSQLite
+    from Clinica.Database import Database
+    from Clinica.Migracao import Migracao
+
+    if len(sys.argv) < 2:
+        print("Uso: python -m benchmarks.gerador arquivo.db [medicos] [pacientes]")
+        sys.exit(1)
+    quantidades = [int(valor) for valor in sys.argv[2:4]]
+    with Database(backend=BackendSQLite(sys.argv[1])) as db:
+        Migracao(db).aplicar()
+        gerador = GeradorDados()
+        gerador.limpar(db)
+        print(gerador.popular(db, *quantidades) if quantidades else gerador.popular(db, 20, 5000))
@@ -0,0 +1,70 @@
+"""
+Mede o tempo de inicialização dos pontos de entrada do sistema.
+
+Cada cenário roda em um interpretador novo (como um script ou uma tarefa do cron) e é repetido
+várias vezes; o relatório mostra a mediana descontado o tempo de subir o próprio Python, e quais
+dependências pesadas o cenário chegou a carregar. Nenhum cenário deve carregar o que não usa:
+importar Database não carrega bcrypt nem o driver do MySQL, e criar uma instância sem consultar
+nada não abre conexão.
+
+Uso: python -m benchmarks.inicializacao [repeticoes]
+"""
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Dependências cujo carregamento é relatado em cada cenário
+PESADAS = ("bcrypt", "mysql.connector", "stdiomask", "asyncio", "http.server")
+
+CENARIOS = {
+    "python (referência)": "pass",
+    "import Clinica": "import Clinica",
+    "import Clinica.Database": "import Clinica.Database",
+    "import Clinica.Interface": "import Clinica.Interface",
+    "import Clinica.Servico": "import Clinica.Servico",
+    "Database() sem consultas": (
+        "from Clinica.Backend import BackendSQLite\n"
+        "from Clinica.Database import Database\n"
+        "with Database(backend=BackendSQLite(':memory:')) as db:\n"
+        "    assert db._conexao is None\n"
+    ),
+    "python -m Clinica --help": "import runpy, sys; sys.argv = ['Clinica', '--help']; "
+                                "runpy.run_module('Clinica', run_name='__main__')",
+}
+
+RELATO = (
+    "\nimport sys\n"
+    f"print(','.join(nome for nome in {PESADAS!r} if nome in sys.modules), file=sys.stderr)\n"
+)
+
+
+def medir(codigo, repeticoes):
+    tempos = []
+    carregadas = ""
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        processo = subprocess.run([sys.executable, "-c", codigo + RELATO], cwd=RAIZ,
+                                  stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True, check=True)
+        tempos.append((time.perf_counter() - inicio) * 1000)
+        carregadas = processo.stderr.strip().splitlines()[-1] if processo.stderr.strip() else ""
+    return statistics.median(tempos), carregadas
+
+
+def executar(repeticoes=15):
+    resultados = {nome: medir(codigo, repeticoes) for nome, codigo in CENARIOS.items()}
+    referencia = resultados["python (referência)"][0]
+
+    print(f"Mediana de {repeticoes} execuções, descontando {referencia:.1f} ms do interpretador")
+    for nome, (mediana, carregadas) in resultados.items():
+        if nome == "python (referência)":
+            continue
+        print(f"{nome:<28} {mediana - referencia:8.1f} ms   carregou: {carregadas or '-'}")
+    return resultados
+
+
+if __name__ == "__main__":
+    executar(*[int(valor) for valor in sys.argv[1:2]])
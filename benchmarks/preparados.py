@@ -0,0 +1,82 @@
+"""
+Compara o caminho de marcação com e sem os cursores preparados de Database.
+
+Cada requisição repete o que a recepção faz ao marcar: consulta os horários livres do dia,
+marca a consulta e confere o histórico do paciente. As duas variantes marcam a mesma quantidade
+de horários livres diferentes em bancos gerados com a mesma semente.
+
+No MySQL (--mysql), a diferença mede o custo de análise e planejamento que o servidor deixa de ter.
+No SQLite, o próprio sqlite3 já reaproveita comandos compilados, então a diferença esperada é pequena.
+
+Uso: python -m benchmarks.preparados [requisicoes] [--mysql]
+"""
+import contextlib
+import io
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+from Clinica.Backend import BackendMySQL, BackendSQLite
+from Clinica.Database import Database
+from Clinica.Migracao import Migracao
+from benchmarks.comum import CONFIG
+from benchmarks.gerador import GeradorDados
+from benchmarks.suite import Cenario
+
+MEDICOS = 20
+PACIENTES = 5000
+
+
+def marcar(db, cenario):
+    nome, data, horario = cenario.horarioLivre()
+    cpf = cenario.cpf()
+    db.mostrarConsultasDisponiveis(db.descobrirCrm(nome), data)
+    db.marcarConsulta(nome, data, horario, cpf)
+    db.historicoMedico(cpf)
+
+
+def medirVariante(backend, requisicoes, preparados):
+    Database.usar_preparados = preparados
+    with Database(backend=backend) as db:
+        with contextlib.redirect_stdout(io.StringIO()):
+            Migracao(db).aplicar()
+        gerador = GeradorDados()
+        gerador.limpar(db)
+        gerador.popular(db, MEDICOS, PACIENTES)
+        cenario = Cenario(db, MEDICOS, PACIENTES, gerador.semente)
+        tempos = []
+        with contextlib.redirect_stdout(io.StringIO()):
+            for _ in range(requisicoes):
+                inicio = time.perf_counter()
+                marcar(db, cenario)
+                tempos.append((time.perf_counter() - inicio) * 1000)
+    tempos.sort()
+    return {
+        "mediana_ms": statistics.median(tempos),
+        "p95_ms": tempos[min(len(tempos) - 1, int(len(tempos) * 0.95))],
+        "requisicoes_por_segundo": requisicoes / (sum(tempos) / 1000),
+    }
+
+
+def executar(requisicoes=2000, usar_mysql=False):
+    resultados = {}
+    with tempfile.TemporaryDirectory() as diretorio:
+        for nome, preparados in (("sem preparados", False), ("com preparados", True)):
+            backend = BackendMySQL(**CONFIG) if usar_mysql else BackendSQLite(os.path.join(diretorio, f"{preparados}.db"))
+            resultados[nome] = medirVariante(backend, requisicoes, preparados)
+    Database.usar_preparados = True
+
+    print(f"Backend: {'MySQL' if usar_mysql else 'SQLite'}, requisições: {requisicoes}")
+    for nome, medidas in resultados.items():
+        print(f"{nome:<16} mediana {medidas['mediana_ms']:8.3f} ms   p95 {medidas['p95_ms']:8.3f} ms   "
+              f"{medidas['requisicoes_por_segundo']:8.0f} req/s")
+    ganho = resultados["sem preparados"]["mediana_ms"] / resultados["com preparados"]["mediana_ms"]
+    print(f"Mediana {ganho:.2f}x mais rápida com preparados")
+    return resultados
+
+
+if __name__ == "__main__":
+    argumentos = [valor for valor in sys.argv[1:] if valor != "--mysql"]
+    executar(*[int(valor) for valor in argumentos[:1]], usar_mysql="--mysql" in sys.argv)
@@ -0,0 +1,274 @@
+"""
+Micro-benchmarks dos métodos de Database e Relatorio em vários tamanhos de dados.
+
+Para cada tamanho, um banco novo é migrado e populado pelo GeradorDados (SQLite em um diretório
+temporário, ou o banco de testes MySQL de benchmarks.comum com --mysql). Cada método é chamado
+várias vezes com argumentos sorteados de forma determinística, e as latências (mínima, mediana,
+p95 e média, em milissegundos) são gravadas em JSON; com --metricas, também as idas ao servidor e
+as linhas lidas por chamada. Com --comparar, as medianas são comparadas
+com um resultado anterior e a execução falha se algum método ficou mais lento que o limite.
+
+Uso: python -m benchmarks.suite [--tamanhos pequeno,medio] [--repeticoes 50] [--saida arquivo.json]
+                                [--comparar anterior.json] [--limite 1.5] [--mysql] [--metricas]
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+
+from Clinica.Backend import BackendMySQL, BackendSQLite
+from Clinica.Database import Database, HORARIOS_MANHA, SQL_AGENDA_PERIODO, _chaveHorario, agendaDoPeriodo
+from Clinica.Medico import Medico
+from Clinica.Migracao import Migracao
+from Clinica.Paciente import Paciente
+from Clinica.Relatorio import Relatorio
+from benchmarks.comum import CONFIG
+from benchmarks.gerador import ESPECIALIDADES, GeradorDados, cpfSintetico, crmSintetico
+
+# Tamanhos de dados: nome -> (médicos, pacientes)
+TAMANHOS = {
+    "pequeno": (5, 500),
+    "medio": (20, 5000),
+    "grande": (60, 20000),
+}
+
+# Métodos lentos por natureza (varrem a agenda inteira) são repetidos menos vezes
+REPETICOES_MAXIMAS = {
+    "padronizadoConsultas": 3,
+    "carregarDisponibilidade": 5,
+    "carregarBusca": 3,
+    "Relatorio.paginasPorStatus": 5,
+    "resumo.reconstruir": 3,
+}
+
+
+class Cenario:
+    """
+    Dados sorteados para os argumentos dos benchmarks de um tamanho.
+    """
+
+    def __init__(self, db, medicos, pacientes, semente):
+        self.aleatorio = random.Random(semente)
+        self.pacientes = pacientes
+        self.novos = 0
+        cursor = db.connection.cursor()
+        try:
+            cursor.execute("SELECT crm, nome FROM medico")
+            self.medicos = sorted(cursor.fetchall())
+            # Horários livres dos próximos meses: agenda modelo menos as exceções gravadas em consulta
+            inicio, fim = date.today() + timedelta(days=1), date.today() + timedelta(days=180)
+            self.livres = []
+            for crm, _ in self.medicos:
+                cursor.execute(SQL_AGENDA_PERIODO, (crm, inicio, fim))
+                self.livres.extend(
+                    _chaveHorario(crm, data, horario)
+                    for _, data, horario, status in agendaDoPeriodo(db.agendaModelo(crm), cursor.fetchall(), inicio, fim)
+                    if status == 'D'
+                )
+            self.livres.sort()
+        finally:
+            cursor.close()
+        self.aleatorio.shuffle(self.livres)
+        self.nomes = dict(self.medicos)
+
+    def medico(self):
+        return self.aleatorio.choice(self.medicos)
+
+    def cpf(self):
+        return cpfSintetico(self.aleatorio.randrange(self.pacientes))
+
+    def horarioLivre(self):
+        # Cada horário livre é usado uma única vez, para que toda marcação tenha sucesso
+        crm, data, horario = self.livres.pop()
+        return self.nomes[crm], data, horario
+
+    def dia(self):
+        return (date.today() + timedelta(days=self.aleatorio.randrange(1, 120))).isoformat()
+
+    def novoPaciente(self):
+        self.novos += 1
+        return Paciente("Novo", f"Paciente {self.novos}", "0000-0000",
+                        cpfSintetico(90000000000 + self.novos), "00000-000", "1", "", "1990-01-01",
+                        f"novo{self.novos}@clinica.test")
+
+    def novoMedico(self):
+        self.novos += 1
+        return Medico(crmSintetico(90000 + self.novos), self.aleatorio.choice(ESPECIALIDADES), "Novo",
+                      f"Médico {self.novos}", "1980-01-01", f"medico{self.novos}@clinica.test", "0000-0000",
+                      "00000-000", "1", "")
+
+
+def _indisponibilizarEDisponibilizar(db, cenario):
+    nome, data, horario = cenario.horarioLivre()
+    db.indisponibilizarHorario(nome, data, horario)
+    db.disponibilizarHorario(nome, data, horario)
+
+
+def _percorrerRelatorio(db, status):
+    relatorio = Relatorio(tamanho_pagina=500, tamanho_lote=100)
+    return sum(len(pagina) for pagina in relatorio.paginasPorStatus(db, status))
+
+
+# Benchmarks: nome -> função (db, cenario). A ordem é a de execução.
+BENCHMARKS = {
+    "descobrirCrm": lambda db, c: db.descobrirCrm(c.medico()[1]),
+    "descobrirIdPaciente": lambda db, c: db.descobrirIdPaciente(c.cpf()),
+    "listarEspecialidades": lambda db, c: db.listarEspecialidades(),
+    "mostrarMedicosPorEspecialidade": lambda db, c: db.mostrarMedicosPorEspecialidade(
+        c.aleatorio.choice(ESPECIALIDADES)),
+    "mostrarConsultasDisponiveis": lambda db, c: db.mostrarConsultasDisponiveis(c.medico()[0], c.dia()),
+    "buscarPrimeirosHorarios": lambda db, c: db.buscarPrimeirosHorarios(
+        c.aleatorio.choice(ESPECIALIDADES), 5, None, None, HORARIOS_MANHA),
+    "mostrarHorarios": lambda db, c: db.mostrarHorarios(c.medico()[1]),
+    "historicoMedico": lambda db, c: db.historicoMedico(c.cpf()),
+    "carregarDisponibilidade": lambda db, c: db.carregarDisponibilidade(),
+    "diasComHorarioLivre": lambda db, c: db.diasComHorarioLivre(
+        c.medico()[0], date.today(), date.today() + timedelta(days=30), HORARIOS_MANHA),
+    "carregarBusca": lambda db, c: db.carregarBusca(),
+    "buscarCadastros (prefixo)": lambda db, c: db.buscarCadastros(c.medico()[1].split()[0][:3]),
+    "buscarCadastros (erro de digitação)": lambda db, c: db.buscarCadastros(c.medico()[1][:-1] + "x"),
+    "marcarConsulta": lambda db, c: db.marcarConsulta(*c.horarioLivre(), c.cpf()),
+    "indisponibilizarHorario+disponibilizarHorario": _indisponibilizarEDisponibilizar,
+    "cadastrarPaciente": lambda db, c: db.cadastrarPaciente(c.novoPaciente()),
+    "atualizarPaciente": lambda db, c: db.atualizarPaciente(c.cpf(), "Paciente Atualizado", "novo@clinica.test"),
+    "cadastrarMedico": lambda db, c: db.cadastrarMedico(c.novoMedico()),
+    "padronizadoConsultas": lambda db, c: db.padronizadoConsultas(),
+    "Relatorio.paginasPorStatus": lambda db, c: _percorrerRelatorio(db, 'A'),
+    "resumo.agregar": lambda db, c: db.resumo.agregar(db, ["especialidade", "semana"]),
+    "resumo.reconstruir": lambda db, c: db.resumo.reconstruir(db),
+}
+
+
+def medir(funcao, repeticoes):
+    """
+    Chama funcao repetidas vezes, descartando o que ela imprime.
+
+    Returns:
+        dict: repeticoes e latências min_ms, mediana_ms, p95_ms e media_ms.
+    """
+    tempos = []
+    with contextlib.redirect_stdout(io.StringIO()):
+        for _ in range(repeticoes):
+            inicio = time.perf_counter()
+            funcao()
+            tempos.append((time.perf_counter() - inicio) * 1000)
+    tempos.sort()
+    return {
+        "repeticoes": repeticoes,
+        "min_ms": round(tempos[0], 4),
+        "mediana_ms": round(statistics.median(tempos), 4),
+        "p95_ms": round(tempos[min(len(tempos) - 1, int(len(tempos) * 0.95))], 4),
+        "media_ms": round(statistics.fmean(tempos), 4),
+    }
+
+
+def executarTamanho(nome, backend, repeticoes, semente):
+    medicos, pacientes = TAMANHOS[nome]
+    Database.disponibilidade.carregado = False
+    with Database(backend=backend) as db:
+        with contextlib.redirect_stdout(io.StringIO()):
+            Migracao(db).aplicar()
+        gerador = GeradorDados(semente)
+        gerador.limpar(db)
+        inicio = time.perf_counter()
+        dados = gerador.popular(db, medicos, pacientes)
+        dados["geracao_s"] = round(time.perf_counter() - inicio, 3)
+        print(f"[{nome}] {dados['medicos']} médicos, {dados['pacientes']} pacientes, "
+              f"{dados['horarios']} horários gerados em {dados['geracao_s']:.1f}s")
+
+        cenario = Cenario(db, medicos, pacientes, semente)
+        metodos = {}
+        for metodo, funcao in BENCHMARKS.items():
+            vezes = min(repeticoes, REPETICOES_MAXIMAS.get(metodo, repeticoes))
+            Database.metricas.zerar()
+            metodos[metodo] = medir(lambda: funcao(db, cenario), vezes)
+            if Database.metricas.ativo:
+                comandos = Database.metricas.estatisticas()["comandos"].values()
+                metodos[metodo]["idas_por_chamada"] = sum(comando["idas"] for comando in comandos) / vezes
+                metodos[metodo]["linhas_por_chamada"] = sum(comando["linhas"] for comando in comandos) / vezes
+            print(f"  {metodo:<46} mediana {metodos[metodo]['mediana_ms']:9.3f} ms   "
+                  f"p95 {metodos[metodo]['p95_ms']:9.3f} ms")
+        dados["metodos"] = metodos
+    return dados
+
+
+def comparar(resultados, anterior, limite):
+    """
+    Compara as medianas com um resultado anterior.
+
+    Returns:
+        list: Tuplas (tamanho, método, razão) dos métodos com mediana acima de limite vezes a anterior.
+    """
+    regressoes = []
+    for tamanho, dados in resultados["tamanhos"].items():
+        metodos_anteriores = anterior.get("tamanhos", {}).get(tamanho, {}).get("metodos", {})
+        for metodo, medidas in dados["metodos"].items():
+            base = metodos_anteriores.get(metodo, {}).get("mediana_ms")
+            if base:
+                razao = medidas["mediana_ms"] / base
+                if razao > limite:
+                    regressoes.append((tamanho, metodo, razao))
+    return regressoes
+
+
+def executar(tamanhos, repeticoes=50, saida=None, usar_mysql=False, semente=2024):
+    """
+    Executa os benchmarks em cada tamanho e grava os resultados em JSON.
+
+    Returns:
+        dict: Resultados gravados.
+    """
+    resultados = {
+        "gerado_em": datetime.now().isoformat(timespec="seconds"),
+        "backend": "mysql" if usar_mysql else "sqlite",
+        "semente": semente,
+        "python": platform.python_version(),
+        "plataforma": platform.platform(),
+        "tamanhos": {},
+    }
+    with tempfile.TemporaryDirectory() as diretorio:
+        for nome in tamanhos:
+            backend = BackendMySQL(**CONFIG) if usar_mysql else BackendSQLite(os.path.join(diretorio, f"{nome}.db"))
+            resultados["tamanhos"][nome] = executarTamanho(nome, backend, repeticoes, semente)
+    saida = saida or f"benchmark_{datetime.now():%Y%m%d_%H%M%S}.json"
+    with open(saida, "w", encoding="utf-8") as arquivo:
+        json.dump(resultados, arquivo, indent=2, ensure_ascii=False)
+    print(f"Resultados gravados em {saida}")
+    return resultados
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Micro-benchmarks dos métodos de Database.")
+    parser.add_argument("--tamanhos", default="pequeno,medio",
+                        help=f"Tamanhos separados por vírgula ({', '.join(TAMANHOS)}).")
+    parser.add_argument("--repeticoes", type=int, default=50)
+    parser.add_argument("--saida", help="Arquivo JSON de resultados.")
+    parser.add_argument("--comparar", help="Resultado anterior para detectar regressões.")
+    parser.add_argument("--limite", type=float, default=1.5,
+                        help="Razão entre medianas a partir da qual há regressão.")
+    parser.add_argument("--mysql", action="store_true", help="Usa o banco de testes MySQL em vez do SQLite.")
+    parser.add_argument("--metricas", action="store_true",
+                        help="Registra também idas ao servidor e linhas lidas por chamada.")
+    argumentos = parser.parse_args()
+
+    tamanhos = [nome.strip() for nome in argumentos.tamanhos.split(",") if nome.strip()]
+    desconhecidos = [nome for nome in tamanhos if nome not in TAMANHOS]
+    if desconhecidos:
+        parser.error(f"Tamanhos desconhecidos: {', '.join(desconhecidos)}")
+    if argumentos.metricas:
+        Database.metricas.ativar()
+    resultados = executar(tamanhos, argumentos.repeticoes, argumentos.saida, argumentos.mysql)
+    if argumentos.comparar:
+        with open(argumentos.comparar, encoding="utf-8") as arquivo:
+            regressoes = comparar(resultados, json.load(arquivo), argumentos.limite)
+        for tamanho, metodo, razao in regressoes:
+            print(f"REGRESSÃO [{tamanho}] {metodo}: {razao:.2f}x mais lento")
+        sys.exit(1 if regressoes else 0)
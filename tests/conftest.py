@@ -0,0 +1,80 @@
+from datetime import date, timedelta
+
+import pytest
+
+from Clinica.Backend import BackendSQLite
+from Clinica.Busca import IndiceBusca
+from Clinica.Cache import CacheLRU
+from Clinica.Database import Database, HORARIOS_PADRAO
+from Clinica.Disponibilidade import IndiceDisponibilidade
+from Clinica.Medico import Medico
+from Clinica.Migracao import Migracao
+from Clinica.Paciente import Paciente
+from Clinica.Replica import ConexaoPrimaria, ReplicaLeitura
+
+CRM = "CRM-1"
+MEDICO = "Ana Silva"
+CPF = "111.111.111-11"
+OUTRO_CPF = "222.222.222-22"
+
+
+def proximoDia(dia_semana, semanas=1):
+    """
+    Data ('YYYY-MM-DD') do dia da semana pedido (0 = segunda-feira) daqui a algumas semanas;
+    semanas negativas voltam ao passado.
+    """
+    hoje = date.today()
+    dia = hoje + timedelta(days=(dia_semana - hoje.weekday()) % 7 + 7 * semanas)
+    return dia.isoformat()
+
+
+@pytest.fixture(autouse=True)
+def estadoDoProcesso(monkeypatch):
+    # Cache, índices e marcas de escrita são compartilhados pelo processo: cada teste começa do zero
+    monkeypatch.setattr(Database, "cache", CacheLRU(tamanho_max=2048, ttl=600))
+    monkeypatch.setattr(Database, "disponibilidade", IndiceDisponibilidade(HORARIOS_PADRAO))
+    monkeypatch.setattr(Database, "busca", IndiceBusca())
+    monkeypatch.setattr(ConexaoPrimaria, "escrita_em", None)
+    monkeypatch.setattr(ReplicaLeitura, "_pulsos", {})
+
+
+@pytest.fixture
+def backend(tmp_path):
+    return BackendSQLite(str(tmp_path / "clinica.db"))
+
+
+@pytest.fixture
+def db(backend):
+    """
+    Banco SQLite migrado com um médico (agenda modelo padrão) e dois pacientes.
+    """
+    with Database(backend=backend) as db:
+        db.avisos = False
+        Migracao(db).aplicar()
+        db.cadastrarMedico(Medico(CRM, "Cardiologia", "Ana", "Silva", "1980-01-01", "ana@clinica.com",
+                                  "11999990000", "01001-000", "10", ""))
+        db.cadastrarPaciente(Paciente("Joao", "Souza", "11988880000", CPF, "02002-000", "20", "",
+                                      "1990-01-01", "joao@email.com"))
+        db.cadastrarPaciente(Paciente("Maria", "Lima", "11977770000", OUTRO_CPF, "03003-000", "30", "",
+                                      "1992-02-02", "maria@email.com"))
+        db.padronizadoConsultas()
+        yield db
+
+
+def statusDoDia(db, dia):
+    """
+    Status exibido de cada horário do médico de teste em um dia: {'HH:MM:SS': 'Agendada', ...}.
+    """
+    return {
+        horario.split(": ", 1)[1]: status.split(": ", 1)[1]
+        for _, data, horario, status in db.mostrarHorarios(MEDICO, dia, dia) or []
+    }
+
+
+def contar(db, sql, valores=()):
+    cursor = db.connection.cursor()
+    try:
+        cursor.execute(sql, valores)
+        return cursor.fetchone()[0]
+    finally:
+        cursor.close()
@@ -0,0 +1,102 @@
+import pytest
+
+from Clinica.Database import (
+    DIAS_FECHADOS, HORARIO_NOVO, HORARIOS_MANHA, HORARIOS_PADRAO, HORARIOS_TARDE, RESERVA_INVALIDA,
+    RESERVA_MARCADA, RESERVA_OCUPADA,
+)
+
+from conftest import CPF, CRM, MEDICO, OUTRO_CPF, contar, proximoDia, statusDoDia
+
+TERCA = 1
+
+
+@pytest.fixture
+def dia():
+    return proximoDia(TERCA)
+
+
+def test_padronizado_cria_agenda_modelo_sem_linhas_de_consulta(db, dia):
+    modelo = db.agendaModelo(CRM)
+    for dia_semana in range(7):
+        esperado = () if dia_semana in DIAS_FECHADOS else tuple(HORARIOS_PADRAO)
+        assert modelo[dia_semana] == esperado
+    assert db.padronizadoConsultas() == 0
+    assert contar(db, "SELECT COUNT(*) FROM consulta") == 0
+    assert statusDoDia(db, dia) == {horario: "Disponível" for horario in HORARIOS_PADRAO}
+
+
+def test_padronizado_respeita_agenda_modelo_existente(db):
+    db.definirAgendaModelo(CRM, {TERCA: HORARIOS_MANHA})
+    assert db.padronizadoConsultas() == 0
+    assert db.agendaModelo(CRM)[TERCA] == tuple(HORARIOS_MANHA)
+    assert db.agendaModelo(CRM)[TERCA + 1] == ()
+
+
+def test_marcar_consulta(db, dia):
+    horario = HORARIOS_PADRAO[0]
+    assert db.marcarConsulta(MEDICO, dia, horario, CPF) == RESERVA_MARCADA
+    assert db.marcarConsulta(MEDICO, dia, horario, OUTRO_CPF) == RESERVA_OCUPADA
+    assert db.marcarConsulta(MEDICO, dia, horario, CPF) == RESERVA_OCUPADA
+    assert statusDoDia(db, dia)[horario] == "Agendada"
+    assert db.historicoMedico(CPF) == [(dia, horario, "Agendada", MEDICO)]
+    assert db.historicoMedico(OUTRO_CPF) is None
+
+
+def test_marcar_consulta_invalida(db, dia):
+    horario = HORARIOS_PADRAO[1]
+    assert db.marcarConsulta(MEDICO, dia, horario, "999.999.999-99") == RESERVA_INVALIDA
+    assert db.marcarConsulta("Dr Inexistente", dia, horario, CPF) == RESERVA_INVALIDA
+    assert db.marcarConsulta(MEDICO, dia, "12:00:00", CPF) == RESERVA_INVALIDA
+    assert db.marcarConsulta(MEDICO, proximoDia(DIAS_FECHADOS[0]), horario, CPF) == RESERVA_INVALIDA
+    assert contar(db, "SELECT COUNT(*) FROM consulta") == 0
+
+
+def test_marcar_horario_bloqueado_ou_extra(db, dia):
+    assert db.indisponibilizarHorario(MEDICO, dia, HORARIOS_PADRAO[0]) == 'D'
+    assert db.marcarConsulta(MEDICO, dia, HORARIOS_PADRAO[0], CPF) == RESERVA_OCUPADA
+    # Horário extra, fora da agenda modelo
+    assert db.disponibilizarHorario(MEDICO, dia, "12:00:00") == HORARIO_NOVO
+    assert db.marcarConsulta(MEDICO, dia, "12:00:00", CPF) == RESERVA_MARCADA
+
+
+def test_bloquear_e_liberar_periodo(db, dia):
+    ultimo_dia = proximoDia(TERCA + 3)
+    db.marcarConsulta(MEDICO, dia, HORARIOS_PADRAO[2], CPF)
+    db.marcarConsulta(MEDICO, ultimo_dia, HORARIOS_PADRAO[5], OUTRO_CPF)
+
+    desmarcadas = db.bloquearPeriodo(CRM, dia, ultimo_dia)
+    assert sorted((str(data), horario, cpf) for _, data, horario, cpf, _ in desmarcadas) == [
+        (dia, HORARIOS_PADRAO[2], CPF), (ultimo_dia, HORARIOS_PADRAO[5], OUTRO_CPF)
+    ]
+    assert set(statusDoDia(db, dia).values()) == {"Indisponível"}
+    assert set(statusDoDia(db, ultimo_dia).values()) == {"Indisponível"}
+    assert db.diasComHorarioLivre(CRM, dia, ultimo_dia) == []
+
+    assert db.liberarPeriodo(CRM, dia, ultimo_dia) == []
+    assert statusDoDia(db, dia) == {horario: "Disponível" for horario in HORARIOS_PADRAO}
+    # As consultas desmarcadas não voltam para o histórico dos pacientes
+    assert db.historicoMedico(CPF) is None
+    assert db.historicoMedico(OUTRO_CPF) is None
+    assert db.marcarConsulta(MEDICO, dia, HORARIOS_PADRAO[2], OUTRO_CPF) == RESERVA_MARCADA
+
+
+def test_bloquear_so_alguns_horarios(db, dia):
+    db.marcarConsulta(MEDICO, dia, HORARIOS_TARDE[0], CPF)
+    assert db.bloquearPeriodo(CRM, dia, dia, horarios=HORARIOS_MANHA) == []
+    status = statusDoDia(db, dia)
+    assert {status[horario] for horario in HORARIOS_MANHA} == {"Indisponível"}
+    assert status[HORARIOS_TARDE[0]] == "Agendada"
+    assert {status[horario] for horario in HORARIOS_TARDE[1:]} == {"Disponível"}
+    # Outros dias da semana ficam de fora
+    assert db.bloquearPeriodo(CRM, dia, proximoDia(TERCA + 1), dias_semana=[TERCA + 1]) == []
+    assert statusDoDia(db, dia) == status
+
+
+def test_resumo_acompanha_as_alteracoes(db, dia):
+    db.marcarConsulta(MEDICO, dia, HORARIOS_PADRAO[0], CPF)
+    db.indisponibilizarHorario(MEDICO, dia, HORARIOS_PADRAO[1])
+    db.bloquearPeriodo(CRM, proximoDia(TERCA, 2), proximoDia(TERCA + 2, 2))
+    db.liberarPeriodo(CRM, proximoDia(TERCA + 1, 2), proximoDia(TERCA + 1, 2))
+    incremental = db.resumo.agregar(db, ["medico", "semana"])
+    db.resumo.reconstruir(db)
+    assert db.resumo.agregar(db, ["medico", "semana"]) == incremental
@@ -0,0 +1,94 @@
+import threading
+from collections import Counter
+
+import pytest
+
+from Clinica.Database import Database, HORARIOS_PADRAO, RESERVA_MARCADA, RESERVA_OCUPADA
+from Clinica.Paciente import Paciente
+
+from conftest import MEDICO, contar, proximoDia
+
+RECEPCOES = 8
+
+
+@pytest.fixture
+def pacientes(db):
+    cpfs = [f"900.000.000-{indice:02d}" for indice in range(RECEPCOES)]
+    for indice, cpf in enumerate(cpfs):
+        db.cadastrarPaciente(Paciente(f"Paciente {indice}", "Teste", "11900000000", cpf, "04004-000", "1", "",
+                                      "2000-01-01", "p@email.com"))
+    return cpfs
+
+
+def _disputar(backend, pedidos):
+    """
+    Cada recepção, em sua thread e com sua própria instância de Database, faz os pedidos
+    (data, horario, cpf) ao mesmo tempo que as outras.
+
+    Returns:
+        list: Resultados de marcarConsulta de todas as recepções.
+    """
+    largada = threading.Barrier(len(pedidos))
+    resultados = []
+    erros = []
+    trava = threading.Lock()
+
+    def recepcao(meus_pedidos):
+        try:
+            with Database(backend=backend) as db:
+                db.avisos = False
+                largada.wait()
+                for data, horario, cpf in meus_pedidos:
+                    resultado = db.marcarConsulta(MEDICO, data, horario, cpf)
+                    with trava:
+                        resultados.append((data, horario, cpf, resultado))
+        except Exception as erro:  # Falhas nas threads precisam chegar ao teste
+            erros.append(erro)
+
+    threads = [threading.Thread(target=recepcao, args=(meus_pedidos,)) for meus_pedidos in pedidos]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=60)
+    assert not erros
+    assert len(resultados) == sum(len(meus_pedidos) for meus_pedidos in pedidos)
+    return resultados
+
+
+def test_mesmo_horario_da_agenda_modelo(db, backend, pacientes):
+    dia, horario = proximoDia(1), HORARIOS_PADRAO[0]
+    resultados = _disputar(backend, [[(dia, horario, cpf)] for cpf in pacientes])
+    assert Counter(resultado for *_, resultado in resultados) == {
+        RESERVA_MARCADA: 1, RESERVA_OCUPADA: RECEPCOES - 1
+    }
+    assert contar(db, "SELECT COUNT(*) FROM consulta WHERE data = %s AND horario = %s", (dia, horario)) == 1
+    vencedor = next(cpf for *_, cpf, resultado in resultados if resultado == RESERVA_MARCADA)
+    assert contar(
+        db, "SELECT COUNT(*) FROM consulta INNER JOIN paciente USING (id_paciente) "
+            "WHERE data = %s AND horario = %s AND status = 'A' AND cpf = %s", (dia, horario, vencedor)
+    ) == 1
+
+
+def test_mesmo_horario_extra(db, backend, pacientes):
+    # Horário fora da agenda modelo, que já tem linha 'D' em consulta
+    dia, horario = proximoDia(1), "12:00:00"
+    db.disponibilizarHorario(MEDICO, dia, horario)
+    resultados = _disputar(backend, [[(dia, horario, cpf)] for cpf in pacientes])
+    assert Counter(resultado for *_, resultado in resultados) == {
+        RESERVA_MARCADA: 1, RESERVA_OCUPADA: RECEPCOES - 1
+    }
+
+
+def test_varios_horarios_sem_marcacao_dupla(db, backend, pacientes):
+    horarios = [(proximoDia(dia_semana), horario) for dia_semana in (1, 2) for horario in HORARIOS_PADRAO]
+    # Todas as recepções tentam todos os horários, cada uma em uma ordem diferente
+    pedidos = [
+        [(data, horario, cpf) for data, horario in horarios[indice:] + horarios[:indice]]
+        for indice, cpf in enumerate(pacientes)
+    ]
+    resultados = _disputar(backend, pedidos)
+    marcadas = Counter((data, horario) for data, horario, _, resultado in resultados if resultado == RESERVA_MARCADA)
+    assert set(marcadas) == set(horarios)
+    assert set(marcadas.values()) == {1}
+    assert contar(db, "SELECT COUNT(*) FROM consulta WHERE status = 'A'") == len(horarios)
+    assert db.diasComHorarioLivre("CRM-1", horarios[0][0], horarios[-1][0]) == []
@@ -0,0 +1,50 @@
+from datetime import date, timedelta
+
+import pytest
+
+from Clinica.Arquivamento import Arquivamento
+from Clinica.Database import HORARIOS_PADRAO
+
+from conftest import CPF, CRM, MEDICO, OUTRO_CPF, contar, proximoDia, statusDoDia
+
+
+def test_arquivar_e_ler_de_volta(db):
+    passado, futuro = proximoDia(1, -2), proximoDia(1)
+    db.marcarConsulta(MEDICO, passado, HORARIOS_PADRAO[0], CPF)
+    db.marcarConsulta(MEDICO, passado, HORARIOS_PADRAO[1], OUTRO_CPF)
+    db.indisponibilizarHorario(MEDICO, passado, HORARIOS_PADRAO[2])
+    db.disponibilizarHorario(MEDICO, passado, "12:00:00")
+    # Bloqueado e liberado de novo: a linha 'D' só repete o que a agenda modelo diz
+    db.indisponibilizarHorario(MEDICO, passado, HORARIOS_PADRAO[3])
+    db.disponibilizarHorario(MEDICO, passado, HORARIOS_PADRAO[3])
+    db.marcarConsulta(MEDICO, futuro, HORARIOS_PADRAO[0], CPF)
+
+    historico = db.historicoMedico(CPF)
+    agenda = statusDoDia(db, passado)
+    resumo = db.resumo.agregar(db, ["medico", "semana"])
+    sequencia = db.diario.ultimaSequencia(db)
+
+    relatorio = Arquivamento(db).arquivar()
+
+    assert (relatorio["arquivadas"], relatorio["descartadas"]) == (4, 1)
+    assert contar(db, "SELECT COUNT(*) FROM consulta WHERE data < %s", (date.today(),)) == 0
+    assert contar(db, "SELECT COUNT(*) FROM consulta_arquivo") == 4
+    assert db.historicoMedico(CPF) == historico
+    assert db.historicoMedico(CPF, futuro) == [(futuro, HORARIOS_PADRAO[0], "Agendada", MEDICO)]
+    assert statusDoDia(db, passado) == agenda
+    # Nenhum horário mudou de status: resumo e diário ficam como estavam
+    assert db.diario.ultimaSequencia(db) == sequencia
+    assert db.resumo.agregar(db, ["medico", "semana"]) == resumo
+    db.resumo.reconstruir(db)
+    assert db.resumo.agregar(db, ["medico", "semana"]) == resumo
+
+
+def test_arquivar_de_novo_nao_move_nada(db):
+    db.marcarConsulta(MEDICO, proximoDia(1, -1), HORARIOS_PADRAO[0], CPF)
+    Arquivamento(db, tamanho_lote=1).arquivar()
+    assert Arquivamento(db).arquivar()["arquivadas"] == 0
+
+
+def test_arquivar_dias_futuros_e_recusado(db):
+    with pytest.raises(ValueError):
+        Arquivamento(db).arquivar((date.today() + timedelta(days=1)).isoformat())
@@ -0,0 +1,182 @@
+import asyncio
+from contextlib import asynccontextmanager
+
+import pytest
+
+from Clinica.AsyncDatabase import AsyncDatabase
+from Clinica.Cache import CacheLRU
+from Clinica.Database import (
+    Database, HORARIO_ERRO, HORARIO_NOVO, HORARIOS_PADRAO, RESERVA_MARCADA, RESERVA_OCUPADA, SQL_CRIAR_HORARIO,
+)
+
+from conftest import CPF, MEDICO, OUTRO_CPF, contar, proximoDia
+
+
+class CursorAssincrono:
+    def __init__(self, cursor, falhas):
+        self._cursor = cursor
+        self._falhas = falhas
+
+    async def execute(self, sql, valores=()):
+        if sql in self._falhas:
+            raise self._falhas[sql]
+        self._cursor.execute(sql, valores)
+
+    async def executemany(self, sql, linhas):
+        self._cursor.executemany(sql, linhas)
+
+    async def fetchone(self):
+        return self._cursor.fetchone()
+
+    async def fetchall(self):
+        return self._cursor.fetchall()
+
+    @property
+    def rowcount(self):
+        return self._cursor.rowcount
+
+
+class ConexaoAssincrona:
+    def __init__(self, conexao, falhas):
+        self._conexao = conexao
+        self._falhas = falhas
+
+    @property
+    def em_transacao(self):
+        return self._conexao.in_transaction
+
+    @asynccontextmanager
+    async def cursor(self):
+        cursor = self._conexao.cursor()
+        try:
+            yield CursorAssincrono(cursor, self._falhas)
+        finally:
+            cursor.close()
+
+    async def begin(self):
+        self._conexao.start_transaction()
+
+    async def commit(self):
+        self._conexao.commit()
+
+    async def rollback(self):
+        self._conexao.rollback()
+
+
+class PoolSQLite:
+    """
+    Pool com a interface de aiomysql.Pool usada por AsyncDatabase, sobre conexões SQLite em autocommit.
+
+    Limita as conexões retiradas ao mesmo tempo a tamanho_max, como o maxsize do aiomysql, e anota as
+    conexões devolvidas com uma transação aberta. falhas: SQL -> exceção levantada ao executá-lo.
+    """
+
+    def __init__(self, backend, tamanho_max):
+        self.falhas = {}
+        self.devolvidas_em_transacao = 0
+        self._livres = [ConexaoAssincrona(backend.conectar(), self.falhas) for _ in range(tamanho_max)]
+        self._vagas = asyncio.Semaphore(tamanho_max)
+
+    @asynccontextmanager
+    async def acquire(self):
+        async with self._vagas:
+            conexao = self._livres.pop()
+            try:
+                yield conexao
+            finally:
+                if conexao.em_transacao:
+                    self.devolvidas_em_transacao += 1
+                    await conexao.rollback()
+                self._livres.append(conexao)
+
+    def close(self):
+        pass
+
+    async def wait_closed(self):
+        pass
+
+
+def _executar(backend, operacao, tamanho_max=1):
+    """
+    Roda operacao(adb, pool) em um AsyncDatabase sobre PoolSQLite e devolve o resultado, falhando se
+    alguma conexão voltar ao pool com transação aberta, mesmo quando a operação levanta uma exceção.
+    """
+    async def principal():
+        pool = PoolSQLite(backend, tamanho_max)
+        try:
+            async with AsyncDatabase(pool=pool, erros=backend.erros) as adb:
+                # Com uma consulta ao banco dentro de uma conexão já retirada, o pool de uma conexão travaria
+                return await asyncio.wait_for(operacao(adb, pool), timeout=5)
+        finally:
+            assert pool.devolvidas_em_transacao == 0
+
+    return asyncio.run(principal())
+
+
+@pytest.fixture
+def cacheFrio(monkeypatch):
+    monkeypatch.setattr(Database, "cache", CacheLRU(tamanho_max=2048, ttl=600))
+
+
+def test_marcar_com_cache_frio_e_uma_conexao(db, backend, cacheFrio):
+    dia, horario = proximoDia(1), HORARIOS_PADRAO[0]
+
+    async def marcar(adb, pool):
+        return [await adb.marcarConsulta(MEDICO, dia, horario, cpf) for cpf in (CPF, OUTRO_CPF)]
+
+    assert _executar(backend, marcar) == [RESERVA_MARCADA, RESERVA_OCUPADA]
+    assert contar(db, "SELECT COUNT(*) FROM consulta WHERE data = %s AND horario = %s AND status = 'A'",
+                  (dia, horario)) == 1
+    assert db.historicoMedico(CPF) == [(dia, horario, "Agendada", MEDICO)]
+
+
+def test_alterar_status_com_cache_frio_e_uma_conexao(db, backend, cacheFrio):
+    dia = proximoDia(1)
+
+    async def alterar(adb, pool):
+        return [
+            await adb.indisponibilizarHorario(MEDICO, dia, HORARIOS_PADRAO[0]),
+            await adb.indisponibilizarHorario(MEDICO, dia, "12:00:00"),
+            await adb.disponibilizarHorario(MEDICO, dia, "12:00:00"),
+            await adb.disponibilizarHorario(MEDICO, dia, HORARIOS_PADRAO[0]),
+        ]
+
+    assert _executar(backend, alterar) == ['D', None, HORARIO_NOVO, 'I']
+    assert contar(db, "SELECT COUNT(*) FROM consulta WHERE data = %s AND status = 'D'", (dia,)) == 2
+
+
+def test_erro_no_banco_desfaz_a_transacao(db, backend):
+    dia = proximoDia(1)
+
+    async def bloquear(adb, pool):
+        pool.falhas[SQL_CRIAR_HORARIO] = backend.erros[0]("disco cheio")
+        return await adb.indisponibilizarHorario(MEDICO, dia, HORARIOS_PADRAO[0])
+
+    assert _executar(backend, bloquear) == HORARIO_ERRO
+    assert contar(db, "SELECT COUNT(*) FROM consulta") == 0
+
+
+def test_outra_falha_desfaz_a_transacao_e_propaga(db, backend, monkeypatch):
+    def falhar(transicoes):
+        raise RuntimeError("falha inesperada")
+
+    monkeypatch.setattr(Database, "comandosTransicoes", falhar)
+
+    async def marcar(adb, pool):
+        return await adb.marcarConsulta(MEDICO, proximoDia(1), HORARIOS_PADRAO[0], CPF)
+
+    with pytest.raises(RuntimeError):
+        _executar(backend, marcar)
+    assert contar(db, "SELECT COUNT(*) FROM consulta") == 0
+
+
+def test_leituras(db, backend):
+    dia = proximoDia(1)
+    db.marcarConsulta(MEDICO, dia, HORARIOS_PADRAO[0], CPF)
+
+    async def ler(adb, pool):
+        return await adb.historicoMedico(CPF), await adb.mostrarHorarios(MEDICO, dia, dia)
+
+    historico, horarios = _executar(backend, ler)
+    assert historico == db.historicoMedico(CPF)
+    assert horarios == db.mostrarHorarios(MEDICO, dia, dia)
@@ -0,0 +1,34 @@
+import pytest
+
+bcrypt = pytest.importorskip("bcrypt")
+
+from Clinica.Autenticacao import CUSTO_BCRYPT, Autenticacao
+
+from conftest import contar
+
+
+@pytest.fixture
+def autenticacao(backend):
+    autenticacao = Autenticacao({"backend": backend}, trabalhadores=1)
+    yield autenticacao
+    autenticacao.fechar()
+
+
+def test_administrador_criado_entra_no_sistema(db, autenticacao):
+    assert not db.existeUsuario()
+    assert db.criar_adm("admin", "segredo")
+    assert db.existeUsuario()
+    # Mesmo custo dos hashes conferidos no login
+    assert db.senhaDoUsuario("admin").startswith(f"$2b${CUSTO_BCRYPT:02d}$")
+    token = autenticacao.autenticar("admin", "segredo")
+    assert autenticacao.validarToken(token) == "admin"
+    assert autenticacao.autenticar("admin", "errada") is None
+    assert autenticacao.autenticar("ninguem", "segredo") is None
+
+
+def test_criar_adm_com_usuario_existente_nao_altera_nada(db):
+    db.criar_adm("admin", "segredo")
+    senha = db.senhaDoUsuario("admin")
+    assert db.criar_adm("outro", "senha")
+    assert contar(db, "SELECT COUNT(*) FROM usuario") == 1
+    assert db.senhaDoUsuario("admin") == senha
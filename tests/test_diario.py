@@ -0,0 +1,78 @@
+from datetime import datetime, timedelta
+
+from Clinica.Database import HORARIOS_PADRAO
+from Clinica.Diario import DiarioAgenda
+
+from conftest import CPF, CRM, MEDICO, proximoDia
+
+
+def _registrar(db, seq, registrado_em):
+    cursor = db.connection.cursor()
+    cursor.execute(
+        "INSERT INTO diario_agenda (seq, crm, data, horario, status_anterior, status_novo, registrado_em) "
+        "VALUES (%s, %s, %s, %s, %s, %s, %s)",
+        (seq, CRM, "2030-01-01", "07:00:00", 'D', 'A', registrado_em)
+    )
+    db.connection.commit()
+    cursor.close()
+
+
+def test_alteracoes_da_agenda_vao_para_o_diario(db):
+    dia = proximoDia(1)
+    db.marcarConsulta(MEDICO, dia, HORARIOS_PADRAO[0], CPF)
+    db.indisponibilizarHorario(MEDICO, dia, HORARIOS_PADRAO[0])
+    transicoes = db.diario.ler(db)
+    assert [(t.seq, t.crm, str(t.data), t.horario, t.status_anterior, t.status_novo) for t in transicoes] == [
+        (1, CRM, dia, HORARIOS_PADRAO[0], 'D', 'A'),
+        (2, CRM, dia, HORARIOS_PADRAO[0], 'A', 'I'),
+    ]
+
+
+def test_leitura_para_em_lacuna_recente(db):
+    diario = DiarioAgenda(espera_lacuna=5)
+    agora = datetime.now()
+    _registrar(db, 1, agora)
+    _registrar(db, 2, agora)
+    _registrar(db, 4, agora)  # A 3 pode ser uma transação ainda aberta
+    assert [t.seq for t in diario.ler(db)] == [1, 2]
+    assert diario.ler(db, 2) == []
+    _registrar(db, 3, agora)
+    assert [t.seq for t in diario.ler(db, 2)] == [3, 4]
+
+
+def test_lacuna_antiga_e_ignorada(db):
+    diario = DiarioAgenda(espera_lacuna=5)
+    antigo = datetime.now() - timedelta(seconds=60)
+    _registrar(db, 1, antigo)
+    _registrar(db, 3, antigo)  # A 2 foi desfeita há tempo
+    assert [t.seq for t in diario.ler(db)] == [1, 3]
+
+
+def test_consumir_confirma_e_retoma(db):
+    dia = proximoDia(1)
+    for horario in HORARIOS_PADRAO[:3]:
+        db.marcarConsulta(MEDICO, dia, horario, CPF)
+    recebidas = []
+    assert db.diario.consumir(db, "teste", recebidas.extend, tamanho_lote=2) == 3
+    assert db.diario.checkpoint(db, "teste") == 3
+    assert db.diario.consumir(db, "teste", recebidas.extend) == 0
+
+    def falhar(lote):
+        raise RuntimeError("falha no consumidor")
+
+    db.marcarConsulta(MEDICO, dia, HORARIOS_PADRAO[3], CPF)
+    try:
+        db.diario.consumir(db, "teste", falhar)
+    except RuntimeError:
+        pass
+    # O lote que falhou é entregue de novo
+    assert db.diario.consumir(db, "teste", recebidas.extend) == 1
+    assert [t.seq for t in recebidas] == [1, 2, 3, 4]
+
+
+def test_ler_depois_da_poda(db):
+    dia = proximoDia(1)
+    for horario in HORARIOS_PADRAO[:3]:
+        db.marcarConsulta(MEDICO, dia, horario, CPF)
+    assert db.diario.podar(db, 2) == 2
+    assert [t.seq for t in db.diario.ler(db)] == [3]
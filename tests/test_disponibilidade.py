@@ -0,0 +1,25 @@
+from Clinica.Database import HORARIOS_MANHA, HORARIOS_PADRAO, HORARIOS_TARDE
+
+from conftest import CRM, MEDICO, proximoDia
+
+TERCA = 1
+
+
+def test_indice_acompanha_bloqueios(db):
+    dia = proximoDia(TERCA)
+    db.carregarDisponibilidade()
+    for horario in HORARIOS_PADRAO:
+        db.indisponibilizarHorario(MEDICO, dia, horario)
+    assert db.diasComHorarioLivre(CRM, dia, dia) == []
+    db.disponibilizarHorario(MEDICO, dia, HORARIOS_PADRAO[0])
+    assert [str(livre) for livre in db.diasComHorarioLivre(CRM, dia, dia)] == [dia]
+
+
+def test_horario_inexistente_nao_altera_o_indice(db):
+    dia = proximoDia(TERCA)
+    db.definirAgendaModelo(CRM, {TERCA: HORARIOS_MANHA})
+    db.carregarDisponibilidade()
+    assert db.indisponibilizarHorario(MEDICO, dia, HORARIOS_TARDE[0]) is None
+    # Quando o horário passa a existir na agenda modelo, ele está livre
+    db.definirAgendaModelo(CRM, {TERCA: HORARIOS_PADRAO})
+    assert [str(livre) for livre in db.diasComHorarioLivre(CRM, dia, dia, [HORARIOS_TARDE[0]])] == [dia]
@@ -0,0 +1,65 @@
+import csv
+
+from Clinica.Importacao import COLUNAS_MEDICO, COLUNAS_PACIENTE, ImportadorCSV
+
+from conftest import CPF, contar
+
+
+def _csv(caminho, colunas, linhas):
+    with open(caminho, "w", newline="", encoding="utf-8") as arquivo:
+        escritor = csv.writer(arquivo)
+        escritor.writerow(colunas)
+        escritor.writerows(linhas)
+    return str(caminho)
+
+
+def _enderecos(db, tabela, coluna):
+    cursor = db.connection.cursor()
+    try:
+        cursor.execute(f"SELECT t.{coluna}, e.id_endereco, e.cep, e.numero, e.complemento FROM {tabela} t "
+                       f"JOIN endereco e ON e.id_endereco = t.id_endereco")
+        return {linha[0]: linha[1:] for linha in cursor.fetchall()}
+    finally:
+        cursor.close()
+
+
+def test_importarPacientes_liga_cada_paciente_ao_seu_endereco(db, tmp_path):
+    anteriores = _enderecos(db, "paciente", "cpf")
+    caminho = _csv(tmp_path / "pacientes.csv", COLUNAS_PACIENTE, [
+        # Mesmo endereço de um paciente já cadastrado, repetido no lote e endereços distintos
+        ["Pedro", "Alves", "11966660000", "333.333.333-33", "02002-000", "20", "", "1985-05-05", "p@email.com"],
+        ["Rita", "Alves", "11955550000", "444.444.444-44", "02002-000", "20", "", "1986-06-06", "r@email.com"],
+        ["Caio", "Reis", "11944440000", "555.555.555-55", "04004-000", "40", "apto 1", "", "c@email.com"],
+        ["Lia", "Reis", "11933330000", "666.666.666-66", "05005-000", "50", "", "", "l@email.com"],
+        ["Joao", "Souza", "11988880000", CPF, "09009-000", "90", "", "1990-01-01", "joao@email.com"],
+    ])
+
+    relatorio = ImportadorCSV(db, tamanho_lote=10).importarPacientes(caminho)
+
+    assert relatorio["importados"] == 4
+    assert [motivo for _, motivo in relatorio["rejeitados"]] == ["CPF já cadastrado."]
+    enderecos = _enderecos(db, "paciente", "cpf")
+    assert enderecos[CPF] == anteriores[CPF]
+    assert enderecos["333.333.333-33"][1:] == ("02002-000", "20", "")
+    assert enderecos["444.444.444-44"][1:] == ("02002-000", "20", "")
+    assert enderecos["555.555.555-55"][1:] == ("04004-000", "40", "apto 1")
+    assert enderecos["666.666.666-66"][1:] == ("05005-000", "50", "")
+    # Cada cadastro tem o próprio endereço, inclusive quando o conteúdo se repete
+    ids = [id_endereco for id_endereco, *_ in enderecos.values()]
+    assert len(set(ids)) == len(ids) == 6
+    assert contar(db, "SELECT COUNT(*) FROM endereco") == 7
+
+
+def test_importarMedicos_liga_cada_medico_ao_seu_endereco(db, tmp_path):
+    caminho = _csv(tmp_path / "medicos.csv", COLUNAS_MEDICO, [
+        ["CRM-2", "Pediatria", "Bia", "Melo", "1975-03-03", "b@clinica.com", "11922220000", "06006-000", "60", ""],
+        ["CRM-3", "Cardiologia", "Rui", "Melo", "1976-04-04", "r@clinica.com", "11911110000", "07007-000", "70",
+         "sala 2"],
+    ])
+
+    relatorio = ImportadorCSV(db).importarMedicos(caminho, gerar_agenda=False)
+
+    assert relatorio["importados"] == 2
+    enderecos = _enderecos(db, "medico", "crm")
+    assert enderecos["CRM-2"][1:] == ("06006-000", "60", "")
+    assert enderecos["CRM-3"][1:] == ("07007-000", "70", "sala 2")
@@ -0,0 +1,19 @@
+from Clinica.Database import Database
+from Clinica.Migracao import MIGRACOES, Migracao
+
+
+def test_aplica_todas_as_migracoes(db):
+    migracao = Migracao(db)
+    assert migracao.versaoAtual() == MIGRACOES[-1][0]
+    assert migracao.indicesAusentes() == []
+
+
+def test_reaplicar_nao_muda_nada(db, backend):
+    assert Migracao(db).aplicar() == []
+    # Também em uma conexão nova, como em uma segunda execução de "python -m Clinica migrar"
+    with Database(backend=backend) as outro:
+        migracao = Migracao(outro)
+        assert migracao.aplicar() == []
+        assert migracao.versaoAtual() == MIGRACOES[-1][0]
+        assert migracao.indicesAusentes() == []
+    assert db.descobrirCrm("Ana Silva") == "CRM-1"
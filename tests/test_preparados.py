@@ -0,0 +1,24 @@
+import sqlite3
+
+import pytest
+
+from Clinica.Database import Database, SQL_CRM_POR_NOME, SQL_ID_PACIENTE, SQL_NOME_POR_CRM
+
+from conftest import CPF, CRM, MEDICO
+
+
+def test_cursores_preparados_limitados_por_conexao(db, monkeypatch):
+    monkeypatch.setattr(Database, "max_preparados", 2)
+    assert db._executarPreparado(SQL_CRM_POR_NOME, (MEDICO,)) == [(CRM,)]
+    cursores = Database._preparados[db._conexao_pool]
+    mais_antigo = cursores[SQL_CRM_POR_NOME][0]
+    db._executarPreparado(SQL_NOME_POR_CRM, (CRM,))
+    db._executarPreparado(SQL_ID_PACIENTE, (CPF,))
+    assert list(cursores) == [SQL_NOME_POR_CRM, SQL_ID_PACIENTE]
+    # O cursor descartado foi fechado, liberando o comando preparado
+    with pytest.raises(sqlite3.ProgrammingError):
+        mais_antigo.execute(SQL_CRM_POR_NOME, (MEDICO,))
+    # Um comando reutilizado passa a ser o mais recente e não é descartado
+    db._executarPreparado(SQL_NOME_POR_CRM, (CRM,))
+    db._executarPreparado(SQL_CRM_POR_NOME, (MEDICO,))
+    assert list(cursores) == [SQL_NOME_POR_CRM, SQL_CRM_POR_NOME]
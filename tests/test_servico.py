@@ -0,0 +1,63 @@
+import sqlite3
+
+import pytest
+
+from Clinica.Database import HORARIOS_PADRAO, SQL_CRIAR_HORARIO, SQL_INDISPONIBILIZAR, sqlHistorico
+from Clinica.Servico import ErroRequisicao, Servico
+
+from conftest import CPF, MEDICO, proximoDia
+
+
+@pytest.fixture
+def servico(backend):
+    return Servico({"backend": backend})
+
+
+def _falharEm(db, monkeypatch, sql_com_falha):
+    executar = db._executarPreparado
+
+    def executarOuFalhar(sql, valores=()):
+        if sql == sql_com_falha:
+            raise sqlite3.OperationalError("disco cheio")
+        return executar(sql, valores)
+
+    monkeypatch.setattr(db, "_executarPreparado", executarOuFalhar)
+
+
+def test_disponibilizar(db, servico):
+    dia = proximoDia(1)
+    status, corpo = servico.disponibilizar(db, {"medico": MEDICO, "data": dia, "horario": "12:00:00"})
+    assert (status, corpo) == (201, {"status_anterior": None, "status": "D"})
+    status, corpo = servico.disponibilizar(db, {"medico": MEDICO, "data": dia, "horario": "12:00:00"})
+    assert (status, corpo) == (200, {"status_anterior": "D", "status": "D"})
+    assert servico.disponibilizar(db, {"medico": "Dr Inexistente", "data": dia, "horario": "12:00:00"})[0] == 404
+    with pytest.raises(ErroRequisicao):
+        servico.disponibilizar(db, {"medico": MEDICO, "data": "amanhã", "horario": "12:00:00"})
+
+
+def test_disponibilizar_com_erro_no_banco(db, servico, monkeypatch):
+    _falharEm(db, monkeypatch, SQL_CRIAR_HORARIO)
+    status, _ = servico.disponibilizar(db, {"medico": MEDICO, "data": proximoDia(1), "horario": "12:00:00"})
+    assert status == 500
+
+
+def test_indisponibilizar(db, servico, monkeypatch):
+    dia = proximoDia(1)
+    status, corpo = servico.indisponibilizar(db, {"medico": MEDICO, "data": dia, "horario": HORARIOS_PADRAO[0]})
+    assert (status, corpo) == (200, {"status_anterior": "D", "status": "I"})
+    assert servico.indisponibilizar(db, {"medico": MEDICO, "data": dia, "horario": "12:00:00"})[0] == 404
+    _falharEm(db, monkeypatch, SQL_INDISPONIBILIZAR)
+    assert servico.indisponibilizar(db, {"medico": MEDICO, "data": dia, "horario": HORARIOS_PADRAO[0]})[0] == 500
+
+
+def test_historico_filtra_status_separados_por_virgula(db, servico):
+    dia = proximoDia(1)
+    db.marcarConsulta(MEDICO, dia, HORARIOS_PADRAO[0], CPF)
+    status, consultas = servico.historico(db, {"cpf": CPF, "status": "A,A,R"})
+    assert status == 200
+    assert [consulta["status"] for consulta in consultas] == ["Agendada"]
+    assert servico.historico(db, {"cpf": CPF, "status": "R"})[1] == []
+    assert servico.historico(db, {"cpf": CPF, "status": ["A"]})[1] == consultas
+    # Repetições e ordem dos status não geram comandos novos
+    assert sqlHistorico(CPF, status=["A", "A", "R"]) == sqlHistorico(CPF, status=["R", "A"])
+    assert servico.historico(db, {"cpf": CPF, "status": "AAAA"})[1] == []